@@ -0,0 +1,205 @@
+"""Classify every image in a directory with a pool of worker processes.
+
+Each worker builds its own FaceMesh once (in the pool initializer) and
+keeps it warm for all the images it gets. Results stream to CSV or JSONL
+in file order: emotion, confidence, the per-emotion probabilities, the
+landmark features the classifier scored and the per-stage timings.
+--scaling runs the directory once per worker count and reports images
+per second and the speedup over the first count.
+
+    python batch_classify.py faces/ --output results.csv
+    python batch_classify.py faces/ --output results.jsonl --workers 8
+    python batch_classify.py faces/ --scaling 1 2 4 8
+"""
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from frame_sources import IMAGE_EXTENSIONS
+from emotion_manager import EmotionEngine
+from data_store import EMOTION_NUMBERS
+
+EMOTIONS = [name for name, number in sorted(EMOTION_NUMBERS.items(), key=lambda item: item[1])]
+FEATURES = ('corner_lift', 'mouth_width', 'brow_raise')
+TIMINGS = ('read', 'preprocess', 'landmarks', 'classify')
+CSV_FIELDS = (['path', 'emotion', 'confidence', 'error']
+              + [f"p_{emotion}" for emotion in EMOTIONS]
+              + list(FEATURES)
+              + [f"{stage}_ms" for stage in TIMINGS])
+
+# The worker process's engine, built by _init_worker, or why it could not be built
+_engine = None
+_init_error = None
+
+
+class WorkerInitError(Exception):
+    """A worker process could not load the vision stack"""
+
+
+def list_images(directory, recursive=False):
+    """Yield the image paths under directory in name order"""
+    if not recursive:
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(directory, name)
+        return
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def _init_worker(min_detection_confidence):
+    """Pool initializer: one warm FaceMesh per worker process.
+
+    It must not raise: the pool would replace the dead worker with another
+    that fails the same way, forever. The error is kept for classify_image.
+    """
+    global _engine, _init_error
+    try:
+        import cv2
+        # The pool provides the parallelism; OpenCV's own threads would only compete with it
+        cv2.setNumThreads(1)
+        _engine = EmotionEngine(min_detection_confidence, static_image_mode=True)
+        _engine.warm_up(background=False)
+    except Exception as e:
+        _engine = None
+        _init_error = f"{type(e).__name__}: {e}"
+
+
+def classify_image(path):
+    """Classify one image with the worker's engine; returns a result row"""
+    if _init_error is not None:
+        # Re-raised by imap in the parent, which then stops the pool
+        raise WorkerInitError(_init_error)
+    import cv2
+    row = {'path': path, 'emotion': None, 'confidence': 0.0, 'error': None,
+           'probabilities': None, 'features': None, 'timings': {}}
+    try:
+        started = time.perf_counter()
+        frame = cv2.imread(path)
+        row['timings']['read'] = (time.perf_counter() - started) * 1000
+        if frame is None:
+            raise Exception("could not read image")
+        result = (_engine or _fallback_engine()).analyze(frame)
+        for key in ('emotion', 'confidence', 'probabilities', 'features'):
+            row[key] = result[key]
+        row['timings'].update(result['timings'])
+        del row['timings']['model_load']
+    except Exception as e:
+        row['error'] = str(e)
+    return row
+
+
+def _fallback_engine():
+    # classify_image() called outside a pool
+    _init_worker(0.5)
+    if _init_error is not None:
+        raise WorkerInitError(_init_error)
+    return _engine
+
+
+def classify_directory(paths, workers=None, chunksize=16, min_detection_confidence=0.5):
+    """Yield a result row for every path, in order, classified by a pool of workers"""
+    workers = workers or os.cpu_count() or 1
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(min_detection_confidence,)) as pool:
+        yield from pool.imap(classify_image, paths, chunksize)
+
+
+class ResultWriter:
+    """Writes result rows as CSV or JSONL, picked by the file extension"""
+
+    def __init__(self, output):
+        self.jsonl = output.lower().endswith(('.jsonl', '.json'))
+        self.file = open(output, 'w', encoding='utf-8', newline='')
+        self.csv = None
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row) + "\n")
+            return
+        flat = {key: row[key] for key in ('path', 'emotion', 'error')}
+        flat['confidence'] = round(row['confidence'], 4)
+        for emotion in EMOTIONS:
+            flat[f"p_{emotion}"] = round(row['probabilities'].get(emotion, 0.0), 4) if row['probabilities'] else ''
+        for feature in FEATURES:
+            flat[feature] = round(row['features'][feature], 5) if row['features'] else ''
+        for stage in TIMINGS:
+            flat[f"{stage}_ms"] = round(row['timings'][stage], 3) if stage in row['timings'] else ''
+        self.csv.writerow(flat)
+
+    def close(self):
+        self.file.close()
+
+
+def run(paths, workers, chunksize, min_detection_confidence, writer=None):
+    """Classify paths and return (images, faces, errors, seconds); the time includes pool startup"""
+    images = faces = errors = 0
+    started = time.perf_counter()
+    for row in classify_directory(paths, workers, chunksize, min_detection_confidence):
+        images += 1
+        if row['error']:
+            errors += 1
+        elif row['emotion'] is not None:
+            faces += 1
+        if writer is not None:
+            writer.write(row)
+    return images, faces, errors, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--output', help="results file, .csv or .jsonl")
+    parser.add_argument('--recursive', action='store_true', help="include subdirectories")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--chunksize', type=int, default=16, help="images handed to a worker at a time")
+    parser.add_argument('--min-confidence', type=float, default=0.5, help="FaceMesh detection confidence")
+    parser.add_argument('--scaling', type=int, nargs='+', metavar='WORKERS',
+                        help="time a run for each worker count instead of writing results")
+    args = parser.parse_args(argv)
+
+    paths = list(list_images(args.directory, args.recursive))
+    if not paths:
+        print(f"No images in {args.directory}")
+        return 1
+
+    if args.scaling:
+        print(f"{len(paths)} images")
+        print(f"{'workers':>7} {'seconds':>9} {'images/s':>9} {'speedup':>8}")
+        baseline = None
+        for workers in args.scaling:
+            try:
+                images, faces, errors, seconds = run(paths, workers, args.chunksize, args.min_confidence)
+            except WorkerInitError as e:
+                print(f"Could not start the workers: {e}")
+                return 1
+            rate = images / seconds
+            baseline = baseline or rate
+            print(f"{workers:>7} {seconds:>9.2f} {rate:>9.1f} {rate / baseline:>7.2f}x")
+        return 0
+
+    writer = ResultWriter(args.output) if args.output else None
+    try:
+        images, faces, errors, seconds = run(paths, args.workers, args.chunksize, args.min_confidence, writer)
+    except WorkerInitError as e:
+        print(f"Could not start the workers: {e}")
+        return 1
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"{images} images ({faces} with a face, {errors} errors) in {seconds:.2f} s, "
+          f"{images / seconds:.1f} images/s with {args.workers or os.cpu_count()} workers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Listening analytics latency on a year of synthetic play history.
+
+Fills a temporary database with plays spread over a year, then times the
+first (uncached) and repeated answers of each PlayAnalytics query, and the
+cost of taking in one new play.
+
+    python benchmarks/bench_analytics.py --plays 300000 --songs 5000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import DataStore
+from history_analytics import PlayAnalytics
+
+
+def fill_store(store, plays, songs, seed=1):
+    rng = random.Random(seed)
+    now = datetime.now()
+    paths = [f"/music/artist {i % 300}/song {i}.mp3" for i in range(songs)]
+    # A few favourites get most of the plays
+    weights = [1.0 / (rank + 1) for rank in range(songs)]
+    picks = rng.choices(range(songs), weights=weights, k=plays)
+    moments = sorted(now - timedelta(seconds=rng.uniform(0, 365 * 86400)) for _ in range(plays))
+    with store.transaction() as conn:
+        song_ids = [store._song_id(conn, path) for path in paths]
+        for song, played_at in zip(picks, moments):
+            store._insert_play(conn, song_ids[song], f"song {song}", played_at)
+        for song_id in song_ids:
+            if rng.random() < 0.6:
+                conn.execute("INSERT INTO song_tags (song_id, emotion_number) VALUES (?, ?)",
+                             (song_id, rng.randint(1, 3)))
+    return {path: rng.uniform(120, 360) for path in paths}
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    cold = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    func()
+    warm = (time.perf_counter() - start) * 1000
+    print(f"{label:>28} {cold:>10.2f} {warm:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plays', type=int, default=300000)
+    parser.add_argument('--songs', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DataStore(os.path.join(temp_dir, "bench.db"), migrate=False)
+        start = time.perf_counter()
+        durations = fill_store(store, args.plays, args.songs)
+        print(f"Logged {args.plays} plays of {args.songs} songs in {time.perf_counter() - start:.2f}s")
+
+        analytics = PlayAnalytics(store, durations.get)
+        start = time.perf_counter()
+        analytics.refresh()
+        print(f"Loaded {len(analytics)} plays in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        month_ago = datetime.now() - timedelta(days=30)
+        queries = [
+            ("top 10 per day", lambda: analytics.top_songs(10, 'day')),
+            ("top 10 per week", lambda: analytics.top_songs(10, 'week')),
+            ("top 10 per month", lambda: analytics.top_songs(10, 'month')),
+            ("plays per day", lambda: analytics.plays_per_period('day')),
+            ("play counts, last 30 days", lambda: analytics.play_counts(month_ago)),
+            ("count plays, last 30 days", lambda: analytics.count_plays(month_ago)),
+            ("listening time by emotion", lambda: analytics.listening_time_by_emotion()),
+            ("streaks", lambda: analytics.streaks()),
+        ]
+        print(f"{'query':>28} {'first ms':>10} {'cached ms':>10}")
+        for label, query in queries:
+            timed(label, query)
+
+        store.add_play("/music/artist 0/song 0.mp3", "song 0")
+        start = time.perf_counter()
+        analytics.refresh()
+        for _, query in queries:
+            query()
+        print(f"One new play, refresh and re-run all queries: {(time.perf_counter() - start) * 1000:.1f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Memory and lookup cost of SongCatalog against the old list of song dicts.
+
+    python benchmarks/bench_catalog.py --sizes 10000 100000 1000000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from song_catalog import SongCatalog
+
+EMOTION_NAMES = {1: 'neutral', 2: 'happy', 3: 'sad'}
+
+
+def synthetic_paths(count, songs_per_album=12, albums_per_artist=5):
+    root = os.path.join(os.sep, "music")
+    for i in range(count):
+        album = i // songs_per_album
+        artist = album // albums_per_artist
+        yield os.path.join(root, f"Artist {artist:05d}", f"Album {album:06d}",
+                           f"{i % songs_per_album + 1:02d} Song Title Number {i}.mp3")
+
+
+def synthetic_tags(paths):
+    """Tag roughly a third of the songs"""
+    rng = random.Random(1)
+    tags = {}
+    for path in paths:
+        if rng.random() < 0.33:
+            number = rng.choice([1, 2, 3])
+            tags[path] = [number]
+    return tags
+
+
+def build_dict_playlist(paths, tags):
+    playlist = []
+    for file_path in paths:
+        numbers = tags.get(file_path, [])
+        playlist.append({
+            'path': file_path,
+            'title': os.path.splitext(os.path.basename(file_path))[0],
+            'emotions': [EMOTION_NAMES[number] for number in numbers],
+            'emotion_numbers': list(numbers)
+        })
+    playlist.sort(key=lambda song: song['title'].lower())
+    return playlist
+
+
+def build_catalog(paths, tags):
+    catalog = SongCatalog(EMOTION_NAMES)
+    catalog.add_many(paths, tags)
+    len(catalog)  # force the sort
+    return catalog
+
+
+def measure(builder, paths, tags):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(paths, tags)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'songs':>9} {'store':>8} {'MB':>9} {'B/song':>8} {'build s':>8} {'lookup us':>10}")
+    for size in args.sizes:
+        paths = list(synthetic_paths(size))
+        tags = synthetic_tags(paths)
+        probes = random.Random(2).sample(paths, min(args.lookups, size))
+
+        playlist, memory, elapsed = measure(build_dict_playlist, paths, tags)
+        start = time.perf_counter()
+        for probe in probes:
+            # What _play_next/add_tag used to do: linear scan by path
+            next(i for i, song in enumerate(playlist) if song['path'] == probe)
+        lookup = (time.perf_counter() - start) / len(probes) * 1e6
+        print(f"{size:>9} {'dicts':>8} {memory / 1e6:>9.1f} {memory / size:>8.0f} {elapsed:>8.2f} {lookup:>10.1f}")
+        del playlist
+
+        catalog, memory, elapsed = measure(build_catalog, paths, tags)
+        start = time.perf_counter()
+        for probe in probes:
+            catalog.index_of(catalog.get_id(probe))
+        lookup = (time.perf_counter() - start) / len(probes) * 1e6
+        print(f"{size:>9} {'catalog':>8} {memory / 1e6:>9.1f} {memory / size:>8.0f} {elapsed:>8.2f} {lookup:>10.1f}")
+        del catalog
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Metadata extraction throughput (files/sec) against worker count.
+
+Builds a synthetic library of short WAV files and runs MetadataManager over
+it with an empty cache for each worker count.
+
+    python benchmarks/bench_metadata.py --files 2000 --workers 1 2 4 8
+"""
+import os
+import sys
+import time
+import wave
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metadata_manager import MetadataManager
+
+
+def build_library(folder, count, files_per_dir=200):
+    """Write count short silent WAV files spread over sub-folders"""
+    frames = b'\x00\x00' * 4410  # 0.1s of 16-bit mono silence at 44.1 kHz
+    signatures = []
+    for i in range(count):
+        sub_dir = os.path.join(folder, f"album_{i // files_per_dir:04d}")
+        os.makedirs(sub_dir, exist_ok=True)
+        file_path = os.path.join(sub_dir, f"track_{i:06d}.wav")
+        with wave.open(file_path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(44100)
+            f.writeframes(frames)
+        stat = os.stat(file_path)
+        signatures.append((file_path, stat.st_size, stat.st_mtime))
+    return signatures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="metadata_bench_")
+    try:
+        print(f"Building synthetic library of {args.files} files in {folder}")
+        signatures = build_library(os.path.join(folder, "music"), args.files)
+        cache_file = os.path.join(folder, "metadata_cache.json")
+
+        print(f"{'workers':>8} {'seconds':>10} {'files/sec':>12}")
+        for workers in args.workers:
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+            manager = MetadataManager(cache_file=cache_file, max_workers=workers)
+            start = time.perf_counter()
+            extracted = manager.extract_now(signatures)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>8} {elapsed:>10.3f} {extracted / elapsed:>12.1f}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Playlist view refresh time and widget count: one widget row per song against VirtualList.
+
+Needs a display. The per-song rows are only built up to --max-eager songs,
+beyond that they take minutes and gigabytes.
+
+    python benchmarks/bench_playlist_view.py --sizes 1000 10000 100000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import customtkinter as ctk
+from virtual_list import VirtualList
+
+
+def count_widgets(widget):
+    count, pending = 0, [widget]
+    while pending:
+        children = pending.pop().winfo_children()
+        count += len(children)
+        pending.extend(children)
+    return count
+
+
+def eager_refresh(parent, titles):
+    """What the playlist tab used to do: a frame, button and label per song"""
+    scrollable = ctk.CTkScrollableFrame(parent)
+    scrollable.pack(fill="both", expand=True)
+    for title in titles:
+        song_frame = ctk.CTkFrame(scrollable)
+        song_frame.pack(fill="x", padx=5, pady=2)
+        ctk.CTkButton(song_frame, text=title, anchor="w", height=30).pack(side="left", fill="x", expand=True)
+        ctk.CTkLabel(song_frame, text="", width=100).pack(side="right", padx=5)
+    return scrollable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--max-eager', type=int, default=10000)
+    args = parser.parse_args()
+
+    root = ctk.CTk()
+    root.geometry("800x600")
+    root.update()
+
+    print(f"{'rows':>8} {'view':>8} {'refresh ms':>11} {'scroll ms':>10} {'widgets':>9}")
+    for size in args.sizes:
+        titles = [f"Song number {i}" for i in range(size)]
+
+        if size <= args.max_eager:
+            frame = ctk.CTkFrame(root)
+            frame.pack(fill="both", expand=True)
+            start = time.perf_counter()
+            eager_refresh(frame, titles)
+            root.update()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{size:>8} {'eager':>8} {elapsed:>11.1f} {'-':>10} {count_widgets(frame):>9}")
+            frame.destroy()
+            root.update()
+
+        view = VirtualList(root, render_row=lambda i: (titles[i], ""))
+        view.pack(fill="both", expand=True)
+        root.update()
+        start = time.perf_counter()
+        view.set_items(range(size))
+        root.update()
+        refresh = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(50):
+            view._scroll_by(3)
+            root.update()
+        scroll = (time.perf_counter() - start) * 1000 / 50
+        print(f"{size:>8} {'virtual':>8} {refresh:>11.1f} {scroll:>10.2f} {view.get_widget_count():>9}")
+        view.destroy()
+        root.update()
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
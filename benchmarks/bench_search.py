@@ -0,0 +1,67 @@
+"""Playlist search latency: trigram index against a linear scan of titles.
+
+Simulates typing queries one character at a time, as the search box's
+trace callback does, on a synthetic library. The index's result cache is
+cleared before each query, so no query reuses the results of another.
+
+    python benchmarks/bench_search.py --songs 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import TrigramIndex
+
+WORDS = ("love night heart dance dream fire rain summer blue light road home "
+         "time world baby girl boy star moon sun city river wild gold young "
+         "forever tonight alone broken sweet crazy lost free electric hollow").split()
+QUERIES = ["summer night", "broken heart", "electric", "zzz", "moon river"]
+
+
+def synthetic_titles(count, seed=1):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(2, 5))) + f" {i}"
+            for i in range(count)]
+
+
+def time_typing(search, query):
+    """Return per-keystroke latencies (ms) for typing query"""
+    latencies = []
+    for end in range(1, len(query) + 1):
+        start = time.perf_counter()
+        search(query[:end])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--songs', type=int, default=100000)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.songs)
+    start = time.perf_counter()
+    index = TrigramIndex()
+    for song_id, title in enumerate(titles):
+        index.add(song_id, title)
+    print(f"Indexed {len(titles)} titles in {time.perf_counter() - start:.2f}s")
+
+    def linear_search(query):
+        query = query.lower()
+        return [song_id for song_id, title in enumerate(titles) if query in title.lower()]
+
+    print(f"{'query':>14} {'scan avg ms':>12} {'scan max ms':>12} {'index avg ms':>13} {'index max ms':>13}")
+    for query in QUERIES:
+        scan = time_typing(linear_search, query)
+        index.clear_cache()
+        indexed = time_typing(index.search, query)
+        print(f"{query:>14} {sum(scan) / len(scan):>12.2f} {max(scan):>12.2f} "
+              f"{sum(indexed) / len(indexed):>13.2f} {max(indexed):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Time to a filled catalog: building it from paths and tags against loading the playlist snapshot.
+
+    python benchmarks/bench_snapshot.py --sizes 10000 100000 1000000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from song_catalog import SongCatalog
+from playlist_snapshot import PlaylistSnapshot
+from bench_catalog import EMOTION_NAMES, synthetic_paths, synthetic_tags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    folder = os.path.join(os.sep, "music")
+    print(f"{'songs':>9} {'build ms':>10} {'save ms':>9} {'load ms':>9} {'file KB':>9}")
+    for size in args.sizes:
+        paths = list(synthetic_paths(size))
+        tags = synthetic_tags(paths)
+
+        start = time.perf_counter()
+        catalog = SongCatalog(EMOTION_NAMES)
+        catalog.add_many(paths, tags)
+        catalog.ids()
+        build = (time.perf_counter() - start) * 1000
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot = PlaylistSnapshot(os.path.join(temp_dir, "playlist_snapshot.bin"))
+            start = time.perf_counter()
+            snapshot.save(folder, catalog.export_columns())
+            save = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            loaded = SongCatalog(EMOTION_NAMES)
+            loaded.load_columns(snapshot.load(folder))
+            load = (time.perf_counter() - start) * 1000
+            size_kb = os.path.getsize(snapshot.snapshot_file) / 1024
+
+        assert len(loaded) == len(catalog)
+        print(f"{size:>9} {build:>10.1f} {save:>9.1f} {load:>9.1f} {size_kb:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Startup cost: import time of the app modules and time to the first painted window.
+
+Each run starts a fresh interpreter, imports main, builds MusicPlayerApp
+and processes events until the UI has been built and drawn (the first
+paint), then reports which heavy modules got loaded along the way. Needs
+a display and uses the real Data folder and saved music folder, like a
+normal launch.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['cv2', 'mediapipe', 'PIL', 'numpy', 'camera_manager', 'emotion_manager']
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+app = main.MusicPlayerApp()
+# The UI is built once the managers are ready, then drawn
+while app.ui is None and not app.init.errors:
+    app.root.update()
+app.root.update()
+painted = time.perf_counter()
+heavy = [name for name in %r if name in sys.modules]
+app._on_closing()
+print(json.dumps({'import': imported - start, 'paint': painted - start, 'heavy': heavy}))
+""" % (HEAVY_MODULES,)
+
+
+def run_once():
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=APP_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(count):
+    """Parse -X importtime output for the modules with the largest cumulative import time"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=APP_DIR, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    imports = [run['import'] * 1000 for run in runs]
+    paints = [run['paint'] * 1000 for run in runs]
+    print(f"import main:       median {statistics.median(imports):8.1f} ms  (min {min(imports):.1f})")
+    print(f"first paint:       median {statistics.median(paints):8.1f} ms  (min {min(paints):.1f})")
+    print(f"heavy modules loaded before first paint: {', '.join(runs[-1]['heavy']) or 'none'}")
+
+    print("\nSlowest imports (cumulative):")
+    for cumulative_us, name in slowest_imports(args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
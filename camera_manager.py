@@ -0,0 +1,353 @@
+import customtkinter as ctk
+import cv2
+from PIL import Image, ImageTk
+import threading
+import time
+import os
+from collections import deque
+from datetime import datetime
+from tkinter import messagebox
+from frame_sources import CameraSource, preview_frame
+
+
+class PreviewStats:
+    """Frames captured, shown and dropped by the camera preview, with FPS and CPU use"""
+
+    def __init__(self):
+        self.captured = 0
+        self.shown = 0
+        self.dropped = 0
+        self._mark = (time.perf_counter(), time.process_time(), 0, 0)
+
+    def sample(self):
+        """Get the rates since the previous sample (CPU is for the whole process, 100 = one core)"""
+        now, cpu = time.perf_counter(), time.process_time()
+        last_now, last_cpu, last_captured, last_shown = self._mark
+        elapsed = max(now - last_now, 1e-6)
+        self._mark = (now, cpu, self.captured, self.shown)
+        return {
+            'capture_fps': (self.captured - last_captured) / elapsed,
+            'preview_fps': (self.shown - last_shown) / elapsed,
+            'cpu': (cpu - last_cpu) / elapsed * 100,
+            'dropped': self.dropped
+        }
+
+
+class CameraManager(ctk.CTkToplevel):
+    # Most recent camera frames kept in memory for the emotion pipeline
+    FRAME_RING_SIZE = 5
+    PREVIEW_SIZE = (600, 400)
+    # How often the main loop looks for a new preview frame
+    PREVIEW_INTERVAL_MS = 15
+    # How long a capture waits for the camera's first frame
+    FIRST_FRAME_TIMEOUT = 2.0
+
+    def __init__(self, root_window, parent_ui, playlist_manager, language_manager, save_debug_frames=False, voter=None, frame_source=None):
+        # Initialize parent class first
+        super().__init__()
+        
+        # Store references
+        self.root = root_window
+        self.parent_ui = parent_ui
+        self.playlist_manager = playlist_manager
+        self.language_manager = language_manager
+        
+        # Set temp directory path in Data folder using path_utils
+        from path_utils import get_temp_image_directory
+        self.temp_dir = get_temp_image_directory()
+        
+        # Initialize variables
+        # Where frames come from; the default camera unless a recorded source is given
+        self.source = frame_source or CameraSource(0, 640, 480)
+        self._source_open = False
+        self.is_running = False
+        self.capture_timer = 3
+        self.camera_thread = None
+        
+        # Frames are handed to the emotion pipeline in memory; they only go
+        # to disk when the debug setting asks for it
+        self.frames = deque(maxlen=self.FRAME_RING_SIZE)
+        self._frame_ready = threading.Event()
+        self.save_debug_frames = save_debug_frames
+        
+        # Classifies frames while the countdown runs (an EmotionVoter), if given
+        self.voter = voter
+        
+        # The camera thread leaves only its latest preview frame here; the main
+        # loop picks it up, so frames it is too slow for are dropped, not queued
+        self._preview_lock = threading.Lock()
+        self._latest_preview = None
+        self._photo = None
+        self._pump_id = None
+        self._camera_stopped = False
+        self.stats = PreviewStats()
+        self.show_stats = bool(os.environ.get('KAISAR_PREVIEW_STATS'))
+        self._stats_shown_at = time.perf_counter()
+        
+        # Configure window
+        self._setup_window()
+        
+        # Initialize camera
+        self.initialize_camera()
+        
+    def _setup_window(self):
+        """Setup window properties and UI elements"""
+        try:
+            # Configure window
+            self.title(self.language_manager.get_text("emotion_detection"))
+            self.geometry("640x520")
+            self.resizable(False, False)
+            
+            # Create main frame
+            self.main_frame = ctk.CTkFrame(self)
+            self.main_frame.pack(padx=20, pady=20, fill="both", expand=True)
+            
+            # Create camera frame
+            self.camera_frame = ctk.CTkFrame(self.main_frame)
+            self.camera_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+            
+            # Create camera label
+            self.camera_label = ctk.CTkLabel(self.camera_frame, text="")
+            self.camera_label.pack(fill="both", expand=True)
+            
+            # Debug overlay with preview FPS and CPU use (KAISAR_PREVIEW_STATS=1)
+            self.stats_label = ctk.CTkLabel(
+                self.camera_frame,
+                text="",
+                font=("Courier", 11),
+                fg_color="gray10"
+            )
+            if self.show_stats:
+                self.stats_label.place(x=5, y=5)
+            
+            # Create timer label
+            self.timer_label = ctk.CTkLabel(
+                self.main_frame,
+                text="",
+                font=("Helvetica", 24, "bold")
+            )
+            self.timer_label.pack(pady=5)
+            
+            # Make window modal
+            self.transient(self.root)
+            self.grab_set()
+            
+            # Center window
+            self.center_window()
+            
+            # Bind window close event
+            self.protocol("WM_DELETE_WINDOW", self.on_closing)
+            
+        except Exception as e:
+            print(f"Error setting up window: {e}")
+            messagebox.showerror("Error", f"Could not setup window: {e}")
+            self.destroy()
+            
+    def center_window(self):
+        """Center window on screen"""
+        try:
+            self.update_idletasks()
+            width = self.winfo_width()
+            height = self.winfo_height()
+            x = (self.root.winfo_screenwidth() // 2) - (width // 2)
+            y = (self.root.winfo_screenheight() // 2) - (height // 2)
+            self.geometry(f'{width}x{height}+{x}+{y}')
+        except Exception as e:
+            print(f"Error centering window: {e}")
+            
+    def initialize_camera(self):
+        """Initialize the camera capture"""
+        try:
+            # Open the camera (or whichever frame source was given)
+            self.source.open()
+            self._source_open = True
+            
+            # Start camera thread
+            self.is_running = True
+            self.camera_thread = threading.Thread(target=self.update_camera)
+            self.camera_thread.daemon = True
+            self.camera_thread.start()
+            self._pump_id = self.after(self.PREVIEW_INTERVAL_MS, self._pump_preview)
+            
+            # Start countdown
+            self.start_countdown()
+            
+        except Exception as e:
+            print(f"Error initializing camera: {e}")
+            messagebox.showerror("Error", f"Could not initialize camera: {e}")
+            if self.voter is not None:
+                self.voter.stop()
+            self.destroy()
+            
+    def update_camera(self):
+        """Read frames on the camera thread and publish the latest one for the preview"""
+        while self.is_running:
+            try:
+                frame = self.source.read()
+                if frame is None:
+                    break
+                    
+                # Keep the raw BGR frame for the capture
+                self.frames.append(frame)
+                self._frame_ready.set()
+                self.stats.captured += 1
+                if self.voter is not None:
+                    self.voter.submit(frame)
+                
+                # Shrunk before the color conversion, so it works on fewer pixels
+                preview = preview_frame(frame, self.PREVIEW_SIZE)
+                
+                with self._preview_lock:
+                    if self._latest_preview is not None:
+                        self.stats.dropped += 1
+                    self._latest_preview = preview
+                    
+            except Exception as e:
+                print(f"Error updating camera: {e}")
+                break
+                
+        # The camera thread owns the frame source, so it releases it
+        self._close_source()
+        self._camera_stopped = True
+        
+    def _close_source(self):
+        if self._source_open:
+            self._source_open = False
+            self.source.close()
+            
+    def _pump_preview(self):
+        """Show the latest preview frame; runs on the Tk main loop"""
+        self._pump_id = None
+        if self._camera_stopped:
+            if self.is_running:
+                # The camera failed or was unplugged
+                self.cleanup_camera()
+            return
+            
+        with self._preview_lock:
+            preview, self._latest_preview = self._latest_preview, None
+            
+        try:
+            if preview is not None:
+                image = Image.fromarray(preview)
+                if self._photo is None:
+                    self._photo = ImageTk.PhotoImage(image=image)
+                    self.camera_label.configure(image=self._photo)
+                else:
+                    # Same size every frame, so the PhotoImage is reused
+                    self._photo.paste(image)
+                self.stats.shown += 1
+                
+            if self.show_stats and time.perf_counter() - self._stats_shown_at >= 1:
+                self._stats_shown_at = time.perf_counter()
+                rates = self.stats.sample()
+                self.stats_label.configure(
+                    text=f"preview {rates['preview_fps']:.1f} fps  camera {rates['capture_fps']:.1f} fps  "
+                         f"cpu {rates['cpu']:.0f}%  dropped {rates['dropped']}"
+                )
+        except Exception as e:
+            print(f"Error updating camera preview: {e}")
+            
+        self._pump_id = self.after(self.PREVIEW_INTERVAL_MS, self._pump_preview)
+        
+    def start_countdown(self, remaining=None):
+        """Count down on the Tk main loop, then capture"""
+        try:
+            if not self.is_running:
+                return
+            if remaining is None:
+                remaining = self.capture_timer
+            if remaining > 0:
+                self.timer_label.configure(text=str(remaining))
+                self.after(1000, self.start_countdown, remaining - 1)
+            else:
+                self.capture_image()
+                
+        except Exception as e:
+            print(f"Error in countdown: {e}")
+            self.cleanup_camera()
+            
+    def capture_image(self):
+        """Take the latest frames and hand them straight to the emotion pipeline"""
+        try:
+            frames = list(self.frames)
+            if not frames:
+                # The camera thread owns the source, so wait for its first frame
+                # instead of reading from this thread at the same time
+                if self.camera_thread is None:
+                    raise Exception("Camera not initialized")
+                if self._camera_stopped or not self._frame_ready.wait(self.FIRST_FRAME_TIMEOUT):
+                    raise Exception("Could not capture image")
+                frames = list(self.frames)
+            
+            # Update UI
+            self.timer_label.configure(text=self.language_manager.get_text("processing"))
+            self.update_idletasks()
+            
+            if self.save_debug_frames:
+                self._save_debug_frame(frames[-1])
+            
+            # The frames seen during the countdown are already classified
+            vote = self.voter.finish() if self.voter is not None else None
+            
+            self.process_captured_frames(frames, vote)
+            
+        except Exception as e:
+            print(f"Error capturing image: {e}")
+            messagebox.showerror("Error", str(e))
+            self.cleanup_camera()
+            
+    def _save_debug_frame(self, frame):
+        """Write a captured frame to the temp directory for debugging"""
+        try:
+            os.makedirs(self.temp_dir, exist_ok=True)
+            image_path = os.path.join(
+                self.temp_dir, f"capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
+            )
+            if cv2.imwrite(image_path, frame):
+                print(f"Saved debug frame to: {image_path}")
+            else:
+                print(f"Failed to save debug frame to: {image_path}")
+        except Exception as e:
+            print(f"Error saving debug frame: {e}")
+            
+    def process_captured_frames(self, frames, vote=None):
+        """Process captured frames (oldest first) and cleanup"""
+        try:
+            self.parent_ui.process_captured_frames(frames, vote)
+            
+        except Exception as e:
+            print(f"Error processing image: {e}")
+            messagebox.showerror("Error", str(e))
+            
+        finally:
+            # Cleanup and close
+            self.cleanup_camera()
+            
+    def cleanup_camera(self):
+        """Clean up camera resources"""
+        try:
+            # Stop camera thread, it releases the camera on its way out
+            self.is_running = False
+            if self.voter is not None:
+                self.voter.stop()
+            if self._pump_id is not None:
+                self.after_cancel(self._pump_id)
+                self._pump_id = None
+            
+            # Release camera here only if the thread never started
+            if self.camera_thread is None or not self.camera_thread.is_alive():
+                self._close_source()
+                
+            # Destroy window if it exists
+            try:
+                self.destroy()
+            except:
+                pass
+                
+        except Exception as e:
+            print(f"Error cleaning up camera: {e}")
+            
+    def on_closing(self):
+        """Handle window close event"""
+        self.cleanup_camera()
\ No newline at end of file
@@ -0,0 +1,402 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from path_utils import get_data_directory, get_database_path
+
+SCHEMA_VERSION = 2
+
+# Emotion names as stored by the older JSON files
+EMOTION_NUMBERS = {'neutral': 1, 'happy': 2, 'sad': 3}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS song_tags (
+    song_id INTEGER NOT NULL REFERENCES songs(id),
+    emotion_number INTEGER NOT NULL,
+    PRIMARY KEY (song_id, emotion_number)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_song_tags_emotion ON song_tags(emotion_number, song_id);
+CREATE TABLE IF NOT EXISTS plays (
+    id INTEGER PRIMARY KEY,
+    song_id INTEGER NOT NULL REFERENCES songs(id),
+    title TEXT,
+    played_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    time TEXT NOT NULL,
+    event_id TEXT
+);
+CREATE TABLE IF NOT EXISTS play_days (
+    day TEXT NOT NULL,
+    song_id INTEGER NOT NULL REFERENCES songs(id),
+    title TEXT,
+    time TEXT NOT NULL,
+    play_count INTEGER NOT NULL,
+    last_played REAL NOT NULL,
+    PRIMARY KEY (day, song_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_play_days_last_played ON play_days(last_played);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class DataStore:
+    """Single SQLite database (WAL mode) for song tags, play history and settings.
+
+    Plays are an append-only log (one row per play, deduplicated by event
+    ID) with a per-day, per-song rollup kept up to date in the same
+    transaction, so history and "played N times today" never scan the log.
+
+    One connection is shared between the UI thread and the background
+    writers, guarded by a lock. The first open imports the older JSON files
+    (song_tags.json, emotions.json, settings.json, history.json) once.
+    """
+
+    def __init__(self, db_file=None, migrate=True):
+        self.db_file = db_file or get_database_path()
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        if migrate and self._get_meta('legacy_migrated') is None:
+            self.migrate_legacy_files(get_data_directory())
+
+    def close(self):
+        with self._lock:
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                print(f"Error checkpointing database: {e}")
+            self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one atomic commit"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def checkpoint(self):
+        """Fold the write-ahead log back into the database file"""
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def _get_meta(self, key):
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def _upgrade_schema(self):
+        """Bring a database written by an older version up to SCHEMA_VERSION"""
+        version = int(self._get_meta('schema_version') or 1)
+        if version >= SCHEMA_VERSION:
+            return
+        with self.transaction() as conn:
+            if version < 2:
+                # Version 2: idempotent play event IDs and per-day rollups
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(plays)")]
+                if 'event_id' not in columns:
+                    conn.execute("ALTER TABLE plays ADD COLUMN event_id TEXT")
+                # History is read from the rollups now, so the log only needs its primary key
+                conn.execute("DROP INDEX IF EXISTS idx_plays_day_song")
+                conn.execute("DROP INDEX IF EXISTS idx_plays_played_at")
+                conn.execute("DELETE FROM play_days")
+                conn.execute(
+                    "INSERT INTO play_days (day, song_id, title, time, play_count, last_played) "
+                    "SELECT day, song_id, title, time, COUNT(*), MAX(played_at) FROM plays "
+                    "GROUP BY day, song_id"
+                )
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_plays_event ON plays(event_id)")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),)
+            )
+
+    @staticmethod
+    def _song_id(conn, path):
+        """Get the ID of a song path, adding it if needed (inside a transaction)"""
+        conn.execute("INSERT OR IGNORE INTO songs (path) VALUES (?)", (path,))
+        return conn.execute("SELECT id FROM songs WHERE path = ?", (path,)).fetchone()[0]
+
+    # Song tags
+
+    def get_song_tags(self, paths):
+        """Get {path: [emotion numbers]} for the given paths that have tags"""
+        paths = list(paths)
+        tags = {}
+        # Stay under SQLite's bound parameter limit
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.query(
+                "SELECT s.path, t.emotion_number FROM songs s "
+                "JOIN song_tags t ON t.song_id = s.id "
+                f"WHERE s.path IN ({placeholders})",
+                chunk
+            )
+            for path, number in rows:
+                tags.setdefault(path, []).append(number)
+        return tags
+
+    def get_all_song_tags(self):
+        """Get {path: [emotion numbers]} for every tagged song"""
+        tags = {}
+        rows = self.query(
+            "SELECT s.path, t.emotion_number FROM songs s JOIN song_tags t ON t.song_id = s.id"
+        )
+        for path, number in rows:
+            tags.setdefault(path, []).append(number)
+        return tags
+
+    def get_song_emotions(self, path):
+        return self.get_song_tags([path]).get(path, [])
+
+    def get_paths_with_emotion(self, emotion_number):
+        rows = self.query(
+            "SELECT s.path FROM song_tags t JOIN songs s ON s.id = t.song_id "
+            "WHERE t.emotion_number = ?",
+            (emotion_number,)
+        )
+        return [row[0] for row in rows]
+
+    def set_song_tags_many(self, items):
+        """Replace the tags of many songs in one transaction; items are (path, [numbers]) pairs"""
+        with self.transaction() as conn:
+            for path, numbers in items:
+                song_id = self._song_id(conn, path)
+                conn.execute("DELETE FROM song_tags WHERE song_id = ?", (song_id,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO song_tags (song_id, emotion_number) VALUES (?, ?)",
+                    [(song_id, number) for number in numbers or ()]
+                )
+            self._bump_tag_version(conn)
+
+    @staticmethod
+    def _bump_tag_version(conn):
+        # Part of the tag-writing transaction, so readers never see new tags with an old version
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('tag_version', '0')")
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'tag_version'")
+
+    def get_tag_version(self):
+        """Get a number that changes whenever any song's tags are written"""
+        return int(self._get_meta('tag_version') or 0)
+
+    # Play history
+
+    def add_play(self, path, title, played_at=None, event_id=None):
+        """Append a play; a repeated event_id is ignored. Returns True if the play was new"""
+        played_at = played_at or datetime.now()
+        with self.transaction() as conn:
+            song_id = self._song_id(conn, path)
+            return self._insert_play(conn, song_id, title, played_at, event_id)
+
+    @staticmethod
+    def _insert_play(conn, song_id, title, played_at, event_id=None):
+        day = played_at.strftime('%Y-%m-%d')
+        time = played_at.strftime('%H:%M:%S')
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO plays (song_id, title, played_at, day, time, event_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (song_id, title, played_at.timestamp(), day, time, event_id)
+        )
+        if cursor.rowcount == 0:
+            return False
+        # Keep the per-day rollup in step with the log; a play arriving
+        # out of order only adds to the count
+        conn.execute(
+            "INSERT INTO play_days (day, song_id, title, time, play_count, last_played) "
+            "VALUES (?, ?, ?, ?, 1, ?) "
+            "ON CONFLICT (day, song_id) DO UPDATE SET play_count = play_count + 1, "
+            "title = CASE WHEN excluded.last_played >= last_played THEN excluded.title ELSE title END, "
+            "time = CASE WHEN excluded.last_played >= last_played THEN excluded.time ELSE time END, "
+            "last_played = max(last_played, excluded.last_played)",
+            (day, song_id, title, time, played_at.timestamp())
+        )
+        return True
+
+    def get_play_count(self, path, day=None):
+        """Get how many times a song was played on a day (default today)"""
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        rows = self.query(
+            "SELECT d.play_count FROM play_days d JOIN songs s ON s.id = d.song_id "
+            "WHERE d.day = ? AND s.path = ?",
+            (day, path)
+        )
+        return rows[0][0] if rows else 0
+
+    def count_plays(self):
+        return self.query("SELECT COUNT(*) FROM plays")[0][0]
+
+    def get_plays_after(self, play_id):
+        """Get (id, song_id, played_at) rows of plays logged after play_id, in log order"""
+        return self.query(
+            "SELECT id, song_id, played_at FROM plays WHERE id > ? ORDER BY id", (play_id,)
+        )
+
+    def get_last_play_id(self):
+        return self.query("SELECT COALESCE(MAX(id), 0) FROM plays")[0][0]
+
+    def get_song_paths(self, song_ids):
+        """Get {song id: path} for the given song IDs"""
+        song_ids = list(song_ids)
+        paths = {}
+        for start in range(0, len(song_ids), 500):
+            chunk = song_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            paths.update(self.query(f"SELECT id, path FROM songs WHERE id IN ({placeholders})", chunk))
+        return paths
+
+    def get_song_tag_rows(self):
+        """Get every (song_id, emotion_number) pair"""
+        return self.query("SELECT song_id, emotion_number FROM song_tags")
+
+    def get_recent_history(self, limit=100):
+        """Get the latest play of each song per day, oldest first, with that day's play count"""
+        rows = self.query(
+            "SELECT s.path, d.title, d.day, d.time, d.play_count FROM play_days d "
+            "JOIN songs s ON s.id = d.song_id ORDER BY d.last_played DESC LIMIT ?",
+            (limit,)
+        )
+        return [
+            {'path': path, 'title': title, 'date': day, 'time': time, 'play_count': count}
+            for path, title, day, time, count in reversed(rows)
+        ]
+
+    def prune_plays(self, keep):
+        """Drop all but the newest keep plays from the log; the per-day rollups are kept"""
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM plays ORDER BY id DESC LIMIT 1 OFFSET ?", (keep,)
+            ).fetchone()
+            if row is None:
+                return 0
+            return conn.execute("DELETE FROM plays WHERE id <= ?", (row[0],)).rowcount
+
+    def clear_plays(self):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM plays")
+            conn.execute("DELETE FROM play_days")
+
+    # Settings
+
+    def load_settings(self):
+        settings = {}
+        for key, value in self.query("SELECT key, value FROM settings"):
+            try:
+                settings[key] = json.loads(value)
+            except ValueError:
+                print(f"Ignoring unreadable setting {key}")
+        return settings
+
+    def save_settings(self, settings):
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in settings.items()]
+            )
+
+    # One-time import of the JSON files used before the database
+
+    def migrate_legacy_files(self, data_dir):
+        """Import song_tags.json (+ journal), emotions.json, settings.json and history.json"""
+        tags = {}
+        try:
+            tags.update(self._read_legacy_emotions(os.path.join(data_dir, "emotions.json")))
+            settings = self._read_json(os.path.join(data_dir, "settings.json")) or {}
+            for path, emotion in (settings.pop('emotion_tags', None) or {}).items():
+                if isinstance(emotion, str) and emotion.lower() in EMOTION_NUMBERS:
+                    tags[path] = [EMOTION_NUMBERS[emotion.lower()]]
+            tags.update(self._read_legacy_song_tags(data_dir))
+            history = self._read_json(os.path.join(data_dir, "history.json")) or {}
+
+            with self.transaction() as conn:
+                for path, numbers in tags.items():
+                    song_id = self._song_id(conn, path)
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO song_tags (song_id, emotion_number) VALUES (?, ?)",
+                        [(song_id, number) for number in numbers]
+                    )
+                self._bump_tag_version(conn)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in settings.items()]
+                )
+                for entry in history.get('history', []):
+                    self._migrate_history_entry(conn, entry)
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated', ?)",
+                    (datetime.now().isoformat(),)
+                )
+            print(f"Migrated {len(tags)} song tags and {len(history.get('history', []))} history entries")
+        except Exception as e:
+            print(f"Error migrating legacy data files: {e}")
+
+    def _migrate_history_entry(self, conn, entry):
+        try:
+            played_at = datetime.strptime(f"{entry['date']} {entry['time']}", '%Y-%m-%d %H:%M:%S')
+        except (KeyError, ValueError):
+            return
+        song_id = self._song_id(conn, entry['path'])
+        # The old format folded a day's plays into one entry with a count
+        for _ in range(max(1, int(entry.get('play_count', 1)))):
+            self._insert_play(conn, song_id, entry.get('title'), played_at)
+
+    @staticmethod
+    def _read_json(file_path):
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            return None
+
+    def _read_legacy_emotions(self, file_path):
+        """emotions.json maps a song path to an emotion name"""
+        tags = {}
+        for path, emotion in (self._read_json(file_path) or {}).items():
+            if isinstance(emotion, str) and emotion.lower() in EMOTION_NUMBERS:
+                tags[path] = [EMOTION_NUMBERS[emotion.lower()]]
+        return tags
+
+    def _read_legacy_song_tags(self, data_dir):
+        """song_tags.json snapshot plus the song_tags.journal written on top of it"""
+        tags = {}
+        for path, entry in (self._read_json(os.path.join(data_dir, "song_tags.json")) or {}).items():
+            tags[path] = list(entry.get('emotion_numbers', []))
+        journal_file = os.path.join(data_dir, "song_tags.journal")
+        if os.path.exists(journal_file):
+            with open(journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    entry = record['tags']
+                    tags[record['path']] = list(entry['emotion_numbers']) if entry else []
+        return tags
@@ -0,0 +1,354 @@
+import math
+import threading
+import time
+from collections import deque
+from data_store import EMOTION_NUMBERS
+
+# FaceMesh landmark indices used by the classifier
+FOREHEAD, CHIN = 10, 152
+LEFT_CHEEK, RIGHT_CHEEK = 234, 454
+MOUTH_LEFT, MOUTH_RIGHT = 61, 291
+UPPER_LIP, LOWER_LIP = 13, 14
+LEFT_BROW_INNER, RIGHT_BROW_INNER = 55, 285
+LEFT_EYELID, RIGHT_EYELID = 159, 386
+
+
+class EmotionEngine:
+    """Classifies the emotion on a face in a camera frame using MediaPipe FaceMesh.
+
+    The FaceMesh model (and OpenCV/MediaPipe themselves) are loaded on the
+    first inference, or earlier with warm_up(), and then kept for every
+    later detection. FaceMesh is not thread-safe, so inferences are
+    serialized. The classifier scores a few landmark distances (mouth
+    corner lift, mouth width, inner brow height) and turns the scores into
+    probabilities for neutral, happy and sad.
+
+    By default FaceMesh runs in tracking mode: after finding a face it only
+    searches the region around the previous frame's landmarks and runs the
+    face detector again when their confidence drops below
+    min_tracking_confidence. That only pays off when one engine sees the
+    consecutive frames of one video, uncropped; unrelated still images
+    should use static_image_mode=True, which detects the face every time.
+    """
+
+    # Heuristic weights for the landmark features, tuned on webcam captures
+    SMILE_WEIGHT = 40.0
+    WIDTH_WEIGHT = 8.0
+    WIDTH_AT_REST = 0.38
+    BROW_WEIGHT = 20.0
+    BROW_AT_REST = 0.06
+    NEUTRAL_SCORE = 0.5
+
+    # Frames wider than this are shrunk before landmark detection
+    MAX_WIDTH = 640
+
+    def __init__(self, min_detection_confidence=0.5, static_image_mode=False, min_tracking_confidence=0.5):
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        # True for unrelated still images; False tracks the face across video frames
+        self.static_image_mode = static_image_mode
+        self._face_mesh = None
+        self._cv2 = None
+        self._load_lock = threading.Lock()
+        self._infer_lock = threading.Lock()
+        self.load_time = None   # seconds it took to build the model, once loaded
+
+    def is_loaded(self):
+        return self._face_mesh is not None
+
+    def _load(self):
+        """Import OpenCV and MediaPipe and build the FaceMesh model, once"""
+        if self._face_mesh is not None:
+            return
+        with self._load_lock:
+            if self._face_mesh is not None:
+                return
+            started = time.perf_counter()
+            import cv2
+            import mediapipe as mp
+            if not hasattr(mp, 'solutions'):
+                # Newer releases dropped the legacy solutions API (see requirements.txt)
+                raise ImportError(f"mediapipe {getattr(mp, '__version__', '')} has no FaceMesh solution")
+            self._cv2 = cv2
+            self._face_mesh = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=self.static_image_mode,
+                max_num_faces=1,
+                refine_landmarks=False,
+                min_detection_confidence=self.min_detection_confidence,
+                min_tracking_confidence=self.min_tracking_confidence
+            )
+            self.load_time = time.perf_counter() - started
+            print(f"Emotion model loaded in {self.load_time * 1000:.0f} ms")
+
+    def warm_up(self, background=True):
+        """Load the model (in a background thread by default) so the first detection is fast"""
+        def load():
+            try:
+                self._load()
+            except Exception as e:
+                print(f"Error loading emotion model: {e}")
+        if not background:
+            load()
+            return None
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        return thread
+
+    def infer(self, frame):
+        """Classify a BGR frame; returns (emotion or None if no face, confidence, timings in ms)"""
+        result = self.analyze(frame)
+        return result['emotion'], result['confidence'], result['timings']
+
+    def analyze(self, frame):
+        """Like infer(), but as a dict that also has the per-emotion probabilities and features"""
+        # Zero once the model is loaded; includes waiting for a warm-up in progress
+        started = time.perf_counter()
+        self._load()
+        timings = {'model_load': (time.perf_counter() - started) * 1000}
+        cv2 = self._cv2
+
+        started = time.perf_counter()
+        height, width = frame.shape[:2]
+        if width > self.MAX_WIDTH:
+            scale = self.MAX_WIDTH / width
+            frame = cv2.resize(frame, (self.MAX_WIDTH, int(height * scale)), interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb.flags.writeable = False
+        timings['preprocess'] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with self._infer_lock:
+            output = self._face_mesh.process(rgb)
+        timings['landmarks'] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        features = probabilities = None
+        if output.multi_face_landmarks:
+            features = self.features(output.multi_face_landmarks[0].landmark)
+            probabilities = self.probabilities(features)
+        timings['classify'] = (time.perf_counter() - started) * 1000
+
+        if probabilities is None:
+            return {'emotion': None, 'confidence': 0.0, 'probabilities': None, 'features': None, 'timings': timings}
+        emotion = max(probabilities, key=probabilities.get)
+        return {
+            'emotion': emotion,
+            'confidence': probabilities[emotion],
+            'probabilities': probabilities,
+            'features': features,
+            'timings': timings
+        }
+
+    def classify(self, landmarks):
+        """Turn FaceMesh landmarks into {emotion: probability}"""
+        return self.probabilities(self.features(landmarks))
+
+    def features(self, landmarks):
+        """Measure the landmark features the classifier scores, relative to the face size"""
+        def point(index):
+            return landmarks[index].x, landmarks[index].y
+
+        face_height = math.dist(point(FOREHEAD), point(CHIN)) or 1e-6
+        face_width = math.dist(point(LEFT_CHEEK), point(RIGHT_CHEEK)) or 1e-6
+
+        # Positive when the mouth corners sit above the middle of the lips (y grows downwards)
+        lip_middle = (point(UPPER_LIP)[1] + point(LOWER_LIP)[1]) / 2
+        corners = (point(MOUTH_LEFT)[1] + point(MOUTH_RIGHT)[1]) / 2
+        corner_lift = (lip_middle - corners) / face_height
+        mouth_width = math.dist(point(MOUTH_LEFT), point(MOUTH_RIGHT)) / face_width
+        brow_raise = ((point(LEFT_EYELID)[1] - point(LEFT_BROW_INNER)[1]) +
+                      (point(RIGHT_EYELID)[1] - point(RIGHT_BROW_INNER)[1])) / 2 / face_height
+        return {'corner_lift': corner_lift, 'mouth_width': mouth_width, 'brow_raise': brow_raise}
+
+    def probabilities(self, features):
+        """Score the features and softmax the scores into {emotion: probability}"""
+        corner_lift = features['corner_lift']
+        scores = {
+            'neutral': self.NEUTRAL_SCORE,
+            'happy': self.SMILE_WEIGHT * corner_lift + self.WIDTH_WEIGHT * (features['mouth_width'] - self.WIDTH_AT_REST),
+            'sad': -self.SMILE_WEIGHT * corner_lift + self.BROW_WEIGHT * (features['brow_raise'] - self.BROW_AT_REST)
+        }
+        top = max(scores.values())
+        exps = {emotion: math.exp(score - top) for emotion, score in scores.items()}
+        total = sum(exps.values())
+        return {emotion: value / total for emotion, value in exps.items()}
+
+    def close(self):
+        with self._infer_lock:
+            if self._face_mesh is not None:
+                self._face_mesh.close()
+                self._face_mesh = None
+
+
+class EmotionVoter:
+    """Classifies camera frames on a worker thread and votes over the recent ones.
+
+    submit() only parks a frame in a single slot, the latest one wins, so
+    a slow model skips frames instead of falling behind. The worker keeps
+    the probabilities of the last frames with a face (at most WINDOW, none
+    older than MAX_AGE seconds) and vote() adds them up, each frame
+    weighted by its own confidence, so one blink or blurry frame can't
+    decide the result. Run it while the countdown is on screen and the
+    vote is ready the moment the countdown ends.
+    """
+
+    WINDOW = 15
+    MAX_AGE = 2.5
+
+    def __init__(self, engine, window=None, max_age=None):
+        self.engine = engine
+        self.max_age = max_age or self.MAX_AGE
+        self.votes = deque(maxlen=window or self.WINDOW)   # (time, probabilities, confidence)
+        self.analyzed = 0
+        self.skipped = 0
+        self._pending = None
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, frame):
+        """Offer a BGR frame; replaces one the worker hasn't picked up yet"""
+        with self._condition:
+            if not self._running:
+                return
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = frame
+            self._condition.notify()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                frame, self._pending = self._pending, None
+            try:
+                result = self.engine.analyze(frame)
+            except Exception as e:
+                print(f"Error classifying frame: {e}")
+                continue
+            with self._condition:
+                self.analyzed += 1
+                if result['probabilities'] is not None:
+                    self.votes.append((time.monotonic(), result['probabilities'], result['confidence']))
+                self._condition.notify_all()
+
+    def vote(self):
+        """Combine the recent frames into {'emotion', 'confidence', 'probabilities', 'frames', 'faces'}"""
+        with self._condition:
+            oldest = time.monotonic() - self.max_age
+            recent = [(probabilities, confidence) for when, probabilities, confidence in self.votes if when >= oldest]
+            analyzed = self.analyzed
+        return self.combine(recent, analyzed)
+
+    @staticmethod
+    def combine(recent, frames):
+        """Confidence-weighted vote over [(probabilities, confidence)] of frames with a face"""
+        scores = {}
+        for probabilities, confidence in recent:
+            for emotion, probability in probabilities.items():
+                scores[emotion] = scores.get(emotion, 0.0) + probability * confidence
+        total = sum(scores.values())
+        if not total:
+            return {'emotion': None, 'confidence': 0.0, 'probabilities': None, 'frames': frames, 'faces': 0}
+        probabilities = {emotion: score / total for emotion, score in scores.items()}
+        emotion = max(probabilities, key=probabilities.get)
+        return {
+            'emotion': emotion,
+            'confidence': probabilities[emotion],
+            'probabilities': probabilities,
+            'frames': frames,
+            'faces': len(recent)
+        }
+
+    def finish(self, wait=0.5):
+        """Stop and vote; waits up to wait seconds only if no frame has been classified yet"""
+        with self._condition:
+            deadline = time.monotonic() + wait
+            while self.analyzed == 0 and self._running and time.monotonic() < deadline:
+                self._condition.wait(deadline - time.monotonic())
+        self.stop()
+        return self.vote()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify_all()
+
+
+class EmotionManager:
+    """Emotion detection for the camera flow.
+
+    One EmotionEngine is created with the manager and reused by every
+    detection, so only the first one pays for loading the model. Song
+    tags are read and written through the PlaylistManager only.
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine or EmotionEngine()
+        self.last_result = None
+
+    def warm_up(self):
+        """Load the model in the background"""
+        return self.engine.warm_up()
+
+    def detect(self, frame):
+        """Run the engine on a BGR frame and remember the result"""
+        emotion, confidence, timings = self.engine.infer(frame)
+        self.last_result = (emotion, confidence, timings)
+        stages = ", ".join(f"{stage} {ms:.0f} ms" for stage, ms in timings.items())
+        print(f"Detected emotion: {emotion} ({confidence:.2f}) - {stages}")
+        return emotion, confidence
+
+    def create_voter(self):
+        """Start an EmotionVoter on the shared engine"""
+        return EmotionVoter(self.engine).start()
+
+    def process_vote(self, vote, root, playlist_manager, language_manager, on_play=None):
+        """Show recommendations for the result of EmotionVoter.finish()"""
+        self.last_result = (vote['emotion'], vote['confidence'], {})
+        print(f"Detected emotion: {vote['emotion']} ({vote['confidence']:.2f}) - "
+              f"voted over {vote['faces']} of {vote['frames']} frames")
+        self.show_recommendations(vote['emotion'], root, playlist_manager, language_manager, on_play)
+        return vote['emotion']
+
+    def process_frame(self, frame, root, playlist_manager, language_manager, on_play=None):
+        """Detect the emotion in a BGR frame and show matching song recommendations"""
+        emotion, confidence = self.detect(frame)
+        self.show_recommendations(emotion, root, playlist_manager, language_manager, on_play)
+        return emotion
+
+    def process_image(self, image_path, root, playlist_manager, language_manager, on_play=None):
+        """Same as process_frame() for an image file"""
+        import cv2
+        frame = cv2.imread(image_path)
+        if frame is None:
+            raise Exception(f"Could not read image: {image_path}")
+        return self.process_frame(frame, root, playlist_manager, language_manager, on_play)
+
+    def show_recommendations(self, emotion, root, playlist_manager, language_manager, on_play=None):
+        if emotion is None:
+            from tkinter import messagebox
+            messagebox.showinfo(
+                language_manager.get_text("emotion_detection"),
+                language_manager.get_text("no_face_detected")
+            )
+            return None
+        from recommendation_window import RecommendationWindow
+        songs = playlist_manager.get_recommended_songs(emotion)
+        return RecommendationWindow(
+            root, songs, playlist_manager, language_manager,
+            EMOTION_NUMBERS.get(emotion, 0), on_play=on_play
+        )
+
+    def close(self):
+        self.engine.close()
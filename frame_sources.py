@@ -0,0 +1,196 @@
+import os
+import time
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def preview_frame(frame, size):
+    """Shrink a BGR frame to size (width, height) and convert it to RGB for display"""
+    import cv2
+    preview = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(preview, cv2.COLOR_BGR2RGB)
+
+
+class FrameSource:
+    """Where the detection pipeline gets its BGR frames from.
+
+    open() prepares the source, read() returns the next frame or None when
+    there are no more (or the device failed), close() releases it. Sources
+    are context managers and iterable. OpenCV is only imported by the
+    sources that need it, so the module loads without the vision stack.
+    """
+
+    # Frames per second to pace at, None to deliver frames as fast as they are read
+    fps = None
+
+    def open(self):
+        return self
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+
+class CameraSource(FrameSource):
+    """Live camera through cv2.VideoCapture"""
+
+    def __init__(self, index=0, width=640, height=480):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.cap = None
+
+    def open(self):
+        import cv2
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            self.close()
+            raise Exception("Could not open camera")
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return self
+
+    def read(self):
+        if self.cap is None or not self.cap.isOpened():
+            return None
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def close(self):
+        cap, self.cap = self.cap, None
+        if cap is not None:
+            cap.release()
+
+
+class VideoFileSource(CameraSource):
+    """Frames of a recorded clip, optionally paced at the clip's frame rate"""
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.cap = None
+        self._next_frame_at = None
+
+    def open(self):
+        import cv2
+        if not os.path.exists(self.path):
+            raise Exception(f"Video not found: {self.path}")
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            self.close()
+            raise Exception(f"Could not open video: {self.path}")
+        if self.realtime:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        return self
+
+    def read(self):
+        frame = super().read()
+        if frame is None and self.loop and self.cap is not None:
+            import cv2
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            frame = super().read()
+        if frame is not None and self.fps:
+            _pace(self)
+        return frame
+
+
+class ImageDirectorySource(FrameSource):
+    """Every image in a directory, in name order"""
+
+    def __init__(self, directory, fps=None):
+        self.directory = directory
+        self.fps = fps
+        self.paths = []
+        self._index = 0
+        self._next_frame_at = None
+
+    def open(self):
+        self.paths = sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._index = 0
+        return self
+
+    def read(self):
+        import cv2
+        while self._index < len(self.paths):
+            path = self.paths[self._index]
+            self._index += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                if self.fps:
+                    _pace(self)
+                return frame
+            print(f"Skipping unreadable image: {path}")
+        return None
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames (a moving gradient with noise) for load tests without any media"""
+
+    def __init__(self, count=300, width=640, height=480, fps=None, seed=0):
+        self.count = count
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.seed = seed
+        self._produced = 0
+        self._next_frame_at = None
+
+    def open(self):
+        import numpy as np
+        self._rng = np.random.default_rng(self.seed)
+        ramp = np.linspace(0, 255, self.width, dtype=np.float32)
+        self._base = np.broadcast_to(ramp, (self.height, self.width))
+        self._produced = 0
+        return self
+
+    def read(self):
+        import numpy as np
+        if self._produced >= self.count:
+            return None
+        shift = (self._produced * 7) % self.width
+        channel = np.roll(self._base, shift, axis=1)
+        noise = self._rng.integers(0, 24, (self.height, self.width), dtype=np.uint8)
+        gray = (channel.astype(np.uint8) // 2) + noise
+        self._produced += 1
+        if self.fps:
+            _pace(self)
+        return np.dstack((gray, np.flipud(gray), gray[:, ::-1]))
+
+
+def _pace(source):
+    """Sleep so a source delivers at most source.fps frames per second"""
+    now = time.perf_counter()
+    if source._next_frame_at is not None and now < source._next_frame_at:
+        time.sleep(source._next_frame_at - now)
+        now = source._next_frame_at
+    source._next_frame_at = now + 1.0 / source.fps
+
+
+def open_source(video=None, images=None, synthetic=None, camera=None, realtime=False):
+    """Build the source picked by command line options (camera 0 when none is given)"""
+    if video:
+        return VideoFileSource(video, realtime=realtime)
+    if images:
+        return ImageDirectorySource(images, fps=30 if realtime else None)
+    if synthetic:
+        return SyntheticSource(synthetic, fps=30 if realtime else None)
+    return CameraSource(camera or 0)
@@ -0,0 +1,265 @@
+"""Run the emotion detection pipeline without any window.
+
+Frames come from a FrameSource (camera, recorded clip, image directory or
+generated frames) and go through the same stages as the camera dialog:
+preview conversion, FaceMesh inference, the confidence-weighted vote and
+the song recommendation. Every stage is timed per frame and the report
+has p50/p95/p99 latencies and the frames per second the whole loop ran at.
+FaceMesh tracks the face from frame to frame unless --static is given,
+which runs its face detector on every frame; --compare runs the source
+both ways and prints the per-frame inference time of each.
+--music-folder turns the detections into recommendations from a
+temporary copy of the app's playlist snapshot, so a run never writes to
+the Data folder.
+
+    python headless_runner.py --video clip.mp4 --json report.json
+    python headless_runner.py --video clip.mp4 --compare
+    python headless_runner.py --images Data/Temp_Image
+    python headless_runner.py --synthetic 300
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from collections import deque
+from frame_sources import open_source, preview_frame
+from emotion_manager import EmotionEngine, EmotionVoter
+
+# 'inference' is preprocess + landmarks + classify of one frame
+STAGES = ('capture', 'preview', 'preprocess', 'landmarks', 'classify', 'inference', 'vote', 'recommend')
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers, 0.0 for an empty one"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+class HeadlessRunner:
+    """Drives capture -> inference -> vote -> recommend over a frame source.
+
+    Frames are classified one by one on the calling thread, so the
+    timings are those of the pipeline and not of thread scheduling. Like
+    the countdown in the camera dialog, every detect_every frames the
+    last window of classified frames is voted on and, when a playlist
+    manager is given, turned into recommendations.
+    """
+
+    PREVIEW_SIZE = (600, 400)
+
+    def __init__(self, source, engine=None, playlist_manager=None, detect_every=90, window=None):
+        self.source = source
+        self.engine = engine or EmotionEngine()
+        self.playlist_manager = playlist_manager
+        self.detect_every = detect_every
+        self.window = window or EmotionVoter.WINDOW
+        self.timings = {stage: [] for stage in STAGES}
+        self.detections = []
+        self.frames = 0
+        self.faces = 0
+        self.elapsed = 0.0
+
+    def run(self, max_frames=None):
+        """Process the source until it runs out (or max_frames) and return report()"""
+        self.engine.warm_up(background=False)
+        recent = deque(maxlen=self.window)
+        since_detection = 0
+        started = time.perf_counter()
+        with self.source:
+            while max_frames is None or self.frames < max_frames:
+                stage_started = time.perf_counter()
+                frame = self.source.read()
+                if frame is None:
+                    break
+                self._record('capture', stage_started)
+
+                stage_started = time.perf_counter()
+                preview_frame(frame, self.PREVIEW_SIZE)
+                self._record('preview', stage_started)
+
+                result = self.engine.analyze(frame)
+                inference = 0.0
+                for stage in ('preprocess', 'landmarks', 'classify'):
+                    self.timings[stage].append(result['timings'][stage])
+                    inference += result['timings'][stage]
+                self.timings['inference'].append(inference)
+                self.frames += 1
+                if result['probabilities'] is not None:
+                    self.faces += 1
+                    recent.append((result['probabilities'], result['confidence']))
+
+                since_detection += 1
+                if since_detection >= self.detect_every:
+                    self._detect(recent, since_detection)
+                    recent.clear()
+                    since_detection = 0
+        if since_detection:
+            self._detect(recent, since_detection)
+        self.elapsed = time.perf_counter() - started
+        return self.report()
+
+    def _detect(self, recent, frames):
+        stage_started = time.perf_counter()
+        vote = EmotionVoter.combine(list(recent), frames)
+        self._record('vote', stage_started)
+
+        songs = []
+        if self.playlist_manager is not None and vote['emotion'] is not None:
+            stage_started = time.perf_counter()
+            songs = self.playlist_manager.get_recommended_songs(vote['emotion'])
+            self._record('recommend', stage_started)
+
+        self.detections.append({
+            'frame': self.frames,
+            'emotion': vote['emotion'],
+            'confidence': round(vote['confidence'], 3),
+            'faces': vote['faces'],
+            'frames': frames,
+            'songs': [song['title'] for song in songs]
+        })
+
+    def _record(self, stage, started):
+        self.timings[stage].append((time.perf_counter() - started) * 1000)
+
+    def report(self):
+        """Get the run as a dict: per-stage latency percentiles (ms), fps and the detections"""
+        stages = {}
+        for stage, values in self.timings.items():
+            if not values:
+                continue
+            stages[stage] = {
+                'count': len(values),
+                'mean': round(sum(values) / len(values), 3),
+                'p50': round(percentile(values, 50), 3),
+                'p95': round(percentile(values, 95), 3),
+                'p99': round(percentile(values, 99), 3),
+                'max': round(max(values), 3)
+            }
+        return {
+            'source': type(self.source).__name__,
+            'mode': 'static' if self.engine.static_image_mode else 'tracking',
+            'frames': self.frames,
+            'faces': self.faces,
+            'seconds': round(self.elapsed, 3),
+            'fps': round(self.frames / self.elapsed, 2) if self.elapsed else 0.0,
+            'model_load_ms': round((self.engine.load_time or 0) * 1000, 1),
+            'stages': stages,
+            'detections': self.detections
+        }
+
+    @staticmethod
+    def format_report(report):
+        lines = [
+            f"{report['source']} ({report['mode']}): {report['frames']} frames ({report['faces']} with a face) "
+            f"in {report['seconds']:.2f} s, {report['fps']:.1f} fps, model load {report['model_load_ms']:.0f} ms",
+            f"{'stage':<12} {'count':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+        ]
+        for stage, row in report['stages'].items():
+            lines.append(f"{stage:<12} {row['count']:>6} {row['mean']:>8.2f} {row['p50']:>8.2f} "
+                         f"{row['p95']:>8.2f} {row['p99']:>8.2f} {row['max']:>8.2f}")
+        for detection in report['detections']:
+            lines.append(f"frame {detection['frame']:>6}: {detection['emotion']} "
+                         f"({detection['confidence']:.2f}, {detection['faces']}/{detection['frames']} faces) "
+                         f"{len(detection['songs'])} songs")
+        return "\n".join(lines)
+
+
+def compare_reports(before, after):
+    """Per-frame inference time of a static-mode run against a tracking-mode run of the same source"""
+    lines = [f"{'inference ms':<14} {'static':>12} {'tracking':>10} {'change':>8}"]
+    for key in ('mean', 'p50', 'p95', 'p99'):
+        old = before['stages']['inference'][key]
+        new = after['stages']['inference'][key]
+        change = (new - old) / old * 100 if old else 0.0
+        lines.append(f"{key:<14} {old:>12.2f} {new:>10.2f} {change:>+7.0f}%")
+    lines.append(f"{'fps':<14} {before['fps']:>12.1f} {after['fps']:>10.1f}")
+    return "\n".join(lines)
+
+
+def load_playlist(folder, data_dir):
+    """A PlaylistManager over data_dir filled from the saved snapshot of folder, or None if there is none.
+
+    Call close_playlist() on it when done.
+    """
+    from playlist import PlaylistManager
+    playlist_manager = PlaylistManager(data_dir=data_dir)
+    if playlist_manager.load_snapshot(folder):
+        return playlist_manager
+    close_playlist(playlist_manager)
+    print(f"No playlist snapshot for {folder}, recommendations are skipped")
+    return None
+
+
+def close_playlist(playlist_manager):
+    playlist_manager.shutdown()
+    playlist_manager.data_store.close()
+
+
+def copy_snapshot(data_dir):
+    """Copy the app's playlist snapshot into data_dir, so a run never writes to the Data folder"""
+    from path_utils import get_playlist_snapshot_path
+    snapshot_file = get_playlist_snapshot_path()
+    if os.path.exists(snapshot_file):
+        shutil.copy2(snapshot_file, data_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--camera', type=int, help="camera index (the default source is camera 0)")
+    group.add_argument('--video', help="recorded clip")
+    group.add_argument('--images', help="directory of images")
+    group.add_argument('--synthetic', type=int, metavar='FRAMES', help="generated frames, no face in them")
+    parser.add_argument('--realtime', action='store_true', help="pace recorded sources at their frame rate")
+    parser.add_argument('--max-frames', type=int, help="stop after this many frames (needed for a camera)")
+    parser.add_argument('--detect-every', type=int, default=90, help="frames per detection (default 90, 3 s at 30 fps)")
+    parser.add_argument('--static', action='store_true', help="detect the face on every frame instead of tracking it")
+    parser.add_argument('--compare', action='store_true', help="run with --static, then tracking, and compare")
+    parser.add_argument('--music-folder', help="recommend from the saved playlist snapshot of this folder")
+    parser.add_argument('--data-dir', help="read the snapshot from this directory instead of a temporary copy of Data's")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    source = open_source(args.video, args.images, args.synthetic, args.camera, args.realtime)
+    temp_dir = None
+    playlist_manager = None
+    reports = []
+    try:
+        if args.music_folder:
+            data_dir = args.data_dir
+            if data_dir is None:
+                data_dir = temp_dir = tempfile.mkdtemp(prefix='kaisar_headless_')
+                copy_snapshot(data_dir)
+            playlist_manager = load_playlist(args.music_folder, data_dir)
+        for static in ((True, False) if args.compare else (args.static,)):
+            # A fresh engine per run, so no FaceMesh tracking state carries over
+            runner = HeadlessRunner(source, engine=EmotionEngine(static_image_mode=static),
+                                    playlist_manager=playlist_manager, detect_every=args.detect_every)
+            try:
+                reports.append(runner.run(max_frames=args.max_frames))
+            finally:
+                runner.engine.close()
+            print(HeadlessRunner.format_report(reports[-1]))
+            print()
+    finally:
+        if playlist_manager is not None:
+            close_playlist(playlist_manager)
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if args.compare:
+        print(compare_reports(*reports))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports if args.compare else reports[0], f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
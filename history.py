@@ -1,94 +1,69 @@
-import json
-import os
+import time
+import uuid
+import threading
 from datetime import datetime
+from data_store import DataStore
 
 class HistoryManager:
-    def __init__(self):
-        # Get application directory
-        app_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Define history file path in Data folder
-        data_dir = os.path.join(app_dir, "Data")
-        self.history_file = os.path.join(data_dir, "history.json")
-        
-        # Create Data directory if it doesn't exist
-        os.makedirs(data_dir, exist_ok=True)
-        
-        self.history = []
-        self.play_counts = {}  # Track play counts for today
-        self.load_history()
-        self._clean_old_counts()
+    # Trim the play log once this many plays were added since the last trim
+    PRUNE_EVERY = 1000
 
-    def load_history(self):
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r') as f:
-                    data = json.load(f)
-                    self.history = data.get('history', [])
-                    self.play_counts = data.get('play_counts', {})
-            except Exception as e:
-                print(f"Error loading history: {e}")
-                # Initialize empty if error
-                self.history = []
-                self.play_counts = {}
+    def __init__(self, data_store=None, max_plays=0):
+        # Plays are appended to the data store's log; history is read from its per-day rollups
+        self.data_store = data_store or DataStore()
+        self.max_plays = max_plays  # plays kept in the log, 0 keeps everything
+        self._plays_since_prune = 0
+        self._analytics = None
+        # The analytics are refreshed and queried off the UI thread
+        self._analytics_lock = threading.RLock()
 
-    def save_history(self):
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-            
-            with open(self.history_file, 'w') as f:
-                json.dump({
-                    'history': self.history,
-                    'play_counts': self.play_counts
-                }, f, indent=4)
-        except Exception as e:
-            print(f"Error saving history: {e}")
+    def add_to_history(self, song_path, title, event_id=None):
+        """Record a play; calling again with the same event_id does nothing"""
+        added = self.data_store.add_play(song_path, title, datetime.now(), event_id or uuid.uuid4().hex)
+        if added and self.max_plays:
+            self._plays_since_prune += 1
+            if self._plays_since_prune >= self.PRUNE_EVERY:
+                self._plays_since_prune = 0
+                self.data_store.prune_plays(self.max_plays)
+                with self._analytics_lock:
+                    if self._analytics is not None:
+                        # Reloaded from the trimmed log on the next refresh
+                        self._analytics.reset()
+        return added
 
-    def _clean_old_counts(self):
-        today = datetime.now().strftime('%Y-%m-%d')
-        # Reset play counts if it's a new day
-        if not any(entry.get('date') == today for entry in self.history):
-            self.play_counts = {}
-            self.save_history()
+    def get_play_count(self, song_path, day=None):
+        """Get how many times a song was played today (or on the given YYYY-MM-DD day)"""
+        return self.data_store.get_play_count(song_path, day)
 
-    def add_to_history(self, song_path, title):
-        current_time = datetime.now()
-        date_str = current_time.strftime('%Y-%m-%d')
-        time_str = current_time.strftime('%H:%M:%S')
-        
-        # Update play count for today
-        if song_path not in self.play_counts:
-            self.play_counts[song_path] = 0
-        self.play_counts[song_path] += 1
+    def get_analytics(self, duration_of=None):
+        """Get the PlayAnalytics over the play log, brought up to date with new plays"""
+        with self._analytics_lock:
+            if self._analytics is None:
+                # numpy is only imported once analytics are first asked for
+                from history_analytics import PlayAnalytics
+                self._analytics = PlayAnalytics(self.data_store, duration_of)
+            self._analytics.refresh()
+            return self._analytics
 
-        # Create new entry
-        entry = {
-            'path': song_path,
-            'title': title,
-            'date': date_str,
-            'time': time_str,
-            'play_count': self.play_counts[song_path]
-        }
-        
-        # Remove old entries of the same song from today
-        self.history = [h for h in self.history if not (
-            h['path'] == song_path and h['date'] == date_str
-        )]
-        
-        # Add new entry
-        self.history.append(entry)
-        
-        # Keep only last 100 entries
-        if len(self.history) > 100:
-            self.history = self.history[-100:]
-            
-        self.save_history()
+    def get_listening_stats(self, duration_of=None):
+        """Get {'streak': current streak in days, 'top_today': (path, count) or None}.
+
+        Loading the play log can take a while the first time, so call this
+        from a worker thread.
+        """
+        with self._analytics_lock:
+            analytics = self.get_analytics(duration_of)
+            today = time.strftime('%Y-%m-%d')
+            start = time.mktime(time.strptime(today, '%Y-%m-%d'))
+            top = analytics.top_songs(1, 'day', start=start).get(today)
+            return {'streak': analytics.streaks()['current'], 'top_today': top[0] if top else None}
 
     def get_history(self):
-        return self.history
+        """Get the last 100 entries (one per song per day, with that day's play count), oldest first"""
+        return self.data_store.get_recent_history(100)
 
     def clear_history(self):
-        self.history = []
-        self.play_counts = {}
-        self.save_history()
\ No newline at end of file
+        self.data_store.clear_plays()
+        with self._analytics_lock:
+            if self._analytics is not None:
+                self._analytics.reset()
@@ -0,0 +1,277 @@
+import time
+import numpy as np
+from data_store import EMOTION_NUMBERS
+
+DAY = 86400
+PERIODS = ('day', 'week', 'month')
+
+
+def _timestamp(value):
+    """Accept a datetime or a Unix timestamp"""
+    if value is None:
+        return None
+    if hasattr(value, 'timestamp'):
+        return value.timestamp()
+    return float(value)
+
+
+class PlayAnalytics:
+    """Vectorized queries over the play log.
+
+    Plays are held as NumPy columns (song ID, timestamp) sorted by time,
+    next to per-song columns for the emotion tag bitmask and duration.
+    refresh() only reads plays logged since the previous call, and reloads
+    the tags only when the data store's tag version has moved. Answers are
+    cached; new plays drop just the cached answers whose time window reaches
+    past the oldest new play, and tag changes drop the per-emotion answers.
+
+    Days, weeks (starting Monday) and months use the current local UTC
+    offset.
+    """
+
+    def __init__(self, data_store, duration_of=None):
+        self.store = data_store
+        self.duration_of = duration_of  # song path -> seconds (or None), for listening time
+        self.emotion_names = {number: name for name, number in EMOTION_NUMBERS.items()}
+        self.reset()
+
+    def reset(self):
+        """Forget everything loaded so far (e.g. after the history was cleared)"""
+        self._song_ids = np.empty(1024, dtype=np.int64)
+        self._times = np.empty(1024, dtype=np.float64)
+        self._size = 0
+        self._last_play_id = 0
+        self._masks = np.zeros(1, dtype=np.uint8)     # song id -> emotion bitmask
+        self._tag_version = None                       # data store tag version the masks were read at
+        self._durations = np.full(1, np.nan)           # song id -> seconds, NaN until known
+        self._paths = {}                               # song id -> path, filled on demand
+        self._cache = {}                               # query key -> (window end, answer)
+
+    @property
+    def song_ids(self):
+        return self._song_ids[:self._size]
+
+    @property
+    def times(self):
+        return self._times[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    # Loading
+
+    def refresh(self):
+        """Pull in plays logged since the last refresh; returns how many were new"""
+        last_id = self.store.get_last_play_id()
+        if last_id < self._last_play_id:
+            # The log was cleared behind our back
+            self.reset()
+        rows = self.store.get_plays_after(self._last_play_id) if last_id > self._last_play_id else []
+        if rows:
+            data = np.array(rows, dtype=np.float64)  # columns: play id, song id, played_at
+            self._last_play_id = int(data[-1, 0])
+            self._append(data[:, 1].astype(np.int64), data[:, 2])
+            self._invalidate(float(data[:, 2].min()))
+        self._refresh_tags()
+        return len(rows)
+
+    def _append(self, song_ids, times):
+        old_size = self._size
+        new_size = old_size + song_ids.size
+        if new_size > self._times.size:
+            capacity = max(new_size, self._times.size * 2)
+            self._song_ids = np.resize(self._song_ids, capacity)
+            self._times = np.resize(self._times, capacity)
+        self._song_ids[old_size:new_size] = song_ids
+        self._times[old_size:new_size] = times
+        self._size = new_size
+
+        # Plays arrive in log order, which is time order unless a clock moved back
+        if (old_size and times.min() < self._times[old_size - 1]) or np.any(np.diff(times) < 0):
+            order = np.argsort(self.times, kind='stable')
+            self._song_ids[:new_size] = self.song_ids[order]
+            self._times[:new_size] = self.times[order]
+
+        self._grow_song_columns(int(song_ids.max()) + 1)
+
+    def _grow_song_columns(self, size):
+        if size > self._masks.size:
+            self._masks = np.concatenate((self._masks, np.zeros(size - self._masks.size, dtype=np.uint8)))
+            self._durations = np.concatenate((self._durations, np.full(size - self._durations.size, np.nan)))
+
+    def _refresh_tags(self):
+        version = self.store.get_tag_version()
+        if version == self._tag_version:
+            return
+        self._tag_version = version
+        tags = np.array(self.store.get_song_tag_rows(), dtype=np.int64).reshape(-1, 2)
+        if tags.size:
+            self._grow_song_columns(int(tags[:, 0].max()) + 1)
+        masks = np.zeros(self._masks.size, dtype=np.uint8)
+        np.bitwise_or.at(masks, tags[:, 0], np.left_shift(1, tags[:, 1]).astype(np.uint8))
+        if not np.array_equal(masks, self._masks):
+            self._masks = masks
+            for key in [key for key in self._cache if key[0] == 'emotion']:
+                del self._cache[key]
+
+    def _invalidate(self, oldest_new_play):
+        """Drop cached answers whose window could include a play at or after oldest_new_play"""
+        for key, (window_end, _) in list(self._cache.items()):
+            if window_end is None or window_end > oldest_new_play:
+                del self._cache[key]
+
+    def _cached(self, key, window_end, compute):
+        entry = self._cache.get(key)
+        if entry is None:
+            entry = self._cache[key] = (window_end, compute())
+        return entry[1]
+
+    # Helpers
+
+    def _window(self, start, end):
+        """Get the [lo, hi) slice of plays with start <= played_at < end"""
+        times = self.times
+        lo = 0 if start is None else int(np.searchsorted(times, start, 'left'))
+        hi = self._size if end is None else int(np.searchsorted(times, end, 'left'))
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _buckets(times, period):
+        """Map timestamps to local day / week / month numbers"""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}, expected one of {PERIODS}")
+        days = np.floor((times + time.localtime().tm_gmtoff) / DAY).astype(np.int64)
+        if period == 'day':
+            return days
+        if period == 'week':
+            # 1970-01-01 was a Thursday; shift so weeks start on Monday
+            return (days + 3) // 7
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+    @staticmethod
+    def _labels(buckets, period):
+        if period == 'day':
+            return np.datetime_as_string(buckets.astype('datetime64[D]')).tolist()
+        if period == 'week':
+            # Label a week with the date of its Monday
+            return np.datetime_as_string((buckets * 7 - 3).astype('datetime64[D]')).tolist()
+        return np.datetime_as_string(buckets.astype('datetime64[M]')).tolist()
+
+    def _get_paths(self, song_ids):
+        missing = [song_id for song_id in set(song_ids) if song_id not in self._paths]
+        if missing:
+            self._paths.update(self.store.get_song_paths(missing))
+        return self._paths
+
+    def _resolve_durations(self, song_ids):
+        if self.duration_of is None:
+            return
+        unknown = song_ids[np.isnan(self._durations[song_ids])].tolist()
+        if not unknown:
+            return
+        paths = self._get_paths(unknown)
+        for song_id in unknown:
+            seconds = self.duration_of(paths[song_id]) if song_id in paths else None
+            if seconds:
+                self._durations[song_id] = seconds
+
+    # Queries
+
+    def count_plays(self, start=None, end=None):
+        """Number of plays with start <= played_at < end"""
+        lo, hi = self._window(_timestamp(start), _timestamp(end))
+        return hi - lo
+
+    def play_counts(self, start=None, end=None):
+        """Get {path: play count} for the plays in a time window"""
+        start, end = _timestamp(start), _timestamp(end)
+
+        def compute():
+            lo, hi = self._window(start, end)
+            counts = np.bincount(self.song_ids[lo:hi])
+            song_ids = np.flatnonzero(counts)
+            paths = self._get_paths(song_ids.tolist())
+            return {paths.get(song_id): count for song_id, count in zip(song_ids.tolist(), counts[song_ids].tolist())}
+
+        return self._cached(('counts', start, end), end, compute)
+
+    def plays_per_period(self, period='day', start=None, end=None):
+        """Get {period label: play count}, e.g. {'2024-05-01': 12, ...}"""
+        start, end = _timestamp(start), _timestamp(end)
+
+        def compute():
+            lo, hi = self._window(start, end)
+            buckets, counts = np.unique(self._buckets(self.times[lo:hi], period), return_counts=True)
+            return dict(zip(self._labels(buckets, period), counts.tolist()))
+
+        return self._cached(('per_period', period, start, end), end, compute)
+
+    def top_songs(self, n=10, period='day', start=None, end=None):
+        """Get the n most played songs of each day / week / month as {label: [(path, count), ...]}"""
+        start, end = _timestamp(start), _timestamp(end)
+
+        def compute():
+            lo, hi = self._window(start, end)
+            song_ids = self.song_ids[lo:hi]
+            if not song_ids.size:
+                return {}
+            span = int(song_ids.max()) + 1
+            keys, counts = np.unique(self._buckets(self.times[lo:hi], period) * span + song_ids,
+                                     return_counts=True)
+            buckets, songs = np.divmod(keys, span)
+            # Sort by period, then by count (highest first), then by song ID
+            order = np.lexsort((songs, -counts, buckets))
+            sorted_buckets = buckets[order]
+            rank = np.arange(order.size) - np.searchsorted(sorted_buckets, sorted_buckets, 'left')
+            keep = order[rank < n]
+
+            paths = self._get_paths(songs[keep].tolist())
+            top = {}
+            for label, song_id, count in zip(self._labels(buckets[keep], period),
+                                             songs[keep].tolist(), counts[keep].tolist()):
+                top.setdefault(label, []).append((paths.get(song_id), count))
+            return top
+
+        return self._cached(('top', n, period, start, end), end, compute)
+
+    def listening_time_by_emotion(self, start=None, end=None):
+        """Get {emotion name: seconds listened} by the songs' emotion tags, plus 'untagged'"""
+        start, end = _timestamp(start), _timestamp(end)
+
+        def compute():
+            lo, hi = self._window(start, end)
+            song_ids = self.song_ids[lo:hi]
+            self._resolve_durations(np.unique(song_ids))
+            seconds = np.nan_to_num(self._durations[song_ids])
+            masks = self._masks[song_ids]
+            listening = {
+                name: float(seconds[(masks & (1 << number)) != 0].sum())
+                for number, name in sorted(self.emotion_names.items())
+            }
+            listening['untagged'] = float(seconds[masks == 0].sum())
+            return listening
+
+        return self._cached(('emotion', start, end), end, compute)
+
+    def streaks(self):
+        """Get listening streaks in consecutive days: {'current', 'longest', 'longest_end'}"""
+        today = int(self._buckets(np.array([time.time()]), 'day')[0])
+
+        def compute():
+            days = np.unique(self._buckets(self.times, 'day'))
+            if not days.size:
+                return {'current': 0, 'longest': 0, 'longest_end': None}
+            breaks = np.flatnonzero(np.diff(days) != 1)
+            run_starts = np.concatenate(([0], breaks + 1))
+            run_ends = np.concatenate((breaks, [days.size - 1]))
+            lengths = run_ends - run_starts + 1
+            best = int(lengths.argmax())
+            # A streak that reached yesterday is still alive until today is over
+            current = int(lengths[-1]) if today - days[-1] <= 1 else 0
+            return {
+                'current': current,
+                'longest': int(lengths[best]),
+                'longest_end': self._labels(days[run_ends[best]:run_ends[best] + 1], 'day')[0]
+            }
+
+        return self._cached(('streaks', today), None, compute)
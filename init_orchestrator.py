@@ -0,0 +1,145 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class InitTask:
+    """One manager to construct, with the names of the tasks it needs"""
+
+    def __init__(self, name, loader, depends_on):
+        self.name = name
+        self.loader = loader
+        self.depends_on = tuple(depends_on)
+        self.state = 'waiting'   # waiting, running, done or failed
+        self.result = None
+        self.error = None
+        self.started = None      # seconds since the orchestrator started
+        self.finished = None
+
+    @property
+    def duration(self):
+        return self.finished - self.started if self.finished is not None and self.started is not None else 0.0
+
+
+class InitOrchestrator:
+    """Constructs the application's managers concurrently in a thread pool.
+
+    Each task is added with the names of the tasks whose results its loader
+    takes as arguments, in order, and starts as soon as those are done, so
+    independent loaders overlap their file I/O with each other and with
+    whatever the main thread does meanwhile (creating the Tk window).
+    If a loader raises, the tasks that depend on it fail too.
+    when_ready() hands the results back on the Tk main loop. Every task's
+    start and end are recorded, and critical_path() names the chain of
+    tasks that decided how long the whole thing took.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.tasks = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._pool = None
+        self._start = None
+        self.total = None
+
+    def add(self, name, loader, depends_on=()):
+        """Register loader(*results of depends_on) as task name"""
+        for dependency in depends_on:
+            if dependency not in self.tasks:
+                raise ValueError(f"{name} depends on unknown task {dependency}")
+        self.tasks[name] = InitTask(name, loader, depends_on)
+
+    def start(self):
+        """Start every task whose dependencies are met; the rest follow as they finish"""
+        self._start = time.perf_counter()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="init")
+        with self._lock:
+            self._schedule()
+
+    def _schedule(self):
+        # Called with the lock held
+        for task in self.tasks.values():
+            if task.state != 'waiting':
+                continue
+            dependencies = [self.tasks[name] for name in task.depends_on]
+            failed = [dependency.name for dependency in dependencies if dependency.state == 'failed']
+            if failed:
+                task.state = 'failed'
+                task.error = RuntimeError(f"{task.name} not created because {', '.join(failed)} failed")
+            elif all(dependency.state == 'done' for dependency in dependencies):
+                task.state = 'running'
+                self._pool.submit(self._run, task)
+
+        if all(task.state in ('done', 'failed') for task in self.tasks.values()):
+            self.total = time.perf_counter() - self._start
+            self._pool.shutdown(wait=False)
+            self._done.set()
+
+    def _run(self, task):
+        task.started = time.perf_counter() - self._start
+        try:
+            task.result = task.loader(*[self.tasks[name].result for name in task.depends_on])
+            state = 'done'
+        except Exception as e:
+            print(f"Error initializing {task.name}: {e}")
+            task.error = e
+            state = 'failed'
+        task.finished = time.perf_counter() - self._start
+        with self._lock:
+            task.state = state
+            self._schedule()
+
+    def wait(self, timeout=None):
+        """Block until every task has finished or failed; True unless the timeout expired"""
+        return self._done.wait(timeout)
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def when_ready(self, widget, callback, poll_ms=10):
+        """Call callback(orchestrator) on the Tk main loop once every task has finished"""
+        def poll():
+            if self._done.is_set():
+                callback(self)
+            else:
+                widget.after(poll_ms, poll)
+        widget.after(0, poll)
+
+    @property
+    def results(self):
+        return {name: task.result for name, task in self.tasks.items() if task.state == 'done'}
+
+    @property
+    def errors(self):
+        return {name: task.error for name, task in self.tasks.items() if task.state == 'failed'}
+
+    def timings(self):
+        """Get {task name: {'start', 'end', 'duration'}} in milliseconds since start()"""
+        return {
+            task.name: {
+                'start': round((task.started or 0) * 1000, 1),
+                'end': round((task.finished or 0) * 1000, 1),
+                'duration': round(task.duration * 1000, 1)
+            }
+            for task in self.tasks.values()
+        }
+
+    def critical_path(self):
+        """Get the chain of tasks, first to last, that ended with the last task to finish"""
+        finished = [task for task in self.tasks.values() if task.finished is not None]
+        if not finished:
+            return []
+        task = max(finished, key=lambda task: task.finished)
+        path = [task]
+        while task.depends_on:
+            # The dependency that finished last is the one the task waited for
+            task = max((self.tasks[name] for name in task.depends_on), key=lambda task: task.finished or 0)
+            path.append(task)
+        return path[::-1]
+
+    def summary(self):
+        """One line with the total time and the critical path"""
+        path = " -> ".join(f"{task.name} ({task.duration * 1000:.0f} ms)" for task in self.critical_path())
+        total = (self.total or 0) * 1000
+        return f"Managers ready in {total:.0f} ms, critical path: {path}"
@@ -0,0 +1,108 @@
+import os
+from contextlib import contextmanager
+
+
+class WidgetCounter:
+    """Counts widgets created and destroyed and rows re-rendered by the list views.
+
+    Wrap a user action in operation() to get its totals; they are kept in
+    last_operation and printed when KAISAR_WIDGET_STATS is set, so a change
+    that starts rebuilding whole lists shows up right away.
+    """
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.created = 0
+        self.destroyed = 0
+        self.rendered = 0
+        self.last_operation = None
+
+    def snapshot(self):
+        return self.created, self.destroyed, self.rendered
+
+    @contextmanager
+    def operation(self, name):
+        created, destroyed, rendered = self.snapshot()
+        try:
+            yield
+        finally:
+            self.last_operation = {
+                'name': name,
+                'created': self.created - created,
+                'destroyed': self.destroyed - destroyed,
+                'rendered': self.rendered - rendered
+            }
+            if self.verbose:
+                print(f"[widgets] {name}: {self.last_operation['created']} created, "
+                      f"{self.last_operation['destroyed']} destroyed, "
+                      f"{self.last_operation['rendered']} rows re-rendered")
+
+
+# Shared by every list view
+widget_counter = WidgetCounter(verbose=bool(os.environ.get('KAISAR_WIDGET_STATS')))
+
+
+class KeyedRows:
+    """Keeps packed widget rows in step with a list of entries by key.
+
+    patch() compares the new entries with the ones on screen: rows for new
+    keys are created, rows for missing keys destroyed, rows whose entry
+    changed are updated in place, and only rows whose neighbour changed are
+    re-packed. A new play at the top of the history therefore creates one
+    row and touches at most a couple of others.
+
+    create_row(parent, entry) must return the row widget (counted as
+    widgets_per_row widgets); update_row(row, entry) refreshes its texts.
+    """
+
+    PACK_OPTIONS = {'fill': 'x', 'padx': 5, 'pady': 2}
+
+    def __init__(self, parent, create_row, update_row, widgets_per_row=1, counter=widget_counter):
+        self.parent = parent
+        self.create_row = create_row
+        self.update_row = update_row
+        self.widgets_per_row = widgets_per_row
+        self.counter = counter
+        self.rows = {}       # key -> row widget
+        self.entries = {}    # key -> entry shown by the row
+        self.order = []      # keys in display order
+
+    def patch(self, entries, key):
+        """Show entries (in display order), key(entry) identifying each row"""
+        keys = [key(entry) for entry in entries]
+        wanted = set(keys)
+
+        for old_key in self.order:
+            if old_key not in wanted:
+                self.rows.pop(old_key).destroy()
+                del self.entries[old_key]
+                self.counter.destroyed += self.widgets_per_row
+
+        old_previous = {k: (self.order[i - 1] if i else None) for i, k in enumerate(self.order)}
+        previous = None
+        for new_key, entry in zip(keys, entries):
+            row = self.rows.get(new_key)
+            if row is None:
+                row = self.rows[new_key] = self.create_row(self.parent, entry)
+                self.entries[new_key] = entry
+                self.counter.created += self.widgets_per_row
+                self._place(row, previous)
+            else:
+                if self.entries[new_key] != entry:
+                    self.update_row(row, entry)
+                    self.entries[new_key] = entry
+                    self.counter.rendered += 1
+                if old_previous.get(new_key) != previous:
+                    self._place(row, previous)
+            previous = new_key
+        self.order = keys
+
+    def _place(self, row, previous):
+        if previous is not None:
+            row.pack(after=self.rows[previous], **self.PACK_OPTIONS)
+            return
+        slaves = self.parent.pack_slaves()
+        if not slaves:
+            row.pack(**self.PACK_OPTIONS)
+        elif slaves[0] is not row:
+            row.pack(before=slaves[0], **self.PACK_OPTIONS)
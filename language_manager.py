@@ -39,10 +39,16 @@ class LanguageManager:
                 "tag_emotion": "Tag Emotion",
                 "confirm": "Confirm",
                 "clear_history": "Clear History",
+                "listening_streak": "Listening streak",
+                "days": "days",
+                "top_today": "Most played today",
                 "no_folder_selected": "No folder selected",
                 "select_emotion": "Select an emotion:",
                 "select_songs": "Select songs to tag:",
                 "select_all": "Select All",
+                "search_songs": "Search songs...",
+                "all_folders": "All folders",
+                "selected": "selected",
                 "no_song_playing": "No song playing",
                 "detect_emotion": "Detect Emotion",
                 "emotion_detection": "Emotion Detection",
@@ -86,10 +92,16 @@ class LanguageManager:
                 "tag_emotion": "Tag Emosi",
                 "confirm": "Konfirmasi",
                 "clear_history": "Hapus Riwayat",
+                "listening_streak": "Rentetan mendengarkan",
+                "days": "hari",
+                "top_today": "Paling sering diputar hari ini",
                 "no_folder_selected": "Belum ada folder dipilih",
                 "select_emotion": "Pilih emosi:",
                 "select_songs": "Pilih lagu untuk ditag:",
                 "select_all": "Pilih Semua",
+                "search_songs": "Cari lagu...",
+                "all_folders": "Semua folder",
+                "selected": "dipilih",
                 "no_song_playing": "Tidak ada lagu diputar",
                 "detect_emotion": "Deteksi Emosi",
                 "emotion_detection": "Deteksi Emosi",
@@ -0,0 +1,206 @@
+import os
+import json
+import threading
+from path_utils import get_scan_manifest_path
+
+MANIFEST_VERSION = 1
+
+
+class ScanDiff:
+    """Songs added, removed and modified since the previous scan of a folder"""
+
+    def __init__(self, root):
+        self.root = root
+        self.added = []
+        self.removed = []
+        self.modified = []
+        self.dirs_scanned = 0
+        self.dirs_skipped = 0
+
+    def is_empty(self):
+        return not (self.added or self.removed or self.modified)
+
+    def __repr__(self):
+        return (f"ScanDiff(added={len(self.added)}, removed={len(self.removed)}, "
+                f"modified={len(self.modified)}, dirs_scanned={self.dirs_scanned}, "
+                f"dirs_skipped={self.dirs_skipped})")
+
+
+class ScanCancelToken:
+    """Lets the UI abort a folder scan running on another thread"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+
+class LibraryScanner:
+    """Walks a music folder and remembers what it saw in a persistent manifest.
+
+    The manifest stores, per directory, its mtime, its sub-directories and its
+    audio files with (size, mtime). When a directory's mtime is unchanged its
+    entries have not been added to or removed from, so the directory is not
+    listed again; its known files are only stat'ed, because editing a file in
+    place (e.g. retagging it) changes the file but not its directory. Pass
+    full=True to list every directory again.
+    """
+
+    def __init__(self, supported_formats, manifest_file=None):
+        self.supported_formats = tuple(ext.lower() for ext in supported_formats)
+        self.manifest_file = manifest_file or get_scan_manifest_path()
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        """Load the scan manifest from file"""
+        if os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    return data
+            except Exception as e:
+                print(f"Error loading scan manifest: {e}")
+        return {'version': MANIFEST_VERSION, 'roots': {}}
+
+    def save_manifest(self):
+        """Save the scan manifest atomically"""
+        try:
+            os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+            temp_file = f"{self.manifest_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(self.manifest, f, separators=(',', ':'))
+            os.replace(temp_file, self.manifest_file)
+        except Exception as e:
+            print(f"Error saving scan manifest: {e}")
+
+    def get_files(self, root):
+        """Get all known song paths under root from the manifest"""
+        dirs = self.manifest['roots'].get(os.path.normpath(root), {})
+        for dir_path, entry in dirs.items():
+            for name in entry['files']:
+                yield os.path.join(dir_path, name)
+
+    def get_signatures(self, root):
+        """Get (path, size, mtime) for all known songs under root from the manifest"""
+        dirs = self.manifest['roots'].get(os.path.normpath(root), {})
+        for dir_path, entry in dirs.items():
+            for name, (size, mtime) in entry['files'].items():
+                yield os.path.join(dir_path, name), size, mtime
+
+    def forget(self, root):
+        """Drop the manifest entry for a folder so the next scan is a full one"""
+        self.manifest['roots'].pop(os.path.normpath(root), None)
+
+    def scan(self, root, full=False, save=True):
+        """Rescan root and return a ScanDiff against the previous scan"""
+        diff = ScanDiff(os.path.normpath(root))
+        for _ in self.iter_scan(root, diff, full=full, save=save):
+            pass
+        return diff
+
+    def iter_scan(self, root, diff, full=False, save=True, cancel_token=None):
+        """Rescan root, yielding (dir_path, file_names) for every directory as it goes.
+
+        Changes are recorded into diff. The manifest is only updated once the
+        whole tree has been visited, so a cancelled scan leaves it untouched.
+        """
+        root = os.path.normpath(root)
+        old_dirs = self.manifest['roots'].get(root, {})
+        new_dirs = {}
+
+        stack = [root]
+        while stack:
+            if cancel_token is not None and cancel_token.is_cancelled():
+                return
+            dir_path = stack.pop()
+            try:
+                dir_mtime = os.stat(dir_path).st_mtime
+            except OSError:
+                continue
+
+            old_entry = old_dirs.get(dir_path)
+            if old_entry is not None and old_entry['mtime'] == dir_mtime and not full:
+                # Directory listing is unchanged, reuse it and only re-stat its files
+                entry = self._check_files(dir_path, old_entry, diff)
+                diff.dirs_skipped += 1
+            else:
+                entry = self._scan_directory(dir_path, dir_mtime, old_entry, diff)
+                diff.dirs_scanned += 1
+
+            new_dirs[dir_path] = entry
+            stack.extend(os.path.join(dir_path, name) for name in entry['dirs'])
+            if entry['files']:
+                yield dir_path, list(entry['files'])
+
+        # Anything left over in directories that vanished entirely was removed
+        for dir_path, entry in old_dirs.items():
+            if dir_path not in new_dirs:
+                diff.removed.extend(os.path.join(dir_path, name) for name in entry['files'])
+
+        self.manifest['roots'][root] = new_dirs
+        if save:
+            self.save_manifest()
+
+    def _check_files(self, dir_path, old_entry, diff):
+        """Stat the known files of an unchanged directory and record in-place edits into diff"""
+        files = None
+        for name, old_signature in old_entry['files'].items():
+            path = os.path.join(dir_path, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature = None
+            else:
+                signature = [stat.st_size, stat.st_mtime]
+            if signature is not None and list(old_signature) == signature:
+                continue
+            if files is None:
+                # Copy on the first change, the old entry stays as it was
+                files = dict(old_entry['files'])
+            if signature is None:
+                del files[name]
+                diff.removed.append(path)
+            else:
+                files[name] = signature
+                diff.modified.append(path)
+        if files is None:
+            return old_entry
+        return {'mtime': old_entry['mtime'], 'dirs': old_entry['dirs'], 'files': files}
+
+    def _scan_directory(self, dir_path, dir_mtime, old_entry, diff):
+        """List a single directory and record its changes into diff"""
+        old_files = old_entry['files'] if old_entry else {}
+        files = {}
+        dirs = []
+
+        try:
+            with os.scandir(dir_path) as entries:
+                for item in entries:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            dirs.append(item.name)
+                        elif item.name.lower().endswith(self.supported_formats):
+                            stat = item.stat()
+                            files[item.name] = [stat.st_size, stat.st_mtime]
+                    except OSError as e:
+                        print(f"Error reading {item.path}: {e}")
+        except OSError as e:
+            print(f"Error scanning {dir_path}: {e}")
+
+        for name, signature in files.items():
+            old_signature = old_files.get(name)
+            if old_signature is None:
+                diff.added.append(os.path.join(dir_path, name))
+            elif list(old_signature) != signature:
+                diff.modified.append(os.path.join(dir_path, name))
+
+        for name in old_files:
+            if name not in files:
+                diff.removed.append(os.path.join(dir_path, name))
+
+        return {'mtime': dir_mtime, 'dirs': sorted(dirs), 'files': files}
@@ -1,45 +1,113 @@
+from startup_profiler import profiler
+
+# Enabled before the other imports so their cost shows up in the profile
+profiler.enable_if_requested()
+
 import customtkinter as ctk
 import tkinter as tk
 import os
 import shutil
-import json
 from tkinter import messagebox
 from player import MusicPlayer
+from data_store import DataStore
 from playlist import PlaylistManager
 from history import HistoryManager
 from settings import SettingsManager
-from emotion_manager import EmotionManager
 from language_manager import LanguageManager
 from ui import PlayerUI
-from camera_manager import CameraManager
+from init_orchestrator import InitOrchestrator
+
+profiler.checkpoint("imports")
 
 class MusicPlayerApp:
     def __init__(self):
+        # Filled in by _on_managers_ready
+        self.data_store = None
+        self.settings_manager = None
+        self.language_manager = None
+        self.playlist_manager = None
+        self.history_manager = None
+        self.player = None
+        self.ui = None
+        # Created on the first emotion detection, MediaPipe is slow to load
+        self.emotion_manager = None
+        
         try:
+            # Construct the managers on a thread pool while the window is created
+            # (tags, history and settings share one database). They only read
+            # files; the audio device and the player are set up on this thread
+            self.init = InitOrchestrator()
+            self.init.add("data store", DataStore)
+            self.init.add("settings", SettingsManager, ["data store"])
+            self.init.add("language", LanguageManager)
+            self.init.add("playlist", PlaylistManager, ["data store"])
+            self.init.add(
+                "history",
+                lambda data_store, settings_manager: HistoryManager(
+                    data_store, settings_manager.get_history_retention()
+                ),
+                ["data store", "settings"]
+            )
+            self.init.start()
+            
+            with profiler.phase("audio"):
+                MusicPlayer.init_audio()
+            
             # Set up the application
-            ctk.set_appearance_mode("dark")
-            ctk.set_default_color_theme("dark-blue")
+            with profiler.phase("create window"):
+                ctk.set_appearance_mode("dark")
+                ctk.set_default_color_theme("dark-blue")
+                
+                # Create root window
+                self.root = ctk.CTk()
+                self.root.title("KaisarPlayer")
+                self.root.geometry("800x600")
             
-            # Create root window
-            self.root = ctk.CTk()
-            self.root.title("KaisarPlayer")
-            self.root.geometry("800x600")
+            # Persist pending changes when the window is closed
+            self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
             
             # Create Data folder structure
-            self._create_data_folders()
-            
-            # Initialize managers
-            self.settings_manager = SettingsManager()
-            self.emotion_manager = EmotionManager()
-            self.language_manager = LanguageManager()
-            self.playlist_manager = PlaylistManager()
-            self.history_manager = HistoryManager()
+            with profiler.phase("data folders"):
+                self._create_data_folders()
+            
+            # The UI is built on the main loop once every manager exists
+            self.init.when_ready(self.root, self._on_managers_ready)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            
+    def _on_managers_ready(self, init):
+        """Build the UI from the managers created by the orchestrator"""
+        profiler.checkpoint("managers")
+        profiler.note("manager_init_ms", init.timings())
+        print(init.summary())
+        try:
+            if init.errors:
+                raise next(iter(init.errors.values()))
+            
+            results = init.results
+            self.data_store = results["data store"]
+            self.settings_manager = results["settings"]
+            self.language_manager = results["language"]
+            self.playlist_manager = results["playlist"]
+            self.history_manager = results["history"]
             self.player = MusicPlayer(self.playlist_manager, self.history_manager)
+            self.settings_manager.apply_settings()
             
             # Initialize UI
-            self.ui = PlayerUI(self.root, self.player, self.playlist_manager, 
-                             self.history_manager, self.settings_manager, 
-                             self.emotion_manager, self.language_manager)
+            with profiler.phase("ui"):
+                self.ui = PlayerUI(self.root, self.player, self.playlist_manager, 
+                                 self.history_manager, self.settings_manager, 
+                                 self.emotion_manager, self.language_manager)
+            
+            # Optionally load the vision stack once the window is up
+            if self.settings_manager.get_preload_emotion_detection():
+                self.root.after(1000, self.ui.warm_up_emotion_detection)
+            
+            # Idle callbacks run once the window has been laid out and drawn
+            if profiler.enabled:
+                profiler.note("songs", len(self.playlist_manager.catalog))
+                self.root.after_idle(self._finish_startup_profile)
             
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
@@ -47,29 +115,40 @@ class MusicPlayerApp:
     def run(self):
         self.root.mainloop()
         
+    def _finish_startup_profile(self):
+        profiler.checkpoint("first paint")
+        profiler.finish()
+        
+    def _on_closing(self):
+        """Flush background work before the window goes away"""
+        try:
+            # Managers are None when the window closes before they were all created
+            if self.settings_manager is not None:
+                self.settings_manager.close()
+            if self.playlist_manager is not None:
+                self.playlist_manager.shutdown()
+            if self.data_store is not None:
+                self.data_store.close()
+        except Exception as e:
+            print(f"Error during shutdown: {e}")
+        self.root.destroy()
+        
     def _create_data_folders(self):
         """Create necessary Data folder structure"""
         try:
             # Use path_utils to get directory paths
-            from path_utils import get_data_directory, get_languages_directory, get_temp_image_directory, get_emotions_file_path
+            from path_utils import get_data_directory, get_languages_directory, get_temp_image_directory
             
             # Get directory paths
             data_dir = get_data_directory()
             languages_dir = get_languages_directory()
             temp_image_dir = get_temp_image_directory()
-            emotions_file = get_emotions_file_path()
             
             # Create directories if they don't exist
             os.makedirs(data_dir, exist_ok=True)
             os.makedirs(languages_dir, exist_ok=True)
             os.makedirs(temp_image_dir, exist_ok=True)
             
-            # Create emotions.json file if it doesn't exist
-            if not os.path.exists(emotions_file):
-                with open(emotions_file, 'w') as f:
-                    json.dump({}, f, indent=4)
-                print(f"Created emotions file at {emotions_file}")
-            
             # Copy language files if they don't exist in Data/Languages
             # For PyInstaller, the languages folder is included in the executable directory
             import sys
@@ -0,0 +1,206 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from mutagen import File
+from path_utils import get_metadata_cache_path
+
+CACHE_VERSION = 1
+
+
+def read_metadata(file_path):
+    """Read duration and basic tags from an audio file with mutagen"""
+    metadata = {
+        'duration': 0,
+        'artist': '',
+        'album': '',
+        'track_number': 0,
+        'bitrate': 0,
+        'sample_rate': 0
+    }
+    try:
+        audio = File(file_path, easy=True)
+    except Exception as e:
+        print(f"Error reading metadata from {file_path}: {e}")
+        return metadata
+    if audio is None:
+        return metadata
+
+    info = getattr(audio, 'info', None)
+    if info is not None:
+        metadata['duration'] = float(getattr(info, 'length', 0) or 0)
+        metadata['bitrate'] = int(getattr(info, 'bitrate', 0) or 0)
+        metadata['sample_rate'] = int(getattr(info, 'sample_rate', 0) or 0)
+
+    tags = audio.tags or {}
+    try:
+        metadata['artist'] = _first_tag(tags, 'artist')
+        metadata['album'] = _first_tag(tags, 'album')
+        # Track numbers are stored as "3" or "3/12"
+        track = _first_tag(tags, 'tracknumber').split('/')[0]
+        metadata['track_number'] = int(track) if track.isdigit() else 0
+    except Exception as e:
+        print(f"Error reading tags from {file_path}: {e}")
+    return metadata
+
+
+def _first_tag(tags, key):
+    value = tags.get(key) if hasattr(tags, 'get') else None
+    if isinstance(value, list):
+        value = value[0] if value else ''
+    return str(value).strip() if value else ''
+
+
+class MetadataManager:
+    """Extracts song metadata in a background thread pool and caches it on disk.
+
+    Cache entries are keyed on the file's (size, mtime) so a song is only
+    parsed again after it changes. Readers only ever look at the cache.
+    """
+
+    def __init__(self, cache_file=None, max_workers=None, batch_size=256):
+        self.cache_file = cache_file or get_metadata_cache_path()
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.cache = self.load_cache()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._worker = None
+        self._cancel = threading.Event()
+        self._requested = set()
+        self._extracted = []  # paths extracted since the last take_extracted()
+
+    def load_cache(self):
+        """Load cached metadata from file"""
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    return data.get('songs', {})
+            except Exception as e:
+                print(f"Error loading metadata cache: {e}")
+        return {}
+
+    def save_cache(self):
+        """Save cached metadata atomically"""
+        try:
+            with self._lock:
+                data = {'version': CACHE_VERSION, 'songs': dict(self.cache)}
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = f"{self.cache_file}.tmp"
+            with self._save_lock:
+                with open(temp_file, 'w') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Error saving metadata cache: {e}")
+
+    def get(self, file_path):
+        """Get cached metadata for a song, or None if it has not been extracted yet"""
+        return self.cache.get(file_path)
+
+    def get_duration(self, file_path):
+        entry = self.cache.get(file_path)
+        return entry['duration'] if entry else 0
+
+    def is_fresh(self, file_path, size, mtime):
+        entry = self.cache.get(file_path)
+        return entry is not None and entry['size'] == size and entry['mtime'] == mtime
+
+    def remove(self, file_paths):
+        """Drop cached metadata for songs that no longer exist"""
+        with self._lock:
+            for file_path in file_paths:
+                self.cache.pop(file_path, None)
+
+    def extract(self, signatures, on_complete=None):
+        """Extract metadata for (path, size, mtime) tuples in the background.
+
+        Songs whose cache entry still matches their size and mtime are skipped.
+        A previous extraction still in progress is cancelled first.
+        on_complete is called from the worker thread with the number of songs
+        extracted, so UI callers should hand it over with root.after().
+        """
+        self.cancel()
+        self._cancel = threading.Event()
+        self._worker = threading.Thread(
+            target=self._extract_worker,
+            args=(list(signatures), self._cancel, on_complete),
+            daemon=True
+        )
+        self._worker.start()
+        return self._worker
+
+    def extract_now(self, signatures):
+        """Extract metadata for stale songs and wait for the result"""
+        return self._extract_worker(list(signatures), threading.Event(), None)
+
+    def request(self, file_path, on_complete=None):
+        """Extract one song's metadata in the background unless it is cached or already requested.
+
+        on_complete is called from the worker thread with the metadata.
+        """
+        with self._lock:
+            if file_path in self.cache or file_path in self._requested:
+                return False
+            self._requested.add(file_path)
+        threading.Thread(target=self._request_worker, args=(file_path, on_complete), daemon=True).start()
+        return True
+
+    def _request_worker(self, file_path, on_complete):
+        try:
+            stat = os.stat(file_path)
+            metadata = read_metadata(file_path)
+            metadata['size'] = stat.st_size
+            metadata['mtime'] = stat.st_mtime
+            with self._lock:
+                self.cache[file_path] = metadata
+                self._extracted.append(file_path)
+        except OSError as e:
+            print(f"Error reading metadata from {file_path}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._requested.discard(file_path)
+        if on_complete:
+            on_complete(metadata)
+
+    def take_extracted(self):
+        """Get the paths extracted since the last call, so their search entries can be updated"""
+        with self._lock:
+            extracted, self._extracted = self._extracted, []
+        return extracted
+
+    def cancel(self):
+        """Stop a running extraction after its current batch"""
+        self._cancel.set()
+        self._worker = None
+
+    def is_running(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def _extract_worker(self, signatures, cancel_event, on_complete):
+        stale = [sig for sig in signatures if not self.is_fresh(*sig)]
+        extracted = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Submit in bounded batches so huge libraries don't queue every file at once
+            for start in range(0, len(stale), self.batch_size):
+                if cancel_event.is_set():
+                    break
+                batch = stale[start:start + self.batch_size]
+                results = list(pool.map(read_metadata, [sig[0] for sig in batch]))
+                with self._lock:
+                    for (file_path, size, mtime), metadata in zip(batch, results):
+                        metadata['size'] = size
+                        metadata['mtime'] = mtime
+                        self.cache[file_path] = metadata
+                        self._extracted.append(file_path)
+                extracted += len(batch)
+
+        if extracted:
+            self.save_cache()
+            print(f"Extracted metadata for {extracted} songs")
+        if on_complete:
+            on_complete(extracted)
+        return extracted
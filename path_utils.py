@@ -58,4 +58,49 @@ def get_emotions_file_path():
     Returns:
         str: The emotions.json file path
     """
-    return os.path.join(get_data_directory(), "emotions.json")
\ No newline at end of file
+    return os.path.join(get_data_directory(), "emotions.json")
+
+def get_scan_manifest_path():
+    """
+    Get the scan_manifest.json file path within the Data directory.
+    
+    Returns:
+        str: The scan_manifest.json file path
+    """
+    return os.path.join(get_data_directory(), "scan_manifest.json")
+
+def get_metadata_cache_path():
+    """
+    Get the metadata_cache.json file path within the Data directory.
+    
+    Returns:
+        str: The metadata_cache.json file path
+    """
+    return os.path.join(get_data_directory(), "metadata_cache.json")
+
+def get_playlist_snapshot_path():
+    """
+    Get the playlist_snapshot.bin file path within the Data directory.
+    
+    Returns:
+        str: The playlist_snapshot.bin file path
+    """
+    return os.path.join(get_data_directory(), "playlist_snapshot.bin")
+
+def get_database_path():
+    """
+    Get the player_data.db database file path within the Data directory.
+    
+    Returns:
+        str: The player_data.db file path
+    """
+    return os.path.join(get_data_directory(), "player_data.db")
+
+def get_startup_profile_path():
+    """
+    Get the startup_profile.json file path within the Data directory.
+    
+    Returns:
+        str: The startup_profile.json file path
+    """
+    return os.path.join(get_data_directory(), "startup_profile.json")
@@ -1,15 +1,22 @@
 import pygame
-from mutagen.mp3 import MP3
 import time
+import uuid
 import threading
 
 class MusicPlayer:
+    @staticmethod
+    def init_audio():
+        """Open the audio device; call it on the main thread (SDL expects that)"""
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
     def __init__(self, playlist_manager, history_manager):
-        pygame.mixer.init()
+        self.init_audio()
         self.playlist_manager = playlist_manager
         self.history_manager = history_manager
         self.current_song = None
         self.current_song_title = None
+        self.play_id = None  # Identifies the current play in the history log
         self.paused = False
         self.volume = 0.5
         pygame.mixer.music.set_volume(self.volume)
@@ -23,10 +30,11 @@ class MusicPlayer:
                 pygame.mixer.music.play()
                 self.current_song = song_path
                 self.current_song_title = song_title
+                self.play_id = uuid.uuid4().hex
                 self.playing = True
                 self.paused = False
                 if song_title:
-                    self.history_manager.add_to_history(song_path, song_title)
+                    self.history_manager.add_to_history(song_path, song_title, self.play_id)
                 return True
             except pygame.error:
                 print(f"Error playing {song_path}")
@@ -68,8 +76,12 @@ class MusicPlayer:
 
     def get_song_length(self):
         if self.current_song:
-            audio = MP3(self.current_song)
-            return audio.info.length
+            # Prefer the length read by the background metadata extraction (or saved in the snapshot)
+            duration = self.playlist_manager.get_song_duration(self.current_song)
+            if duration:
+                return duration
+            # Not extracted yet; read it off the playback path and report 0 until it lands
+            self.playlist_manager.request_song_metadata(self.current_song)
         return 0
 
     def seek(self, position):
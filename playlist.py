@@ -1,9 +1,19 @@
 import os
-import json
 import random
+import time
+import queue
+import threading
 from mutagen import File
 import customtkinter as ctk
 from tkinter import ttk
+from library_scanner import LibraryScanner, ScanDiff, ScanCancelToken
+from metadata_manager import MetadataManager
+from song_catalog import SongCatalog, PlaylistView
+from playlist_snapshot import PlaylistSnapshot
+from search_index import TrigramIndex
+from tag_journal import TagJournal
+from data_store import DataStore
+from path_utils import get_scan_manifest_path, get_metadata_cache_path, get_playlist_snapshot_path, get_database_path
 
 class PlaylistManager:
     # Emotion class numbers
@@ -12,22 +22,23 @@ class PlaylistManager:
     HAPPY = 2
     SAD = 3
 
-    def __init__(self):
-        self.current_folder = None
-        self.playlist = []
-        self.supported_formats = ['.mp3', '.wav', '.ogg']
-        
-        # Get application directory
-        app_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Define tags file path in Data folder
-        data_dir = os.path.join(app_dir, "Data")
-        self.tags_file = os.path.join(data_dir, "song_tags.json")
+    def __init__(self, data_store=None, data_dir=None):
+        # data_dir keeps the manifest, caches, snapshot and database out of the Data folder (benchmarks)
+        def data_file(default_path):
+            return os.path.join(data_dir, os.path.basename(default_path)) if data_dir else None
         
-        # Create Data directory if it doesn't exist
-        os.makedirs(data_dir, exist_ok=True)
+        self.current_folder = None
+        self.supported_formats = ['.mp3', '.wav', '.ogg', '.flac']
+        self.scanner = LibraryScanner(self.supported_formats, data_file(get_scan_manifest_path()))
+        self.metadata_manager = MetadataManager(data_file(get_metadata_cache_path()))
+        self.snapshot = PlaylistSnapshot(data_file(get_playlist_snapshot_path()))
+        self.last_scan_diff = None
+        self._scan_token = None
+        self._unverified_snapshot = False  # catalog came from the snapshot and has not been validated yet
         
-        self.song_tags = self.load_song_tags()
+        # Tags are read from the data store per song; changes go through a write-behind journal
+        self.data_store = data_store or DataStore(data_file(get_database_path()), migrate=data_dir is None)
+        self.tag_journal = TagJournal(self.data_store)
         
         # Emotion mapping
         self.emotion_map = {
@@ -40,153 +51,458 @@ class PlaylistManager:
             self.HAPPY: 'happy',
             self.SAD: 'sad'
         }
+        
+        # Songs live in a compact catalog; playlist is a list-of-dicts view over it
+        self.catalog = SongCatalog(self.emotion_names)
+        self.playlist = PlaylistView(self.catalog)
+        self.search_index = TrigramIndex()
+
+    def load_song_tags(self, song_paths):
+        """Get saved emotion numbers {path: [numbers]} for songs, including uncommitted changes"""
+        song_paths = list(song_paths)
+        tags = self.data_store.get_song_tags(song_paths)
+        for song_path in song_paths:
+            pending = self.tag_journal.pending_tags(song_path)
+            if pending is not None:
+                tags[song_path] = pending
+        return tags
 
-    def load_song_tags(self):
-        """Load saved song tags from file"""
-        if os.path.exists(self.tags_file):
+    def save_song_tags(self):
+        """Write pending tag changes to disk now"""
+        self.tag_journal.flush()
+
+    def shutdown(self):
+        """Stop background work and persist everything before exit"""
+        self.cancel_folder_load()
+        self.metadata_manager.cancel()
+        self.save_snapshot()
+        self.tag_journal.close()
+
+    def save_snapshot(self):
+        """Save the loaded catalog so the next start can show it before scanning"""
+        if self.current_folder and len(self.catalog):
+            self.snapshot.save(self.current_folder, self.catalog.export_columns(self.metadata_manager.get_duration))
+
+    def load_snapshot(self, folder_path):
+        """Fill the catalog from the saved snapshot of folder_path; False if there is none.
+
+        Nothing is checked against the disk and the search index stays
+        empty, so follow up with validate_snapshot_async().
+        """
+        columns = self.snapshot.load(folder_path)
+        if columns is None:
+            return False
+        self.cancel_folder_load()
+        self._clear_songs()
+        self.catalog.load_columns(columns)
+        self.current_folder = folder_path
+        self._unverified_snapshot = True
+        print(f"Loaded {len(self.catalog)} songs from the playlist snapshot")
+        return True
+
+    def validate_snapshot_async(self, widget, on_done=None, index_chunk=2000):
+        """Check a catalog loaded by load_snapshot() against the disk and patch the differences.
+
+        The folder is rescanned (unchanged directories are skipped by their
+        mtime) and saved tags are read on a background thread, while the
+        search index is built in chunks on the Tk main loop. Added and removed
+        songs and tags changed since the snapshot are then applied in place.
+        on_done(changed) is called on the main thread. Returns the cancel token.
+        """
+        self.cancel_folder_load()
+        token = ScanCancelToken()
+        self._scan_token = token
+        folder_path = self.current_folder
+        catalog = self.catalog
+        song_ids = list(catalog.ids())
+        known = [(song_id, catalog.get_path(song_id), catalog.get_emotion_mask(song_id)) for song_id in song_ids]
+        results = {}
+        finished = threading.Event()
+        
+        def validate_worker():
             try:
-                with open(self.tags_file, 'r') as f:
-                    return json.load(f)
+                diff = ScanDiff(os.path.normpath(folder_path))
+                for _ in self.scanner.iter_scan(folder_path, diff, cancel_token=token):
+                    pass
+                if token.is_cancelled():
+                    return
+                # The manifest now matches the disk, compare the snapshot with it
+                on_disk = set(self.scanner.get_files(folder_path))
+                known_paths = {path for _, path, _ in known}
+                tags = self.data_store.get_all_song_tags()
+                results['diff'] = diff
+                results['added'] = [path for path in on_disk if path not in known_paths]
+                results['removed'] = [path for path in known_paths if path not in on_disk]
+                results['retag'] = [
+                    path for _, path, mask in known
+                    if path in on_disk and catalog.mask_of(tags.get(path, ())) != mask
+                ]
             except Exception as e:
-                print(f"Error loading song tags: {e}")
-        return {}
+                print(f"Error validating playlist snapshot: {e}")
+            finally:
+                finished.set()
+                
+        def pump(start=0):
+            if token.is_cancelled():
+                return
+            if start < len(song_ids):
+                for song_id in song_ids[start:start + index_chunk]:
+                    self._index_song(song_id)
+                widget.after(1, pump, start + index_chunk)
+                return
+            if not finished.is_set():
+                widget.after(30, pump, start)
+                return
+            self._scan_token = None
+            changed = self._apply_validation(results)
+            self._finish_folder_load(folder_path)
+            if on_done:
+                on_done(changed)
+                
+        threading.Thread(target=validate_worker, daemon=True).start()
+        widget.after(10, pump)
+        return token
 
-    def save_song_tags(self):
-        """Save song tags to file"""
-        try:
-            with open(self.tags_file, 'w') as f:
-                json.dump(self.song_tags, f, indent=4)
-        except Exception as e:
-            print(f"Error saving song tags: {e}")
+    def _apply_validation(self, results):
+        """Patch the catalog with what validate_snapshot_async() found; True if anything changed"""
+        if 'diff' not in results:
+            return False
+        self.last_scan_diff = results['diff']
+        self._unverified_snapshot = False
+        self._remove_songs(results['removed'])
+        self._add_songs(results['added'])
+        # Re-read on this thread so tag changes made meanwhile are not overwritten
+        tags = self.load_song_tags(results['retag'])
+        for song_path in results['retag']:
+            song_id = self.catalog.get_id(song_path)
+            if song_id is not None:
+                self.catalog.set_emotion_mask(song_id, self.catalog.mask_of(tags.get(song_path, ())))
+        return bool(results['removed'] or results['added'] or results['retag'])
 
-    def load_folder(self, folder_path):
-        """Load music files from folder"""
+    def load_folder(self, folder_path, full_rescan=False):
+        """Load music files from folder, rescanning only what changed since the last scan"""
         try:
             if not os.path.exists(folder_path):
                 print(f"Folder not found: {folder_path}")
                 return False
                 
-            # Clear existing playlist
-            self.playlist.clear()
+            # A synchronous load replaces any background load in progress
+            self.cancel_folder_load()
             
-            # Load saved emotion tags
-            saved_tags = self.load_song_tags()
+            # Compare the folder against the scan manifest
+            diff = self.scanner.scan(folder_path, full=full_rescan)
             
-            # Walk through directory
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    if file.lower().endswith(('.mp3', '.wav', '.ogg', '.flac')):
-                        file_path = os.path.join(root, file)
-                        
-                        # Create song entry
-                        song = {
-                            'path': file_path,
-                            'title': os.path.splitext(file)[0],
-                            'emotions': saved_tags.get(file_path, {'emotions': [], 'emotion_numbers': []})['emotions'],
-                            'emotion_numbers': saved_tags.get(file_path, {'emotions': [], 'emotion_numbers': []})['emotion_numbers']
-                        }
-                        
-                        self.playlist.append(song)
-                        
-            # Sort playlist by title
-            self.playlist.sort(key=lambda x: x['title'].lower())
+            if folder_path == self.current_folder and len(self.catalog) and not self._unverified_snapshot:
+                # Same folder already loaded, patch the catalog in place
+                self.apply_scan_diff(diff)
+            else:
+                # New folder, build the catalog from the manifest
+                self._clear_songs()
+                self._add_songs(self.scanner.get_files(folder_path))
+                
+            self.current_folder = folder_path
+            self.last_scan_diff = diff
             
-            print(f"Loaded {len(self.playlist)} songs from {folder_path}")
+            # Read tags for new and changed songs in the background
+            self._finish_folder_load(folder_path)
             return True
             
         except Exception as e:
             print(f"Error loading folder: {e}")
             return False
 
+    def load_folder_batches(self, folder_path, batch_size=300, cancel_token=None, first_batch_delay=0.05):
+        """Scan folder and yield batches of song file paths.
+
+        Does not touch the catalog, so it is safe to run off the UI thread.
+        The first batch is yielded early (after first_batch_delay seconds)
+        so the view has something to show while the rest is scanned.
+        """
+        diff = ScanDiff(folder_path)
+        started = time.perf_counter()
+        first_batch = True
+        batch = []
+        
+        for dir_path, file_names in self.scanner.iter_scan(folder_path, diff, cancel_token=cancel_token):
+            for file_name in file_names:
+                batch.append(os.path.join(dir_path, file_name))
+                if len(batch) >= batch_size or (
+                    first_batch and time.perf_counter() - started >= first_batch_delay
+                ):
+                    yield batch
+                    batch = []
+                    first_batch = False
+                    
+        if cancel_token is not None and cancel_token.is_cancelled():
+            return
+        if batch:
+            yield batch
+        self.last_scan_diff = diff
+
+    def load_folder_async(self, folder_path, widget, on_batch=None, on_done=None, batch_size=300):
+        """Load a folder on a background thread, merging batches into the playlist on the Tk main loop.
+
+        Starting a new load cancels the one in progress. on_batch and on_done
+        are called on the main thread. Returns the scan's cancel token.
+        """
+        if self._scan_token is not None:
+            self._scan_token.cancel()
+        token = ScanCancelToken()
+        self._scan_token = token
+        
+        if not os.path.exists(folder_path):
+            print(f"Folder not found: {folder_path}")
+            return token
+            
+        self._clear_songs()
+        self.current_folder = folder_path
+        batches = queue.Queue()
+        
+        def scan_worker():
+            try:
+                for batch in self.load_folder_batches(folder_path, batch_size, token):
+                    batches.put(batch)
+            except Exception as e:
+                print(f"Error loading folder: {e}")
+            finally:
+                batches.put(None)
+                
+        def pump():
+            if token.is_cancelled():
+                return
+            new_paths = []
+            finished = False
+            while True:
+                try:
+                    batch = batches.get_nowait()
+                except queue.Empty:
+                    break
+                if batch is None:
+                    finished = True
+                    break
+                new_paths.extend(batch)
+                
+            if new_paths:
+                self.merge_songs(new_paths)
+                if on_batch:
+                    on_batch(new_paths)
+                    
+            if finished:
+                self._scan_token = None
+                self._finish_folder_load(folder_path)
+                if on_done:
+                    on_done()
+            else:
+                widget.after(30, pump)
+                
+        threading.Thread(target=scan_worker, daemon=True).start()
+        widget.after(10, pump)
+        return token
+
+    def cancel_folder_load(self):
+        """Abort the folder load in progress, if any"""
+        if self._scan_token is not None:
+            self._scan_token.cancel()
+            self._scan_token = None
+
+    def merge_songs(self, song_paths):
+        """Add songs to the catalog with their saved tags; they appear in sorted position"""
+        return self._add_songs(song_paths)
+
+    def _finish_folder_load(self, folder_path):
+        diff = self.last_scan_diff
+        if diff is not None:
+            self.metadata_manager.remove(diff.removed)
+        self.metadata_manager.extract(self.scanner.get_signatures(folder_path))
+        self.save_snapshot()
+        print(f"Loaded {len(self.playlist)} songs from {folder_path} ({diff})")
+
+    def apply_scan_diff(self, diff):
+        """Patch the playlist with the songs added and removed by a rescan"""
+        self._remove_songs(diff.removed)
+        self._add_songs(diff.added)
+
+    def _add_songs(self, song_paths):
+        """Add songs with their saved tags to the catalog and the search index"""
+        song_paths = list(song_paths)
+        ids = self.catalog.add_many(song_paths, self.load_song_tags(song_paths))
+        for song_id in ids:
+            self._index_song(song_id)
+        return ids
+
+    def _remove_songs(self, song_paths):
+        for song_path in song_paths:
+            song_id = self.catalog.get_id(song_path)
+            if song_id is not None:
+                self.catalog.remove(song_id)
+                self.search_index.remove(song_id)
+
+    def _clear_songs(self):
+        self.catalog.clear()
+        self.search_index.clear()
+        self._unverified_snapshot = False
+
+    def _index_song(self, song_id):
+        """Index a song's title, plus artist and album when already extracted"""
+        metadata = self.metadata_manager.get(self.catalog.get_path(song_id)) or {}
+        self.search_index.add(
+            song_id,
+            self.catalog.get_title(song_id),
+            metadata.get('artist'),
+            metadata.get('album')
+        )
+
+    def _index_extracted(self):
+        """Re-index songs whose artist and album were extracted since the last search"""
+        for song_path in self.metadata_manager.take_extracted():
+            song_id = self.catalog.get_id(song_path)
+            if song_id is not None and song_id in self.search_index:
+                self._index_song(song_id)
+
     def add_tag(self, song_path, emotion):
         """Add an emotion tag to a song"""
-        if song_path not in self.song_tags:
-            self.song_tags[song_path] = {'emotions': [], 'emotion_numbers': []}
-            
-        tags = self.song_tags[song_path]
+        emotion_number = self.emotion_map.get(emotion, self.UNTAGGED)
+        numbers = self.get_song_emotion_numbers(song_path)
         
-        # Add emotion name if not present
-        if emotion not in tags['emotions']:
-            tags['emotions'].append(emotion)
-            
         # Add emotion number if not present
-        emotion_number = self.emotion_map.get(emotion, self.UNTAGGED)
-        if emotion_number not in tags['emotion_numbers']:
-            tags['emotion_numbers'].append(emotion_number)
-            
-        self.save_song_tags()
-            
-        # Update playlist entry
-        for song in self.playlist:
-            if song['path'] == song_path:
-                if emotion not in song['emotions']:
-                    song['emotions'].append(emotion)
-                if emotion_number not in song['emotion_numbers']:
-                    song['emotion_numbers'].append(emotion_number)
-                break
+        if emotion_number not in numbers:
+            numbers.append(emotion_number)
+            self._set_song_tags(song_path, numbers)
 
     def remove_tag(self, song_path, emotion):
         """Remove an emotion tag from a song"""
-        if song_path in self.song_tags:
-            tags = self.song_tags[song_path]
-            emotion_number = self.emotion_map.get(emotion, self.UNTAGGED)
-            
-            if emotion in tags['emotions']:
-                tags['emotions'].remove(emotion)
-            if emotion_number in tags['emotion_numbers']:
-                tags['emotion_numbers'].remove(emotion_number)
-                
-            self.save_song_tags()
-            
-            # Update playlist entry
-            for song in self.playlist:
-                if song['path'] == song_path:
-                    if emotion in song['emotions']:
-                        song['emotions'].remove(emotion)
-                    if emotion_number in song['emotion_numbers']:
-                        song['emotion_numbers'].remove(emotion_number)
-                    break
+        emotion_number = self.emotion_map.get(emotion, self.UNTAGGED)
+        numbers = self.get_song_emotion_numbers(song_path)
+        
+        if emotion_number in numbers:
+            numbers.remove(emotion_number)
+            self._set_song_tags(song_path, numbers)
+
+    def get_song_emotion_numbers(self, song_path):
+        """Get a song's emotion numbers from the catalog, or the data store if not loaded"""
+        song_id = self.catalog.get_id(song_path)
+        if song_id is not None:
+            return self.catalog.get_emotion_numbers(song_id)
+        return self.load_song_tags([song_path]).get(song_path, [])
+
+    def _set_song_tags(self, song_path, emotion_numbers):
+        self.tag_journal.record(song_path, emotion_numbers)
+        
+        # Update catalog entry
+        song_id = self.catalog.get_id(song_path)
+        if song_id is not None:
+            self.catalog.set_emotion_mask(song_id, self.catalog.mask_of(emotion_numbers))
 
     def get_songs_by_tag(self, emotion):
         """Get all songs with a specific emotion tag"""
-        emotion_number = self.emotion_map.get(emotion, self.UNTAGGED)
-        return [song for song in self.playlist if emotion_number in song.get('emotion_numbers', [])]
+        return self.query_songs(emotion=emotion)
+
+    def set_song_emotion(self, song_path, emotion):
+        """Make emotion the only tag of a song"""
+        self.set_songs_emotion([song_path], emotion)
+
+    def set_songs_emotion(self, song_paths, emotion):
+        """Make emotion the only tag of many songs; persisted as one commit"""
+        emotion_number = self.emotion_map.get(emotion.lower(), self.UNTAGGED)
+        song_paths = list(song_paths)
+        self.tag_journal.record_many((song_path, [emotion_number]) for song_path in song_paths)
+        for song_path in song_paths:
+            song_id = self.catalog.get_id(song_path)
+            if song_id is not None:
+                self.catalog.set_emotion_mask(song_id, 1 << emotion_number)
+
+    def set_song_ids_emotion(self, song_ids, emotion):
+        """Make emotion the only tag of the songs with these IDs; persisted as one commit"""
+        emotion_number = self.emotion_map.get(emotion.lower(), self.UNTAGGED)
+        catalog = self.catalog
+        song_ids = [song_id for song_id in song_ids if catalog.is_live(song_id)]
+        self.tag_journal.record_many((catalog.get_path(song_id), [emotion_number]) for song_id in song_ids)
+        for song_id in song_ids:
+            catalog.set_emotion_mask(song_id, 1 << emotion_number)
+        return song_ids
+
+    def query_id_set(self, search='', emotion=None, folder=None):
+        """Get the set of IDs of songs matching a search, an emotion and a folder filter.
+
+        emotion is an emotion name, 'untagged', or None/'all' for no filter;
+        folder limits the result to a folder and its subfolders. Returns None
+        when nothing is filtered. The set may be shared, don't modify it.
+        """
+        result = None
+        if emotion and emotion.lower() != 'all':
+            emotion = emotion.lower()
+            if emotion == 'untagged':
+                emotion_number = self.UNTAGGED
+            else:
+                emotion_number = self.emotion_map.get(emotion, self.UNTAGGED)
+            result = self.catalog.ids_with_emotion(emotion_number)
+            
+        if search:
+            self._index_extracted()
+            matches = self.search_index.search(search)
+            result = matches if result is None else result & matches
+
+        if folder:
+            in_folder = self.catalog.ids_in_folder(folder)
+            result = in_folder if result is None else result & in_folder
+        return result
+
+    def query_ids(self, search='', emotion=None, folder=None):
+        """Get IDs of songs matching the filters of query_id_set, in playlist order"""
+        result = self.query_id_set(search, emotion, folder)
+        if result is None:
+            return list(self.catalog.ids())
+        return self.order_ids(result)
+
+    def query_songs(self, search='', emotion=None):
+        """Get songs matching a search and an emotion filter, in playlist order"""
+        return [self.catalog.song(song_id) for song_id in self.query_ids(search, emotion)]
 
     def search_songs(self, query):
-        """Search songs by title"""
-        query = query.lower()
-        return [song for song in self.playlist if query in song['title'].lower()]
+        """Search songs by title (and artist/album when known)"""
+        return [self.catalog.song(song_id) for song_id in self.search_ids(query)]
+
+    def search_ids(self, query):
+        """Get IDs of songs matching query, in playlist order"""
+        self._index_extracted()
+        return self.order_ids(self.search_index.search(query))
+
+    def order_ids(self, song_ids):
+        """Put a set of song IDs into playlist order"""
+        catalog = self.catalog
+        if len(song_ids) * 8 > len(catalog):
+            # Large result: one pass over the playlist order is cheaper than sorting
+            return [song_id for song_id in catalog.ids() if song_id in song_ids]
+        return sorted(song_ids, key=catalog.index_of)
 
     def get_recommendations(self, emotion):
         """Get song recommendations based on emotion"""
+        return [song['title'] for song in self.get_recommended_songs(emotion)]
+
+    def get_recommended_songs(self, emotion, count=10):
+        """Get up to count random songs tagged with emotion, falling back to happy songs"""
         try:
             print(f"Getting recommendations for emotion: {emotion}")  # Debug
             
             # Get songs matching the emotion
-            matching_songs = self.get_songs_by_tag(emotion)
-            print(f"Found {len(matching_songs)} songs with {emotion} tag")  # Debug
+            matching_ids = self.query_id_set(emotion=emotion) or set()
+            print(f"Found {len(matching_ids)} songs with {emotion} tag")  # Debug
             
             # If no songs found for the emotion, use happy songs as fallback
-            if not matching_songs and emotion != 'happy':
+            if not matching_ids and emotion != 'happy':
                 print("No matching songs found, falling back to happy songs")  # Debug
-                matching_songs = self.get_songs_by_tag('happy')
+                matching_ids = self.query_id_set(emotion='happy') or set()
             
             # If still no songs, return empty list
-            if not matching_songs:
+            if not matching_ids:
                 print("No recommendations found")  # Debug
                 return []
             
-            # Get the song titles
-            recommendations = [song['title'] for song in matching_songs]
-            
-            # Shuffle the recommendations
-            random.shuffle(recommendations)
+            # Pick at most count songs at random
+            song_ids = random.sample(list(matching_ids), min(count, len(matching_ids)))
+            print(f"Returning {len(song_ids)} recommendations")  # Debug
             
-            # Return at most 10 recommendations
-            recommendations = recommendations[:10]
-            print(f"Returning {len(recommendations)} recommendations")  # Debug
-            
-            return recommendations
+            return [self.catalog.song(song_id) for song_id in song_ids]
             
         except Exception as e:
             print(f"Error getting recommendations: {str(e)}")  # Debug
@@ -195,9 +511,50 @@ class PlaylistManager:
     def get_playlist(self):
         return self.playlist
 
+    def get_song(self, song_path):
+        """Get the playlist entry for a song path in O(1), or None"""
+        song_id = self.catalog.get_id(song_path)
+        return self.catalog.song(song_id) if song_id is not None else None
+
+    def get_song_by_id(self, song_id):
+        return self.catalog.song(song_id)
+
+    def get_adjacent_song(self, song_path, offset):
+        """Get the song offset places away from song_path in playlist order, or None"""
+        song_id = self.catalog.get_id(song_path) if song_path else None
+        if song_id is None:
+            return None
+        index = self.catalog.index_of(song_id) + offset
+        if index < 0 or index >= len(self.catalog):
+            return None
+        return self.catalog.song(self.catalog.id_at(index))
+
+    def get_song_metadata(self, song_path):
+        """Get cached metadata (duration, artist, album, ...) for a song, or None"""
+        return self.metadata_manager.get(song_path)
+
+    def get_song_duration(self, song_path):
+        """Get a song's length in seconds from the metadata cache or the snapshot, or None"""
+        duration = self.metadata_manager.get_duration(song_path)
+        if not duration:
+            song_id = self.catalog.get_id(song_path)
+            if song_id is not None:
+                duration = self.catalog.get_duration(song_id)
+        return duration or None
+
+    def request_song_metadata(self, song_path):
+        """Have a song's metadata extracted in the background if it is not cached yet"""
+        return self.metadata_manager.request(song_path)
+
     def get_current_folder(self):
         return self.current_folder
 
+    def get_subfolders(self):
+        """Get the names of the current folder's subfolders that contain songs"""
+        if not self.current_folder:
+            return []
+        return self.catalog.subfolders(self.current_folder)
+
 class PlaylistFrame(ctk.CTkFrame):
     def __init__(self, parent, playlist_manager, language_manager, **kwargs):
         super().__init__(parent, **kwargs)
@@ -298,14 +655,8 @@ class PlaylistFrame(ctk.CTkFrame):
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        # Get playlist with filters
-        playlist = self.playlist_manager.get_playlist()
-        
-        if self.current_search:
-            playlist = self.playlist_manager.search_songs(self.current_search)
-        
-        if self.current_filter != 'all':
-            playlist = self.playlist_manager.get_songs_by_tag(self.current_filter)
+        # Get playlist with search and emotion filter combined
+        playlist = self.playlist_manager.query_songs(self.current_search, self.current_filter)
         
         # Add songs to tree
         for song in playlist:
@@ -0,0 +1,141 @@
+import os
+import sys
+import zlib
+import struct
+from array import array
+from path_utils import get_playlist_snapshot_path
+
+SNAPSHOT_MAGIC = b'KPSN'
+SNAPSHOT_VERSION = 1
+
+# magic, format version, CRC32 of the body
+HEADER = struct.Struct('<4sHI')
+LENGTH = struct.Struct('<I')
+
+# Body sections in file order: text sections are NUL-joined UTF-8, the others raw arrays
+TEXT_SECTIONS = ('folder', 'dirs', 'exts', 'titles')
+ARRAY_SECTIONS = (('song_dir', 'I'), ('song_ext', 'B'), ('emotions', 'B'), ('durations', 'f'))
+
+
+class SnapshotError(Exception):
+    """The snapshot file is damaged"""
+
+
+class PlaylistSnapshot:
+    """Binary copy of the last loaded catalog, so the playlist shows up before any scan.
+
+    The file holds the SongCatalog columns of one music folder (directories,
+    extensions, titles, tag masks and durations, in title order). Text goes
+    in as NUL-joined UTF-8 and numbers as little-endian arrays, so loading
+    is one read, a CRC check and a few array.frombytes() calls. A file with
+    another format version is ignored and a damaged one deleted; either way
+    the next save writes a fresh one.
+    """
+
+    def __init__(self, snapshot_file=None):
+        self.snapshot_file = snapshot_file or get_playlist_snapshot_path()
+
+    def save(self, folder, columns):
+        """Write a folder's catalog columns atomically"""
+        try:
+            body = bytearray()
+            for name in TEXT_SECTIONS:
+                items = [os.path.normpath(folder)] if name == 'folder' else columns[name]
+                self._append(body, '\0'.join(items).encode('utf-8', 'surrogateescape'))
+            for name, typecode in ARRAY_SECTIONS:
+                values = array(typecode, columns[name])
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                self._append(body, values.tobytes())
+
+            os.makedirs(os.path.dirname(self.snapshot_file), exist_ok=True)
+            temp_file = f"{self.snapshot_file}.tmp"
+            with open(temp_file, 'wb') as f:
+                f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, zlib.crc32(body)))
+                f.write(body)
+            os.replace(temp_file, self.snapshot_file)
+            return True
+        except Exception as e:
+            print(f"Error saving playlist snapshot: {e}")
+            return False
+
+    def load(self, folder):
+        """Get the saved catalog columns for folder, or None if there is no usable snapshot"""
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Error loading playlist snapshot: {e}")
+            return None
+
+        try:
+            columns = self._parse(data)
+        except SnapshotError as e:
+            print(f"Playlist snapshot is damaged, it will be rebuilt: {e}")
+            self.delete()
+            return None
+        if columns is None or columns['folder'] != os.path.normpath(folder):
+            return None
+        return columns
+
+    def delete(self):
+        try:
+            os.remove(self.snapshot_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error deleting playlist snapshot: {e}")
+
+    @staticmethod
+    def _append(body, section):
+        body += LENGTH.pack(len(section))
+        body += section
+
+    def _parse(self, data):
+        if len(data) < HEADER.size:
+            raise SnapshotError("file is truncated")
+        magic, version, checksum = HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("not a playlist snapshot")
+        if version != SNAPSHOT_VERSION:
+            return None
+        body = memoryview(data)[HEADER.size:]
+        if zlib.crc32(body) != checksum:
+            raise SnapshotError("checksum mismatch")
+
+        sections = []
+        offset = 0
+        while offset < len(body):
+            if offset + LENGTH.size > len(body):
+                raise SnapshotError("file is truncated")
+            (size,) = LENGTH.unpack_from(body, offset)
+            offset += LENGTH.size
+            sections.append(body[offset:offset + size])
+            offset += size
+        if offset != len(body) or len(sections) != len(TEXT_SECTIONS) + len(ARRAY_SECTIONS):
+            raise SnapshotError("unexpected layout")
+
+        columns = {}
+        for name, section in zip(TEXT_SECTIONS, sections):
+            text = bytes(section).decode('utf-8', 'surrogateescape')
+            columns[name] = text.split('\0') if text else []
+        columns['folder'] = columns['folder'][0] if columns['folder'] else ''
+        for (name, typecode), section in zip(ARRAY_SECTIONS, sections[len(TEXT_SECTIONS):]):
+            values = array(typecode)
+            try:
+                values.frombytes(section)
+            except ValueError:
+                raise SnapshotError(f"bad {name} column")
+            if sys.byteorder == 'big':
+                values.byteswap()
+            columns[name] = values
+
+        count = len(columns['titles'])
+        if any(len(columns[name]) != count for name, _ in ARRAY_SECTIONS):
+            raise SnapshotError("columns differ in length")
+        if count and (max(columns['song_dir']) >= len(columns['dirs'])
+                      or max(columns['song_ext']) >= len(columns['exts'])):
+            raise SnapshotError("bad directory or extension reference")
+        return columns
@@ -3,9 +3,10 @@ from player import MusicPlayer
 from tkinter import messagebox
 
 class RecommendationWindow(ctk.CTkToplevel):
-    def __init__(self, parent, recommended_songs, playlist_manager, language_manager, detected_emotion):
+    def __init__(self, parent, recommended_songs, playlist_manager, language_manager, detected_emotion, on_play=None):
         super().__init__(parent)
         
+        self.on_play = on_play  # called with the song dict to play it
         self.recommended_songs = recommended_songs
         self.playlist_manager = playlist_manager
         self.language_manager = language_manager
@@ -99,7 +100,10 @@ class RecommendationWindow(ctk.CTkToplevel):
         """Play the selected song"""
         try:
             # Play the song
-            self.playlist_manager.play_song(song['path'])
+            if self.on_play:
+                self.on_play(song)
+            else:
+                self.playlist_manager.play_song(song['path'])
             # Close the window
             self.destroy()
         except Exception as e:
@@ -0,0 +1,125 @@
+import unicodedata
+from array import array
+
+# Keeps trigrams from spanning two fields (title / artist / album)
+FIELD_SEPARATOR = '\x00'
+
+
+def normalize(text):
+    """Casefold text and strip accents so "Beyoncé" matches "beyonce\""""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Substring search over song text using a trigram inverted index.
+
+    Each trigram maps to a compact array of song IDs. A query takes the
+    shortest posting list among its trigrams as candidates and confirms
+    them with a plain substring test, so results are exact. Removed songs
+    are dropped lazily and the postings are compacted once enough of them
+    pile up. The last result is kept so that typing more characters only
+    narrows it instead of searching again.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._texts = {}         # song id -> normalized searchable text
+        self._postings = {}      # trigram -> array of song ids
+        self._stale = 0
+        self._last_query = None
+        self._last_result = None
+        self._short_results = {}  # results for 1-2 character queries, which can't use trigrams
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, song_id):
+        return song_id in self._texts
+
+    def add(self, song_id, *fields):
+        """Index a song's title (and optionally artist, album, ...)"""
+        if song_id in self._texts:
+            self.remove(song_id)
+        text = FIELD_SEPARATOR.join(normalize(field) for field in fields if field)
+        self._texts[song_id] = text
+        postings = self._postings
+        for gram in trigrams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(song_id)
+        self.clear_cache()
+
+    def remove(self, song_id):
+        if self._texts.pop(song_id, None) is None:
+            return
+        self._stale += 1
+        self.clear_cache()
+        if self._stale > 1000 and self._stale > len(self._texts) // 4:
+            self.compact()
+
+    def clear_cache(self):
+        """Forget the last result and the short query results, so the next search starts cold"""
+        self._last_query = None
+        if self._short_results:
+            self._short_results = {}
+
+    def compact(self):
+        """Drop removed songs from the posting lists"""
+        texts = self._texts
+        postings = {}
+        for gram, posting in self._postings.items():
+            live = array('I', (song_id for song_id in posting if song_id in texts))
+            if live:
+                postings[gram] = live
+        self._postings = postings
+        self._stale = 0
+
+    def search(self, query):
+        """Get the set of song IDs whose text contains query (shared, don't modify it)"""
+        query = normalize(query)
+        if not query:
+            return set(self._texts)
+
+        texts = self._texts
+        candidates = None
+        if self._last_query is not None and self._last_query in query:
+            # Longer query: everything it matches also matched the previous one
+            candidates = self._last_result
+
+        if len(query) >= 3:
+            shortest = None
+            for gram in trigrams(query):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    shortest = ()
+                    break
+                if shortest is None or len(posting) < len(shortest):
+                    shortest = posting
+            if candidates is None or len(shortest) < len(candidates):
+                candidates = shortest
+
+        if len(query) < 3 and query in self._short_results:
+            result = self._short_results[query]
+        elif candidates is None:
+            # One or two characters and nothing to narrow: check every song
+            result = {song_id for song_id, text in texts.items() if query in text}
+        else:
+            result = set()
+            for song_id in candidates:
+                text = texts.get(song_id)
+                if text is not None and query in text:
+                    result.add(song_id)
+
+        if len(query) < 3:
+            self._short_results[query] = result
+        self._last_query = query
+        self._last_result = result
+        return result
@@ -1,21 +1,19 @@
-import json
 import os
-import shutil
+import time
+import threading
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-from camera_manager import CameraManager
-from path_utils import get_data_directory
+from data_store import DataStore, EMOTION_NUMBERS
 
 class SettingsManager:
-    def __init__(self):
-        # Get Data directory using path_utils
-        data_dir = get_data_directory()
-        
-        # Define settings file path in Data folder
-        self.settings_file = os.path.join(data_dir, "settings.json")
-        
-        # Create Data directory if it doesn't exist
-        os.makedirs(data_dir, exist_ok=True)
+    # Coalesce saves: write once changes have been quiet for SAVE_DELAY seconds,
+    # but never later than SAVE_MAX_LATENCY seconds after the first unsaved change
+    SAVE_DELAY = 0.5
+    SAVE_MAX_LATENCY = 2.0
+
+    def __init__(self, data_store=None):
+        # Settings are kept in the data store's settings table
+        self.data_store = data_store or DataStore()
         
         self.settings = {
             'music_folder': '',
@@ -23,57 +21,100 @@ class SettingsManager:
             'last_played': None,
             'language': 'en_US',
             'theme': 'light',
-            'emotion_tags': {},  # Store emotion tags persistently
+            'history_retention': 0,  # Plays kept in the history log, 0 keeps all
+            'preload_emotion_detection': False,  # Load the vision stack in the background after startup
+            'save_debug_frames': False,  # Also write captured camera frames to Temp_Image
             'window_position': None,
             'last_playlist': None
         }
+        
+        # Write-behind state
+        self._lock = threading.Condition()
+        self._dirty_since = None
+        self._last_change = None
+        self._writer = None
+        self._closed = False
+        self.save_requests = 0
+        self.physical_writes = 0
+        
+        # apply_settings() touches Tk, so the app calls it on the main thread
         self.load_settings()
-        self.apply_settings()
 
     def load_settings(self):
         """Load settings with improved error handling"""
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, 'r') as f:
-                    saved_settings = json.load(f)
-                    # Update settings while preserving defaults
-                    self.settings.update(saved_settings)
-                    
-                # Verify music folder still exists
-                if self.settings['music_folder'] and not os.path.exists(self.settings['music_folder']):
-                    self.settings['music_folder'] = ''
-                    
-            except Exception as e:
-                print(f"Error loading settings: {e}")
-                # Create backup of corrupted settings
-                if os.path.exists(self.settings_file):
-                    backup_file = f"{self.settings_file}.backup"
-                    try:
-                        shutil.copy2(self.settings_file, backup_file)
-                    except Exception as be:
-                        print(f"Error creating settings backup: {be}")
+        try:
+            # Update settings while preserving defaults
+            self.settings.update(self.data_store.load_settings())
+            
+            # Verify music folder still exists
+            if self.settings['music_folder'] and not os.path.exists(self.settings['music_folder']):
+                self.settings['music_folder'] = ''
+                
+        except Exception as e:
+            print(f"Error loading settings: {e}")
 
     def save_settings(self):
-        """Save settings with backup"""
+        """Mark settings as changed; a background thread writes them shortly after"""
+        with self._lock:
+            now = time.monotonic()
+            self.save_requests += 1
+            self._last_change = now
+            if self._dirty_since is None:
+                self._dirty_since = now
+            if self._writer is None and not self._closed:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+            self._lock.notify()
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._lock:
+            if self._dirty_since is None:
+                return
+            self._dirty_since = None
+            data = dict(self.settings)
+        self._write_settings(data)
+
+    def close(self):
+        """Stop the background writer and write any pending changes"""
+        with self._lock:
+            self._closed = True
+            self._lock.notify()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+
+    def get_write_stats(self):
+        """Get how many saves were requested versus how many reached the disk"""
+        return {'save_requests': self.save_requests, 'physical_writes': self.physical_writes}
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                while self._dirty_since is None and not self._closed:
+                    self._lock.wait()
+                if self._closed:
+                    return
+                # Wait for the changes to settle, bounded by the max latency
+                now = time.monotonic()
+                deadline = min(self._last_change + self.SAVE_DELAY,
+                               self._dirty_since + self.SAVE_MAX_LATENCY)
+                if now < deadline:
+                    self._lock.wait(deadline - now)
+                    continue
+                data = dict(self.settings)
+                self._dirty_since = None
+            self._write_settings(data)
+
+    def _write_settings(self, data):
+        """Save settings in one transaction"""
         try:
-            # Create settings directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
-            
-            # Create backup of existing settings
-            if os.path.exists(self.settings_file):
-                backup_file = f"{self.settings_file}.backup"
-                shutil.copy2(self.settings_file, backup_file)
-            
-            # Save new settings
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
+            self.data_store.save_settings(data)
+            self.physical_writes += 1
                 
         except Exception as e:
+            # Runs on the writer thread, so no message box here
             print(f"Error saving settings: {e}")
-            messagebox.showerror(
-                "Error",
-                "Failed to save settings. Please check application permissions."
-            )
 
     def apply_settings(self):
         """Apply settings on startup"""
@@ -116,48 +157,50 @@ class SettingsManager:
         self.settings['theme'] = theme
         self.save_settings()
 
-    def get_emotion_tags(self):
-        """Get saved emotion tags for songs"""
-        return self.settings.get('emotion_tags', {})
+    def get_history_retention(self):
+        return self.settings.get('history_retention', 0)
 
-    def save_emotion_tag(self, song_path, emotion):
-        """Save emotion tag for a song"""
-        if 'emotion_tags' not in self.settings:
-            self.settings['emotion_tags'] = {}
-        self.settings['emotion_tags'][song_path] = emotion
+    def set_history_retention(self, max_plays):
+        self.settings['history_retention'] = int(max_plays)
         self.save_settings()
 
-    def load_emotion_tags(self):
-        """Load emotion tags and return them"""
-        return self.settings.get('emotion_tags', {})
+    def get_preload_emotion_detection(self):
+        return self.settings.get('preload_emotion_detection', False)
 
-    def clear_invalid_tags(self):
-        """Clear tags for songs that no longer exist"""
-        if 'emotion_tags' in self.settings:
-            valid_tags = {
-                path: emotion 
-                for path, emotion in self.settings['emotion_tags'].items() 
-                if os.path.exists(path)
-            }
-            self.settings['emotion_tags'] = valid_tags
-            self.save_settings()
+    def set_preload_emotion_detection(self, enabled):
+        self.settings['preload_emotion_detection'] = bool(enabled)
+        self.save_settings()
 
-    def set_emotion_tag(self, song_path, emotion):
-        """Set and persist emotion tag for a song"""
-        if 'emotion_tags' not in self.settings:
-            self.settings['emotion_tags'] = {}
-        
-        self.settings['emotion_tags'][song_path] = emotion
+    def get_save_debug_frames(self):
+        return self.settings.get('save_debug_frames', False)
+
+    def set_save_debug_frames(self, enabled):
+        self.settings['save_debug_frames'] = bool(enabled)
         self.save_settings()
 
+    def get_emotion_tags(self):
+        """Get saved emotion tags for songs"""
+        names = {number: name.capitalize() for name, number in EMOTION_NUMBERS.items()}
+        return {
+            path: names[numbers[0]]
+            for path, numbers in self.data_store.get_all_song_tags().items()
+            if numbers and numbers[0] in names
+        }
+
+    def load_emotion_tags(self):
+        """Load emotion tags and return them"""
+        return self.get_emotion_tags()
+
     def get_emotion_tag(self, song_path):
         """Get emotion tag for a song"""
-        return self.settings.get('emotion_tags', {}).get(song_path, "Untagged")
+        names = {number: name.capitalize() for name, number in EMOTION_NUMBERS.items()}
+        numbers = self.data_store.get_song_emotions(song_path)
+        return names.get(numbers[0], "Untagged") if numbers else "Untagged"
 
     def get_songs_by_emotion(self, emotion):
         """Get all songs tagged with specific emotion"""
-        tags = self.settings.get('emotion_tags', {})
-        return [song for song, tag in tags.items() if tag == emotion]
+        number = EMOTION_NUMBERS.get(str(emotion).lower())
+        return self.data_store.get_paths_with_emotion(number) if number else []
 
 class SettingsWindow(ctk.CTkToplevel):
     def __init__(self, parent, settings_manager, language_manager, playlist_manager):
@@ -284,7 +327,8 @@ class SettingsWindow(ctk.CTkToplevel):
         if folder:
             self.settings_manager.set_music_folder(folder)
             self.current_folder_label.configure(text=folder)
-            self.playlist_manager.load_folder(folder)
+            # Scan on the main window's loop so the load outlives this dialog
+            self.playlist_manager.load_folder_async(folder, self.master)
         
     def change_theme(self, theme):
         """Change application theme."""
@@ -302,6 +346,8 @@ class SettingsWindow(ctk.CTkToplevel):
         
     def check_camera_permission(self):
         """Check camera permission and show result."""
+        # Deferred so OpenCV is only loaded when the camera is actually used
+        from camera_manager import CameraManager
         if CameraManager.verify_camera_access():
             messagebox.showinfo(
                 self.language_manager.get_text("camera_access"),
@@ -0,0 +1,410 @@
+import os
+from array import array
+
+
+class SongCatalog:
+    """Compact column store for the songs of the loaded music folder.
+
+    Every song gets an integer ID. Directory paths and file extensions are
+    stored once and referenced by index, titles live in a plain list and
+    emotion tags are a one-byte bitmask (bit N set = emotion number N),
+    mirrored by one ID set per emotion (plus one for untagged songs) so
+    filtering is a set operation.
+    IDs are never reused; removing a song only drops it from the sorted
+    order. Lookups path -> ID and ID -> position are O(1). Changes are
+    merged into the sorted order on the next read: new songs are sorted
+    among themselves and placed by binary search, and only the positions
+    from the first change onwards are rewritten.
+    """
+
+    def __init__(self, emotion_names=None):
+        self.emotion_names = emotion_names or {}
+        self.clear()
+
+    def clear(self):
+        self._dirs = []            # dir id -> directory path
+        self._dir_ids = {}         # directory path -> dir id
+        self._dir_files = []       # dir id -> {title: song id}, sharing the title strings
+        self._ext_clashes = {}     # (dir id, file name) -> song id when a title repeats with another extension
+        self._exts = []            # ext id -> file extension
+        self._ext_ids = {}         # file extension -> ext id
+        self._song_dir = array('I')
+        self._song_ext = array('B')
+        self._titles = []
+        self._emotions = array('B')
+        self._durations = array('f')   # last known length in seconds, 0 if unknown
+        self._emotion_ids = {}         # emotion number -> set of live song ids
+        self._untagged_ids = set()
+        self._order = array('I')       # live song ids sorted by title
+        self._positions = array('i')   # song id -> index in _order, -1 if not live
+        self._pending = []             # song ids added since the order was last merged
+        self._removed = []             # indexes in _order of songs removed since then
+        self._order_dirty = False
+        self.version = 0               # bumped on every change to the song set or tags
+
+    def __len__(self):
+        self._ensure_order()
+        return len(self._order)
+
+    # Adding and removing songs
+
+    def add(self, file_path, emotion_numbers=()):
+        """Add a song and return its ID (the existing ID if already present)"""
+        song_id = self.get_id(file_path)
+        if song_id is not None:
+            return song_id
+
+        dir_path, file_name = os.path.split(file_path)
+        title, ext = os.path.splitext(file_name)
+
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            self._dirs.append(dir_path)
+            self._dir_ids[dir_path] = dir_id
+            self._dir_files.append({})
+
+        ext_id = self._ext_ids.get(ext)
+        if ext_id is None:
+            ext_id = len(self._exts)
+            self._exts.append(ext)
+            self._ext_ids[ext] = ext_id
+
+        song_id = len(self._titles)
+        self._song_dir.append(dir_id)
+        self._song_ext.append(ext_id)
+        self._titles.append(title)
+        mask = self.mask_of(emotion_numbers)
+        self._emotions.append(mask)
+        self._durations.append(0.0)
+        self._index_emotions(song_id, mask)
+        self._positions.append(-1)
+        dir_files = self._dir_files[dir_id]
+        if title in dir_files:
+            self._ext_clashes[(dir_id, file_name)] = song_id
+        else:
+            dir_files[title] = song_id
+
+        self._pending.append(song_id)
+        self._order_dirty = True
+        self.version += 1
+        return song_id
+
+    def add_many(self, file_paths, tags=None):
+        """Add songs, taking their emotion numbers from a {path: [numbers]} dict"""
+        tags = tags or {}
+        return [self.add(file_path, tags.get(file_path, ())) for file_path in file_paths]
+
+    def remove(self, song_id):
+        """Remove a song from the catalog"""
+        if not self.is_live(song_id):
+            return
+        dir_id = self._song_dir[song_id]
+        title = self._titles[song_id]
+        if self._dir_files[dir_id].get(title) == song_id:
+            del self._dir_files[dir_id][title]
+        else:
+            self._ext_clashes.pop((dir_id, title + self._exts[self._song_ext[song_id]]), None)
+        self._unindex_emotions(song_id, self._emotions[song_id])
+        self._titles[song_id] = None
+        self._emotions[song_id] = 0
+        # A song still pending has no position yet and is skipped when merged
+        if self._positions[song_id] >= 0:
+            self._removed.append(self._positions[song_id])
+        self._positions[song_id] = -1
+        self._order_dirty = True
+        self.version += 1
+
+    def remove_paths(self, file_paths):
+        for file_path in file_paths:
+            song_id = self.get_id(file_path)
+            if song_id is not None:
+                self.remove(song_id)
+
+    # Lookups
+
+    def get_id(self, file_path):
+        """Get the ID of a song by path, or None"""
+        dir_path, file_name = os.path.split(file_path)
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is None:
+            return None
+        title, ext = os.path.splitext(file_name)
+        song_id = self._dir_files[dir_id].get(title)
+        if song_id is not None and self._exts[self._song_ext[song_id]] == ext:
+            return song_id
+        return self._ext_clashes.get((dir_id, file_name))
+
+    def is_live(self, song_id):
+        return 0 <= song_id < len(self._titles) and self._titles[song_id] is not None
+
+    def get_path(self, song_id):
+        return os.path.join(
+            self._dirs[self._song_dir[song_id]],
+            self._titles[song_id] + self._exts[self._song_ext[song_id]]
+        )
+
+    def get_title(self, song_id):
+        return self._titles[song_id]
+
+    def get_duration(self, song_id):
+        return self._durations[song_id]
+
+    def set_duration(self, song_id, duration):
+        self._durations[song_id] = duration or 0.0
+
+    def get_emotion_mask(self, song_id):
+        return self._emotions[song_id]
+
+    def get_emotion_numbers(self, song_id):
+        mask = self._emotions[song_id]
+        return [number for number in range(8) if mask & (1 << number)]
+
+    def get_emotions(self, song_id):
+        return [self.emotion_names.get(number, str(number)) for number in self.get_emotion_numbers(song_id)]
+
+    def index_of(self, song_id):
+        """Get a song's position in title order, or -1"""
+        self._ensure_order()
+        if 0 <= song_id < len(self._positions):
+            return self._positions[song_id]
+        return -1
+
+    def id_at(self, index):
+        self._ensure_order()
+        return self._order[index]
+
+    def ids(self):
+        """Get live song IDs in title order"""
+        self._ensure_order()
+        return self._order
+
+    def ids_in_folder(self, folder):
+        """Get the set of live song IDs in a folder and its subfolders"""
+        folder = os.path.normpath(folder)
+        prefix = folder + os.sep
+        result = set()
+        for dir_id, dir_path in enumerate(self._dirs):
+            if dir_path == folder or dir_path.startswith(prefix):
+                result.update(self._dir_files[dir_id].values())
+        result.update(song_id for (dir_id, _), song_id in self._ext_clashes.items()
+                      if self._dirs[dir_id] == folder or self._dirs[dir_id].startswith(prefix))
+        return result
+
+    def subfolders(self, folder):
+        """Get the names of the subfolders of folder that contain songs, sorted"""
+        prefix = os.path.normpath(folder) + os.sep
+        names = set()
+        for dir_id, dir_path in enumerate(self._dirs):
+            if dir_path.startswith(prefix) and self._dir_files[dir_id]:
+                names.add(dir_path[len(prefix):].split(os.sep, 1)[0])
+        return sorted(names, key=str.lower)
+
+    def song(self, song_id):
+        """Build a playlist entry dict for a song"""
+        return {
+            'id': song_id,
+            'path': self.get_path(song_id),
+            'title': self._titles[song_id],
+            'emotions': self.get_emotions(song_id),
+            'emotion_numbers': self.get_emotion_numbers(song_id)
+        }
+
+    # Emotion tags
+
+    def add_emotion(self, song_id, emotion_number):
+        self.set_emotion_mask(song_id, self._emotions[song_id] | (1 << emotion_number))
+
+    def remove_emotion(self, song_id, emotion_number):
+        self.set_emotion_mask(song_id, self._emotions[song_id] & ~(1 << emotion_number) & 0xFF)
+
+    def set_emotion_mask(self, song_id, mask):
+        old_mask = self._emotions[song_id]
+        if mask == old_mask or not self.is_live(song_id):
+            return
+        self._unindex_emotions(song_id, old_mask)
+        self._emotions[song_id] = mask
+        self._index_emotions(song_id, mask)
+        self.version += 1
+
+    def ids_with_emotion(self, emotion_number):
+        """Get the set of song IDs tagged with an emotion (0 = untagged); shared, don't modify it"""
+        if emotion_number == 0:
+            return self._untagged_ids
+        return self._emotion_ids.get(emotion_number, set())
+
+    def has_emotion(self, song_id, emotion_number):
+        return bool(self._emotions[song_id] & (1 << emotion_number))
+
+    def _index_emotions(self, song_id, mask):
+        if not mask:
+            self._untagged_ids.add(song_id)
+            return
+        for number in range(8):
+            if mask & (1 << number):
+                self._emotion_ids.setdefault(number, set()).add(song_id)
+
+    def _unindex_emotions(self, song_id, mask):
+        if not mask:
+            self._untagged_ids.discard(song_id)
+            return
+        for number in range(8):
+            if mask & (1 << number):
+                self._emotion_ids[number].discard(song_id)
+
+    @staticmethod
+    def mask_of(emotion_numbers):
+        mask = 0
+        for number in emotion_numbers:
+            mask |= 1 << number
+        return mask
+
+    # Snapshots
+
+    def export_columns(self, duration_of=None):
+        """Get the live songs as columns in title order, for PlaylistSnapshot.
+
+        duration_of(path) may supply fresher durations than the catalog has.
+        """
+        order = self.ids()
+        if duration_of is not None:
+            for song_id in order:
+                duration = duration_of(self.get_path(song_id))
+                if duration:
+                    self._durations[song_id] = duration
+        return {
+            'dirs': list(self._dirs),
+            'exts': list(self._exts),
+            'song_dir': array('I', (self._song_dir[song_id] for song_id in order)),
+            'song_ext': array('B', (self._song_ext[song_id] for song_id in order)),
+            'titles': [self._titles[song_id] for song_id in order],
+            'emotions': array('B', (self._emotions[song_id] for song_id in order)),
+            'durations': array('f', (self._durations[song_id] for song_id in order))
+        }
+
+    def load_columns(self, columns):
+        """Replace the catalog with columns from export_columns(), which are already in title order"""
+        self.clear()
+        self._dirs = columns['dirs']
+        self._dir_ids = {dir_path: dir_id for dir_id, dir_path in enumerate(self._dirs)}
+        self._dir_files = [{} for _ in self._dirs]
+        self._exts = columns['exts']
+        self._ext_ids = {ext: ext_id for ext_id, ext in enumerate(self._exts)}
+        self._song_dir = columns['song_dir']
+        self._song_ext = columns['song_ext']
+        self._titles = columns['titles']
+        self._emotions = columns['emotions']
+        self._durations = columns['durations']
+
+        dir_files = self._dir_files
+        for song_id, (dir_id, title) in enumerate(zip(self._song_dir, self._titles)):
+            if title in dir_files[dir_id]:
+                self._ext_clashes[(dir_id, title + self._exts[self._song_ext[song_id]])] = song_id
+            else:
+                dir_files[dir_id][title] = song_id
+        for song_id, mask in enumerate(self._emotions):
+            self._index_emotions(song_id, mask)
+
+        self._order = array('I', range(len(self._titles)))
+        self._positions = array('i', range(len(self._titles)))
+        self.version += 1
+
+    def _ensure_order(self):
+        """Merge the songs added and removed since the last read into the title order"""
+        if not self._order_dirty:
+            return
+        titles = self._titles
+        order = self._order
+        first = len(order)   # every position before this one is unchanged
+
+        if self._removed:
+            removed = sorted(self._removed)
+            first = removed[0]
+            kept = array('I', order[:first])
+            for start, end in zip(removed, removed[1:] + [len(order)]):
+                kept += order[start + 1:end]
+            order = kept
+
+        added = [song_id for song_id in self._pending if titles[song_id] is not None]
+        if added:
+            added.sort(key=lambda song_id: titles[song_id].lower())
+            merged = array('I')
+            start = 0
+            for song_id in added:
+                # After any equal titles, like a stable sort in insertion order
+                index = self._insertion_point(order, titles[song_id].lower(), start)
+                first = min(first, index)
+                merged += order[start:index]
+                merged.append(song_id)
+                start = index
+            merged += order[start:]
+            order = merged
+
+        positions = self._positions
+        for index in range(first, len(order)):
+            positions[order[index]] = index
+        self._order = order
+        self._pending = []
+        self._removed = []
+        self._order_dirty = False
+
+    def _insertion_point(self, order, key, lo):
+        """Index in order, at or after lo, past every title that sorts <= key"""
+        titles = self._titles
+        hi = len(order)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if key < titles[order[middle]].lower():
+                hi = middle
+            else:
+                lo = middle + 1
+        return lo
+
+
+class SongIdView:
+    """Read-only sequence of a SongCatalog's live song IDs in title order.
+
+    It reads through the catalog on every access, so unlike the array from
+    ids() it never goes stale when songs are added or removed.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def __getitem__(self, index):
+        return self.catalog.ids()[index]
+
+    def __iter__(self):
+        return iter(self.catalog.ids())
+
+    def __contains__(self, song_id):
+        return self.catalog.is_live(song_id)
+
+    def index(self, song_id):
+        index = self.catalog.index_of(song_id)
+        if index < 0:
+            raise ValueError(f"{song_id} is not in the catalog")
+        return index
+
+
+class PlaylistView:
+    """Read-only list-of-dicts view over a SongCatalog for code that expects get_playlist()"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.catalog.song(song_id) for song_id in self.catalog.ids()[index]]
+        return self.catalog.song(self.catalog.ids()[index])
+
+    def __iter__(self):
+        song = self.catalog.song
+        for song_id in self.catalog.ids():
+            yield song(song_id)
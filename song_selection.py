@@ -0,0 +1,83 @@
+from array import array
+
+
+class SongSelection:
+    """Set of selected song IDs stored as a bitset (one bit per song ID).
+
+    select_all() does not set a bit per song: it keeps a copy of the ID
+    sequence it covers, and from then on a song is selected when its bit
+    differs from whether it is in that sequence. The copy means songs added
+    to or removed from the list afterwards don't change the selection.
+    Toggling a song is always a single bit flip and the selected count is
+    kept up to date, so toggle and count are O(1); only select_all() and
+    ids() walk the songs.
+    """
+
+    def __init__(self, size=0):
+        self._size = size
+        self.clear()
+
+    def clear(self):
+        self._bits = bytearray((self._size + 7) // 8)
+        self._universe = None          # ID sequence covered by select_all
+        self._in_universe = None       # song id -> bool for that sequence
+        self._bits_inside = 0          # set bits for songs inside the universe (i.e. deselected)
+        self._bits_outside = 0         # set bits for songs outside it (i.e. selected)
+
+    def __len__(self):
+        universe = len(self._universe) if self._universe is not None else 0
+        return universe - self._bits_inside + self._bits_outside
+
+    def __contains__(self, song_id):
+        return self._bit(song_id) != self._covered(song_id)
+
+    def _bit(self, song_id):
+        byte = song_id >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (song_id & 7)))
+
+    def _covered(self, song_id):
+        return self._universe is not None and bool(self._in_universe(song_id))
+
+    def toggle(self, song_id):
+        byte = song_id >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        was_set = bool(self._bits[byte] & (1 << (song_id & 7)))
+        self._bits[byte] ^= 1 << (song_id & 7)
+        change = -1 if was_set else 1
+        if self._covered(song_id):
+            self._bits_inside += change
+        else:
+            self._bits_outside += change
+
+    def set(self, song_id, selected=True):
+        if (song_id in self) != selected:
+            self.toggle(song_id)
+
+    def select_all(self, song_ids):
+        """Select exactly the songs in song_ids as it is now"""
+        self.clear()
+        self._universe = array('I', song_ids)
+        self._in_universe = set(self._universe).__contains__
+
+    def select_range(self, song_ids, start, end, selected=True):
+        """Select (or deselect) song_ids[start..end], both ends included"""
+        if start > end:
+            start, end = end, start
+        for index in range(start, end + 1):
+            self.set(song_ids[index], selected)
+
+    def ids(self):
+        """Get the selected song IDs"""
+        selected = []
+        if self._universe is not None:
+            selected.extend(song_id for song_id in self._universe if not self._bit(song_id))
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    song_id = (byte_index << 3) | bit
+                    if not self._covered(song_id):
+                        selected.append(song_id)
+        return selected
@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import platform
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from path_utils import get_startup_profile_path
+
+ENV_VAR = 'KAISAR_PROFILE_STARTUP'
+CLI_FLAG = '--profile-startup'
+
+# Audit events counted as file I/O
+OPEN_EVENTS = ('open',)
+LISTING_EVENTS = ('os.listdir', 'os.scandir')
+
+
+class StartupProfiler:
+    """Times the phases of application startup.
+
+    Disabled by default, in which case phase() costs next to nothing. When
+    enabled (KAISAR_PROFILE_STARTUP=1 or --profile-startup) every phase
+    records wall and CPU time, memory allocated through tracemalloc, files
+    opened and directories listed. finish() prints a summary table and adds
+    the run to startup_profile.json in the Data folder.
+
+    A run is marked "cold" when it is the first profiled run since the
+    machine booted and "warm" otherwise, so both kinds can be compared over
+    time. Times include the tracemalloc overhead, so compare profiled runs
+    with each other, not with unprofiled launches.
+    """
+
+    MAX_RUNS = 50
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = []
+        self.notes = {}
+        self._stack = []
+        self._start = None
+        self._last_end = None
+        self._opens = 0
+        self._listings = 0
+        self._sampling = False
+        self._hook_installed = False
+
+    def enable_if_requested(self, argv=None):
+        """Enable when the env var or the command line flag asks for it"""
+        argv = sys.argv if argv is None else argv
+        if os.environ.get(ENV_VAR) or CLI_FLAG in argv:
+            if CLI_FLAG in argv:
+                argv.remove(CLI_FLAG)
+            self.enable()
+        return self.enabled
+
+    def enable(self):
+        if self.enabled:
+            return
+        if not self._hook_installed:
+            # Audit hooks can't be removed, the hook just stops counting once disabled
+            sys.addaudithook(self._audit)
+            self._hook_installed = True
+        tracemalloc.start()
+        self.enabled = True
+        self._start = self._last_end = self._sample()
+
+    def _audit(self, event, args):
+        if not self.enabled or self._sampling:
+            return
+        if event in OPEN_EVENTS:
+            self._opens += 1
+        elif event in LISTING_EVENTS:
+            self._listings += 1
+
+    def _sample(self):
+        allocated, peak = tracemalloc.get_traced_memory()
+        read_bytes, write_bytes = self._process_io()
+        return {
+            'wall': time.perf_counter(),
+            'cpu': time.process_time(),
+            'allocated': allocated,
+            'peak': peak,
+            'opens': self._opens,
+            'listings': self._listings,
+            'read_bytes': read_bytes,
+            'write_bytes': write_bytes
+        }
+
+    def _process_io(self):
+        """Bytes read and written by the process so far (Linux only)"""
+        # Our own read of /proc/self/io is not counted as an open
+        self._sampling = True
+        try:
+            with open('/proc/self/io') as io_file:
+                counters = dict(line.split(': ') for line in io_file.read().splitlines())
+            return int(counters['rchar']), int(counters['wchar'])
+        except (OSError, KeyError, ValueError):
+            return None, None
+        finally:
+            self._sampling = False
+
+    def _record(self, name, before, after, depth):
+        phase = {
+            'name': name,
+            'depth': depth,
+            'wall_ms': round((after['wall'] - before['wall']) * 1000, 2),
+            'cpu_ms': round((after['cpu'] - before['cpu']) * 1000, 2),
+            'allocated_kb': round((after['allocated'] - before['allocated']) / 1024, 1),
+            'peak_kb': round(after['peak'] / 1024, 1),
+            'files_opened': after['opens'] - before['opens'],
+            'dirs_listed': after['listings'] - before['listings']
+        }
+        if before['read_bytes'] is not None:
+            phase['read_kb'] = round((after['read_bytes'] - before['read_bytes']) / 1024, 1)
+            phase['write_kb'] = round((after['write_bytes'] - before['write_bytes']) / 1024, 1)
+        self.phases.append(phase)
+        return phase
+
+    @contextmanager
+    def phase(self, name):
+        """Record the enclosed block as a phase; phases may be nested"""
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(name)
+        tracemalloc.reset_peak()
+        before = self._sample()
+        index = len(self.phases)
+        try:
+            yield
+        finally:
+            after = self._sample()
+            self._stack.pop()
+            # Keep phases in start order even though nested ones finish first
+            self._record(name, before, after, len(self._stack))
+            self.phases.insert(index, self.phases.pop())
+            if not self._stack:
+                self._last_end = after
+
+    def checkpoint(self, name):
+        """Record everything since the last top-level phase ended as a phase
+
+        Used for stretches that can't be wrapped in a with block, such as
+        module imports or the time until the first paint.
+        """
+        if not self.enabled or self._stack:
+            return
+        after = self._sample()
+        self._record(name, self._last_end, after, 0)
+        self._last_end = after
+
+    def note(self, key, value):
+        """Attach a value (library size, etc.) to the report for comparisons"""
+        if self.enabled:
+            self.notes[key] = value
+
+    def finish(self, report_path=None):
+        """Stop profiling, save the run and print the summary table"""
+        if not self.enabled:
+            return None
+        end = self._sample()
+        tracemalloc.stop()
+        self.enabled = False
+
+        report_path = report_path or get_startup_profile_path()
+        runs = self._load_runs(report_path)
+        boot_time = self._boot_time()
+        previous = runs[-1] if runs else None
+        cold = previous is None or abs(previous.get('boot_time', 0) - boot_time) > 5
+        run = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'start': 'cold' if cold else 'warm',
+            'boot_time': boot_time,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'total_wall_ms': round((end['wall'] - self._start['wall']) * 1000, 2),
+            'total_cpu_ms': round((end['cpu'] - self._start['cpu']) * 1000, 2),
+            # Each phase resets the peak, so the overall one is the largest seen
+            'peak_kb': max([phase['peak_kb'] for phase in self.phases] + [round(end['peak'] / 1024, 1)]),
+            'phases': self.phases,
+            'notes': self.notes
+        }
+        runs.append(run)
+        try:
+            os.makedirs(os.path.dirname(report_path), exist_ok=True)
+            with open(report_path, 'w') as f:
+                json.dump({'runs': runs[-self.MAX_RUNS:]}, f, indent=2)
+        except Exception as e:
+            print(f"Error saving startup profile: {e}")
+
+        print(self.format_report(run, self._last_of_kind(runs[:-1], run['start'])))
+        return run
+
+    def _load_runs(self, report_path):
+        try:
+            with open(report_path, 'r') as f:
+                return json.load(f).get('runs', [])
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"Error loading startup profile: {e}")
+            return []
+
+    def _boot_time(self):
+        """When the machine booted, as a Unix timestamp (rounded, it drifts a little)"""
+        return round(time.time() - time.monotonic())
+
+    def _last_of_kind(self, runs, start):
+        for run in reversed(runs):
+            if run.get('start') == start:
+                return run
+        return None
+
+    @staticmethod
+    def format_report(run, previous=None):
+        """Summary table of one run, with the change against a previous run of the same kind"""
+        lines = [
+            f"Startup profile ({run['start']} start, {run['timestamp']})",
+            f"{'phase':<32} {'wall ms':>9} {'cpu ms':>9} {'alloc KB':>9} {'files':>6} {'dirs':>5}"
+        ]
+        for phase in run['phases']:
+            name = '  ' * phase['depth'] + phase['name']
+            lines.append(f"{name:<32} {phase['wall_ms']:>9.1f} {phase['cpu_ms']:>9.1f} "
+                         f"{phase['allocated_kb']:>9.1f} {phase['files_opened']:>6} {phase['dirs_listed']:>5}")
+        lines.append(f"{'total':<32} {run['total_wall_ms']:>9.1f} {run['total_cpu_ms']:>9.1f}"
+                     f"   peak {run['peak_kb']:.0f} KB")
+        if previous:
+            change = run['total_wall_ms'] - previous['total_wall_ms']
+            lines.append(f"{change:+.1f} ms against the previous {run['start']} start ({previous['timestamp']})")
+        return '\n'.join(lines)
+
+
+# Shared by main and the modules it builds
+profiler = StartupProfiler()
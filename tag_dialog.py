@@ -0,0 +1,211 @@
+import os
+import customtkinter as ctk
+from song_catalog import SongIdView
+from song_selection import SongSelection
+from virtual_list import VirtualList
+
+
+class BulkTagDialog(ctk.CTkToplevel):
+    """Dialog for tagging many songs with one emotion.
+
+    The song list is virtualized and can be narrowed by search, current tag
+    and folder. Clicking a song toggles it, Shift+click selects the range
+    from the last clicked song. The selection is a SongSelection bitset, so
+    it survives filter changes and "Select All" does not touch every song.
+    On confirm, on_apply(emotion, song_ids) gets the whole selection at once.
+    """
+
+    EMOTION_FILTERS = ["All", "Happy", "Sad", "Neutral", "Untagged"]
+
+    def __init__(self, parent, playlist_manager, language_manager, on_apply):
+        super().__init__(parent)
+        self.playlist_manager = playlist_manager
+        self.language_manager = language_manager
+        self.catalog = playlist_manager.catalog
+        self.on_apply = on_apply
+
+        self.selection = SongSelection()
+        self.view = []               # song IDs shown, in playlist order
+        self.view_index = None       # song id -> position in self.view, -1 if not shown
+        self.anchor = None           # last clicked song, for Shift+click ranges
+
+        self.title(self.language_manager.get_text("tag_emotion"))
+        self.geometry("450x620")
+        self.transient(parent)
+        self.grab_set()  # Make dialog modal
+
+        # Create title label
+        title_label = ctk.CTkLabel(
+            self,
+            text=self.language_manager.get_text("tag_emotion"),
+            font=("Arial", 16, "bold")
+        )
+        title_label.pack(pady=10)
+
+        self._create_emotion_choice()
+        self._create_filters()
+
+        # Selection controls
+        select_frame = ctk.CTkFrame(self)
+        select_frame.pack(fill="x", padx=20, pady=(5, 0))
+
+        self.select_all_var = ctk.BooleanVar()
+        select_all_cb = ctk.CTkCheckBox(
+            select_frame,
+            text=self.language_manager.get_text("select_all"),
+            variable=self.select_all_var,
+            command=self._toggle_select_all,
+            font=("Arial", 12)
+        )
+        select_all_cb.pack(side="left", padx=5, pady=5)
+
+        self.count_label = ctk.CTkLabel(select_frame, text="", font=("Arial", 12))
+        self.count_label.pack(side="right", padx=5)
+
+        # Virtualized song list
+        self.song_list = VirtualList(
+            self,
+            render_row=self._render_row,
+            on_activate=self._click_song,
+            row_height=30
+        )
+        self.song_list.pack(fill="both", expand=True, padx=20, pady=10)
+
+        # Create a styled confirm button
+        confirm_button = ctk.CTkButton(
+            self,
+            text=self.language_manager.get_text("confirm"),
+            command=self._apply,
+            font=("Arial", 12, "bold"),
+            height=35
+        )
+        confirm_button.pack(pady=15, padx=20, fill="x")
+
+        self._apply_filters()
+
+    def _create_emotion_choice(self):
+        self.emotion_var = ctk.StringVar(value="Neutral")
+
+        emotions_frame = ctk.CTkFrame(self)
+        emotions_frame.pack(fill="x", padx=20, pady=10)
+
+        emotions_label = ctk.CTkLabel(
+            emotions_frame,
+            text=self.language_manager.get_text("select_emotion"),
+            font=("Arial", 12)
+        )
+        emotions_label.pack(pady=5)
+
+        # Emotion mapping with numbers
+        emotion_mapping = [
+            ("Happy", 2),
+            ("Sad", 3),
+            ("Neutral", 1)
+        ]
+
+        for emotion, number in emotion_mapping:
+            rb = ctk.CTkRadioButton(
+                emotions_frame,
+                text=f"{self.language_manager.get_text(emotion.lower())} ({number})",
+                variable=self.emotion_var,
+                value=emotion,
+                font=("Arial", 12)
+            )
+            rb.pack(side="left", padx=10, pady=(0, 5))
+
+    def _create_filters(self):
+        songs_label = ctk.CTkLabel(
+            self,
+            text=self.language_manager.get_text("select_songs"),
+            font=("Arial", 12)
+        )
+        songs_label.pack(pady=5)
+
+        filter_frame = ctk.CTkFrame(self)
+        filter_frame.pack(fill="x", padx=20)
+
+        self.search_var = ctk.StringVar()
+        self.search_var.trace("w", lambda *args: self._apply_filters())
+        search_entry = ctk.CTkEntry(
+            filter_frame,
+            placeholder_text=self.language_manager.get_text("search_songs"),
+            textvariable=self.search_var,
+            width=150
+        )
+        search_entry.pack(side="left", padx=5, pady=5)
+
+        self.emotion_filter = ctk.CTkOptionMenu(
+            filter_frame,
+            values=self.EMOTION_FILTERS,
+            command=lambda value: self._apply_filters(),
+            width=100
+        )
+        self.emotion_filter.pack(side="left", padx=5)
+
+        self.all_folders = self.language_manager.get_text("all_folders")
+        self.folder_filter = ctk.CTkOptionMenu(
+            filter_frame,
+            values=[self.all_folders] + self.playlist_manager.get_subfolders(),
+            command=lambda value: self._apply_filters(),
+            width=120
+        )
+        self.folder_filter.pack(side="left", padx=5)
+
+    def _apply_filters(self):
+        folder = self.folder_filter.get()
+        if folder == self.all_folders:
+            folder = None
+        else:
+            folder = os.path.join(self.playlist_manager.get_current_folder(), folder)
+
+        id_set = self.playlist_manager.query_id_set(
+            self.search_var.get().strip(), self.emotion_filter.get(), folder
+        )
+        if id_set is None:
+            # Nothing filtered: show the catalog order itself
+            self.view = SongIdView(self.catalog)
+            self.view_index = self.catalog.index_of
+        else:
+            self.view = self.playlist_manager.order_ids(id_set)
+            positions = {song_id: index for index, song_id in enumerate(self.view)}
+            self.view_index = lambda song_id: positions.get(song_id, -1)
+        self.song_list.set_items(self.view, index_of=self.view_index)
+        self.song_list.scroll_to(0)
+        self.select_all_var.set(False)
+        self._update_count()
+
+    def _render_row(self, song_id):
+        mark = "☑" if song_id in self.selection else "☐"
+        emotions = self.catalog.get_emotions(song_id)
+        return f"{mark}  {self.catalog.get_title(song_id)}", emotions[0].capitalize() if emotions else ""
+
+    def _click_song(self, song_id):
+        start = self.view_index(self.anchor) if self.anchor is not None else -1
+        if self.song_list.shift_held and start >= 0:
+            end = self.view_index(song_id)
+            # The range takes the state of the song the range starts from
+            self.selection.select_range(self.view, start, end, self.anchor in self.selection)
+            self.song_list.redraw()
+        else:
+            self.selection.toggle(song_id)
+            self.anchor = song_id
+            self.song_list.update_items([song_id])
+        self._update_count()
+
+    def _toggle_select_all(self):
+        if self.select_all_var.get():
+            self.selection.select_all(self.view)
+        else:
+            self.selection.clear()
+        self.song_list.redraw()
+        self._update_count()
+
+    def _update_count(self):
+        self.count_label.configure(text=f"{len(self.selection)} {self.language_manager.get_text('selected')}")
+
+    def _apply(self):
+        song_ids = self.selection.ids()
+        emotion = self.emotion_var.get()
+        self.destroy()
+        if song_ids:
+            self.on_apply(emotion, song_ids)
@@ -0,0 +1,108 @@
+import time
+import threading
+
+
+class TagJournal:
+    """Write-behind persistence for song emotion tags.
+
+    Tag changes are queued in memory and a background flusher commits them
+    to the data store. Changes made within flush_delay of each other go into
+    the same transaction (one WAL append and sync), and repeated changes to
+    the same song are coalesced. Every checkpoint_every commits the store's
+    write-ahead log is folded back into the database file.
+    """
+
+    def __init__(self, data_store, flush_delay=0.25, checkpoint_every=50):
+        self.store = data_store
+        self.flush_delay = flush_delay
+        self.checkpoint_every = checkpoint_every
+
+        self._pending = {}            # song path -> list of emotion numbers
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = None
+        self._commits_since_checkpoint = 0
+
+        # Physical write counter
+        self.commits = 0
+
+    def pending_tags(self, song_path):
+        """Get tags queued but not yet committed for a song, or None"""
+        with self._lock:
+            numbers = self._pending.get(song_path)
+        return list(numbers) if numbers is not None else None
+
+    def record(self, song_path, emotion_numbers):
+        """Queue a song's new emotion numbers for the next group commit"""
+        self.record_many([(song_path, emotion_numbers)])
+
+    def record_many(self, items):
+        """Queue (song path, emotion numbers) pairs for the next group commit.
+
+        Once the journal is closed there is no flusher, so they are written now.
+        """
+        with self._lock:
+            for song_path, emotion_numbers in items:
+                self._pending[song_path] = list(emotion_numbers)
+            closed = self._closed
+            if self._flusher is None and not closed:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+        if closed:
+            self.flush()
+        else:
+            self._wake.set()
+
+    def flush(self):
+        """Commit all queued changes in a single transaction"""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                self.store.set_song_tags_many(pending.items())
+                self.commits += 1
+            except Exception as e:
+                print(f"Error saving song tags: {e}")
+                # Put the changes back so the next flush retries them
+                with self._lock:
+                    for path, numbers in pending.items():
+                        self._pending.setdefault(path, numbers)
+                return 0
+
+            self._commits_since_checkpoint += 1
+            if self._commits_since_checkpoint >= self.checkpoint_every:
+                self._checkpoint()
+            return len(pending)
+
+    def close(self):
+        """Stop the flusher and persist everything that is still queued"""
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        try:
+            self.store.checkpoint()
+            self._commits_since_checkpoint = 0
+        except Exception as e:
+            print(f"Error checkpointing song tags: {e}")
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait()
+            if self._closed:
+                break
+            # Let changes made in quick succession join the same commit
+            time.sleep(self.flush_delay)
+            self._wake.clear()
+            self.flush()
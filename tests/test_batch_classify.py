@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+import unittest
+import multiprocessing
+import batch_classify
+
+
+class FailingEngine:
+    def __init__(self, *args, **kwargs):
+        raise RuntimeError("no FaceMesh here")
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork', "workers must fork to see the patched engine")
+class BatchClassifyTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        for name in ("b.png", "a.jpg", "notes.txt"):
+            open(os.path.join(self.temp_dir, name), 'wb').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_list_images(self):
+        names = [os.path.basename(path) for path in batch_classify.list_images(self.temp_dir)]
+        self.assertEqual(names, ["a.jpg", "b.png"])
+
+    def test_worker_start_failure_is_raised_instead_of_hanging(self):
+        # Forked workers inherit the patched engine
+        engine = batch_classify.EmotionEngine
+        batch_classify.EmotionEngine = FailingEngine
+        try:
+            paths = list(batch_classify.list_images(self.temp_dir))
+            with self.assertRaises(batch_classify.WorkerInitError):
+                list(batch_classify.classify_directory(paths, workers=2, chunksize=1))
+        finally:
+            batch_classify.EmotionEngine = engine
+
+
+if __name__ == '__main__':
+    unittest.main()
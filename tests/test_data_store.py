@@ -0,0 +1,118 @@
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from data_store import DataStore, SCHEMA_VERSION
+
+
+class DataStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, "kaisar.db")
+        self.store = None
+
+    def tearDown(self):
+        if self.store is not None:
+            self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def open_store(self):
+        self.store = DataStore(self.db_file, migrate=False)
+        return self.store
+
+    def write_json(self, name, data):
+        with open(os.path.join(self.temp_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def test_song_tags(self):
+        store = self.open_store()
+        version = store.get_tag_version()
+        store.set_song_tags_many([("a.mp3", [2, 3]), ("b.mp3", [1])])
+        store.set_song_tags_many([("b.mp3", [])])
+        self.assertEqual({path: sorted(numbers) for path, numbers in store.get_all_song_tags().items()},
+                         {"a.mp3": [2, 3]})
+        self.assertEqual(store.get_paths_with_emotion(3), ["a.mp3"])
+        self.assertEqual(store.get_tag_version(), version + 2)
+
+    def test_repeated_play_event_is_ignored(self):
+        store = self.open_store()
+        played_at = datetime(2024, 5, 1, 10, 0, 0)
+        self.assertTrue(store.add_play("a.mp3", "A", played_at, event_id="e1"))
+        self.assertFalse(store.add_play("a.mp3", "A", played_at, event_id="e1"))
+        self.assertEqual(store.count_plays(), 1)
+        self.assertEqual(store.get_play_count("a.mp3", "2024-05-01"), 1)
+
+    def test_day_rollup_keeps_the_latest_title_and_time(self):
+        store = self.open_store()
+        store.add_play("a.mp3", "New", datetime(2024, 5, 1, 12, 0, 0), event_id="late")
+        store.add_play("a.mp3", "Old", datetime(2024, 5, 1, 9, 0, 0), event_id="early")
+        history = store.get_recent_history()
+        self.assertEqual(len(history), 1)
+        self.assertEqual((history[0]['title'], history[0]['time'], history[0]['play_count']),
+                         ("New", "12:00:00", 2))
+
+    def test_pruning_the_log_keeps_the_rollups(self):
+        store = self.open_store()
+        for minute in range(5):
+            store.add_play("a.mp3", "A", datetime(2024, 5, 1, 10, minute, 0), event_id=str(minute))
+        self.assertEqual(store.prune_plays(2), 3)
+        self.assertEqual(store.count_plays(), 2)
+        self.assertEqual(store.get_play_count("a.mp3", "2024-05-01"), 5)
+        self.assertEqual(store.prune_plays(2), 0)
+
+    def test_settings_round_trip(self):
+        store = self.open_store()
+        store.save_settings({'volume': 0.3, 'window_position': [10, 20]})
+        self.assertEqual(store.load_settings(), {'volume': 0.3, 'window_position': [10, 20]})
+
+    def test_legacy_files_are_migrated(self):
+        self.write_json("emotions.json", {"a.mp3": "happy", "b.mp3": "unknown"})
+        self.write_json("settings.json", {'volume': 0.7, 'emotion_tags': {"c.mp3": "Sad"}})
+        self.write_json("song_tags.json", {"d.mp3": {'emotion_numbers': [1, 2]}, "a.mp3": {'emotion_numbers': [3]}})
+        with open(os.path.join(self.temp_dir, "song_tags.journal"), 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'path': "d.mp3", 'tags': None}) + "\n")
+            f.write(json.dumps({'path': "e.mp3", 'tags': {'emotion_numbers': [2]}}) + "\n")
+            f.write('{"path": "torn')
+        self.write_json("history.json", {'history': [
+            {'path': "a.mp3", 'title': "A", 'date': "2024-05-01", 'time': "10:00:00", 'play_count': 3},
+            {'path': "b.mp3", 'title': "B", 'date': "not a date", 'time': "10:00:00"}
+        ]})
+        store = self.open_store()
+        store.migrate_legacy_files(self.temp_dir)
+
+        tags = {path: sorted(numbers) for path, numbers in store.get_all_song_tags().items()}
+        self.assertEqual(tags, {"a.mp3": [3], "c.mp3": [3], "e.mp3": [2]})
+        self.assertEqual(store.load_settings(), {'volume': 0.7})
+        self.assertEqual(store.get_play_count("a.mp3", "2024-05-01"), 3)
+        self.assertEqual(store.count_plays(), 3)
+        self.assertIsNotNone(store._get_meta('legacy_migrated'))
+
+    def test_version_1_database_is_upgraded(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript("""
+            CREATE TABLE songs (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+            CREATE TABLE plays (id INTEGER PRIMARY KEY, song_id INTEGER NOT NULL, title TEXT,
+                                played_at REAL NOT NULL, day TEXT NOT NULL, time TEXT NOT NULL);
+            CREATE INDEX idx_plays_day_song ON plays(day, song_id);
+            INSERT INTO songs (id, path) VALUES (1, 'a.mp3');
+            INSERT INTO plays (song_id, title, played_at, day, time) VALUES
+                (1, 'A', 100, '2024-05-01', '10:00:00'),
+                (1, 'A', 200, '2024-05-01', '11:00:00');
+        """)
+        conn.close()
+
+        store = self.open_store()
+        self.assertEqual(store._get_meta('schema_version'), str(SCHEMA_VERSION))
+        self.assertEqual(store.get_play_count("a.mp3", "2024-05-01"), 2)
+        self.assertEqual(store.get_recent_history()[0]['time'], "11:00:00")
+        self.assertTrue(store.add_play("a.mp3", "A", datetime(2024, 5, 2), event_id="e1"))
+        self.assertFalse(store.add_play("a.mp3", "A", datetime(2024, 5, 2), event_id="e1"))
+        indexes = [row[0] for row in store.query("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        self.assertNotIn('idx_plays_day_song', indexes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from data_store import DataStore
+from history import HistoryManager
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class PlayAnalyticsTest(unittest.TestCase):
+    def setUp(self):
+        from history_analytics import PlayAnalytics
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = DataStore(os.path.join(self.temp_dir, "kaisar.db"), migrate=False)
+        self.durations = {"a.mp3": 180.0, "b.mp3": 60.0}
+        self.analytics = PlayAnalytics(self.store, self.durations.get)
+        self.plays = 0
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def play(self, path, played_at):
+        self.plays += 1
+        self.store.add_play(path, os.path.splitext(path)[0], played_at, event_id=str(self.plays))
+
+    def test_refresh_reads_only_new_plays(self):
+        self.play("a.mp3", datetime(2024, 5, 1, 10))
+        self.play("b.mp3", datetime(2024, 5, 1, 11))
+        self.assertEqual(self.analytics.refresh(), 2)
+        self.play("a.mp3", datetime(2024, 5, 2, 10))
+        self.assertEqual(self.analytics.refresh(), 1)
+        self.assertEqual(self.analytics.refresh(), 0)
+        self.assertEqual(len(self.analytics), 3)
+        self.assertEqual(self.analytics.count_plays(start=datetime(2024, 5, 2)), 1)
+
+    def test_plays_out_of_time_order_are_sorted(self):
+        self.play("a.mp3", datetime(2024, 5, 3))
+        self.play("b.mp3", datetime(2024, 5, 1))
+        self.analytics.refresh()
+        self.assertEqual(list(self.analytics.times), sorted(self.analytics.times))
+
+    def test_counts_and_top_songs(self):
+        for hour in (9, 10, 11):
+            self.play("a.mp3", datetime(2024, 5, 1, hour))
+        self.play("b.mp3", datetime(2024, 5, 1, 12))
+        self.play("b.mp3", datetime(2024, 5, 2, 12))
+        self.analytics.refresh()
+        self.assertEqual(self.analytics.play_counts(), {"a.mp3": 3, "b.mp3": 2})
+        self.assertEqual(self.analytics.plays_per_period('day'), {'2024-05-01': 4, '2024-05-02': 1})
+        self.assertEqual(self.analytics.top_songs(1, 'day'),
+                         {'2024-05-01': [("a.mp3", 3)], '2024-05-02': [("b.mp3", 1)]})
+
+    def test_new_plays_update_cached_answers(self):
+        self.play("a.mp3", datetime(2024, 5, 1, 9))
+        self.analytics.refresh()
+        self.assertEqual(self.analytics.play_counts(), {"a.mp3": 1})
+        self.play("a.mp3", datetime(2024, 5, 1, 10))
+        self.analytics.refresh()
+        self.assertEqual(self.analytics.play_counts(), {"a.mp3": 2})
+
+    def test_listening_time_follows_tag_changes(self):
+        self.play("a.mp3", datetime(2024, 5, 1, 9))
+        self.play("b.mp3", datetime(2024, 5, 1, 10))
+        self.store.set_song_tags_many([("a.mp3", [2])])
+        self.analytics.refresh()
+        listening = self.analytics.listening_time_by_emotion()
+        self.assertEqual((listening['happy'], listening['untagged']), (180.0, 60.0))
+        self.store.set_song_tags_many([("b.mp3", [2])])
+        self.analytics.refresh()
+        self.assertEqual(self.analytics.listening_time_by_emotion()['happy'], 240.0)
+
+    def test_streaks(self):
+        today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        for days_ago in (0, 1, 2, 5, 6, 7, 8):
+            self.play("a.mp3", today - timedelta(days=days_ago))
+        self.analytics.refresh()
+        streaks = self.analytics.streaks()
+        self.assertEqual((streaks['current'], streaks['longest']), (3, 4))
+
+    def test_cleared_log_is_reloaded(self):
+        self.play("a.mp3", datetime(2024, 5, 1))
+        self.play("a.mp3", datetime(2024, 5, 2))
+        self.analytics.refresh()
+        self.store.clear_plays()
+        self.play("b.mp3", datetime(2024, 5, 3))
+        self.analytics.refresh()
+        self.assertEqual(self.analytics.play_counts(), {"b.mp3": 1})
+
+    def test_pruned_plays_leave_the_analytics(self):
+        history = HistoryManager(self.store, max_plays=2)
+        history.PRUNE_EVERY = 3
+        history.add_to_history("a.mp3", "a")
+        history.add_to_history("a.mp3", "a")
+        self.assertEqual(len(history.get_analytics()), 2)
+        history.add_to_history("b.mp3", "b")
+        self.assertEqual(self.store.count_plays(), 2)
+        self.assertEqual(history.get_analytics().play_counts(), {"a.mp3": 1, "b.mp3": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+from library_scanner import LibraryScanner, ScanDiff, ScanCancelToken
+
+
+class LibraryScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.music = os.path.join(self.temp_dir, "music")
+        os.makedirs(os.path.join(self.music, "album"))
+        self.write("one.mp3", b"1")
+        self.write(os.path.join("album", "two.flac"), b"22")
+        self.write(os.path.join("album", "cover.jpg"), b"img")
+        self.scanner = self.new_scanner()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def new_scanner(self):
+        return LibraryScanner(['.mp3', '.flac'], os.path.join(self.temp_dir, "manifest.json"))
+
+    def write(self, name, data):
+        with open(os.path.join(self.music, name), 'wb') as f:
+            f.write(data)
+
+    def path(self, name):
+        return os.path.join(self.music, name)
+
+    def test_first_scan_adds_every_song(self):
+        diff = self.scanner.scan(self.music)
+        self.assertEqual(sorted(diff.added), [self.path("album/two.flac"), self.path("one.mp3")])
+        self.assertEqual(diff.dirs_scanned, 2)
+
+    def test_unchanged_folder_is_not_listed_again(self):
+        self.scanner.scan(self.music)
+        diff = self.new_scanner().scan(self.music)
+        self.assertTrue(diff.is_empty())
+        self.assertEqual(diff.dirs_scanned, 0)
+        self.assertEqual(diff.dirs_skipped, 2)
+
+    def test_added_and_removed_songs(self):
+        self.scanner.scan(self.music)
+        os.remove(self.path("one.mp3"))
+        self.write(os.path.join("album", "three.mp3"), b"333")
+        diff = self.scanner.scan(self.music)
+        self.assertEqual(diff.added, [self.path("album/three.mp3")])
+        self.assertEqual(diff.removed, [self.path("one.mp3")])
+
+    def test_file_edited_in_place_is_modified(self):
+        self.scanner.scan(self.music)
+        album = self.path("album")
+        album_times = (os.stat(album).st_atime, os.stat(album).st_mtime)
+        song = self.path("album/two.flac")
+        self.write(os.path.join("album", "two.flac"), b"retagged")
+        os.utime(song, (album_times[0], album_times[1] + 10))
+        # Editing a file does not touch its directory's mtime
+        os.utime(album, album_times)
+
+        diff = self.scanner.scan(self.music)
+        self.assertEqual(diff.modified, [song])
+        self.assertEqual(diff.dirs_scanned, 0)
+        self.assertTrue(self.scanner.scan(self.music).is_empty())
+        self.assertIn((song, len(b"retagged"), os.stat(song).st_mtime), set(self.scanner.get_signatures(self.music)))
+
+    def test_cancelled_scan_keeps_the_manifest(self):
+        self.scanner.scan(self.music)
+        before = set(self.scanner.get_files(self.music))
+        self.write("new.mp3", b"4")
+        token = ScanCancelToken()
+        token.cancel()
+        list(self.scanner.iter_scan(self.music, ScanDiff(self.music), cancel_token=token))
+        self.assertEqual(set(self.scanner.get_files(self.music)), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+from search_index import TrigramIndex, normalize
+
+
+class TrigramIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.add(0, "Summer Night", "Beyoncé", "Lemonade")
+        self.index.add(1, "Broken Heart")
+        self.index.add(2, "Night Drive", "Electric Hollow")
+
+    def test_normalize_strips_accents_and_case(self):
+        self.assertEqual(normalize("Beyoncé ÉTÉ"), "beyonce ete")
+
+    def test_substring_search(self):
+        self.assertEqual(self.index.search("night"), {0, 2})
+        self.assertEqual(self.index.search("ght dr"), {2})
+        self.assertEqual(self.index.search("zzz"), set())
+
+    def test_artist_and_album_are_searched(self):
+        self.assertEqual(self.index.search("beyonce"), {0})
+        self.assertEqual(self.index.search("HOLLOW"), {2})
+
+    def test_matches_do_not_span_fields(self):
+        self.assertEqual(self.index.search("nightbey"), set())
+        self.assertEqual(self.index.search("night beyonce"), set())
+
+    def test_short_queries(self):
+        self.assertEqual(self.index.search("e"), {0, 1, 2})
+        self.assertEqual(self.index.search("br"), {1})
+        self.assertEqual(self.index.search(""), {0, 1, 2})
+
+    def test_typing_narrows_the_last_result(self):
+        self.assertEqual(self.index.search("ni"), {0, 2})
+        self.assertEqual(self.index.search("nig"), {0, 2})
+        self.assertEqual(self.index.search("night d"), {2})
+        self.assertEqual(self.index.search("n"), {0, 1, 2})
+
+    def test_changes_invalidate_cached_results(self):
+        self.assertEqual(self.index.search("he"), {1})
+        self.index.add(3, "Heat Wave")
+        self.assertEqual(self.index.search("he"), {1, 3})
+        self.assertEqual(self.index.search("night"), {0, 2})
+        self.index.remove(2)
+        self.assertEqual(self.index.search("night"), {0})
+        self.assertNotIn(2, self.index)
+
+    def test_re_adding_replaces_the_text(self):
+        self.index.add(1, "Broken Heart", "New Artist")
+        self.assertEqual(self.index.search("artist"), {1})
+        self.assertEqual(len(self.index), 3)
+
+    def test_clear_cache(self):
+        self.index.search("ni")
+        self.index.search("nig")
+        self.index.clear_cache()
+        self.assertIsNone(self.index._last_query)
+        self.assertEqual(self.index._short_results, {})
+        self.assertEqual(self.index.search("summer"), {0})
+
+    def test_matches_a_linear_scan_after_compaction(self):
+        rng = random.Random(7)
+        words = "love night heart dance dream fire rain blue light road".split()
+        index = TrigramIndex()
+        texts = {}
+        for song_id in range(3000):
+            texts[song_id] = " ".join(rng.choice(words) for _ in range(3))
+            index.add(song_id, texts[song_id])
+        for song_id in range(0, 3000, 2):
+            index.remove(song_id)
+            del texts[song_id]
+        index.compact()
+        for query in ("night", "re lo", "ht da", "blue blue", "zz"):
+            expected = {song_id for song_id, text in texts.items() if query in text}
+            self.assertEqual(index.search(query), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
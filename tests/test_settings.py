@@ -0,0 +1,73 @@
+import time
+import unittest
+
+try:
+    from settings import SettingsManager
+except ImportError:  # customtkinter is not installed
+    SettingsManager = None
+
+
+class FakeStore:
+    def __init__(self, saved=None):
+        self.saved = dict(saved or {})
+        self.writes = []
+
+    def load_settings(self):
+        return dict(self.saved)
+
+    def save_settings(self, settings):
+        self.writes.append(dict(settings))
+        self.saved = dict(settings)
+
+
+@unittest.skipUnless(SettingsManager, "customtkinter is not installed")
+class SettingsWriteBehindTest(unittest.TestCase):
+    def setUp(self):
+        self.store = FakeStore({'volume': 0.8})
+        self.settings = SettingsManager(self.store)
+        self.settings.SAVE_DELAY = 0.05
+        self.settings.SAVE_MAX_LATENCY = 0.3
+
+    def tearDown(self):
+        self.settings.close()
+
+    def wait_for_writes(self, count, timeout=2):
+        deadline = time.time() + timeout
+        while len(self.store.writes) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_saved_settings_are_loaded_over_the_defaults(self):
+        self.assertEqual(self.settings.get_volume(), 0.8)
+        self.assertEqual(self.settings.get_language(), 'en_US')
+
+    def test_a_burst_of_changes_is_written_once(self):
+        for step in range(100):
+            self.settings.set_volume(step / 100)
+        self.wait_for_writes(1)
+        time.sleep(0.1)
+        self.assertEqual(len(self.store.writes), 1)
+        self.assertEqual(self.store.saved['volume'], 0.99)
+        self.assertEqual(self.settings.get_write_stats(), {'save_requests': 100, 'physical_writes': 1})
+
+    def test_continuous_changes_are_written_within_the_max_latency(self):
+        started = time.time()
+        while time.time() - started < 0.6:
+            self.settings.set_volume(time.time() - started)
+            time.sleep(0.01)
+        self.assertGreaterEqual(len(self.store.writes), 1)
+
+    def test_close_writes_pending_changes(self):
+        self.settings.SAVE_DELAY = 10
+        self.settings.SAVE_MAX_LATENCY = 10
+        self.settings.set_language('es_ES')
+        self.settings.close()
+        self.assertEqual(self.store.saved['language'], 'es_ES')
+        self.assertEqual(len(self.store.writes), 1)
+
+    def test_flush_without_changes_does_not_write(self):
+        self.settings.flush()
+        self.assertEqual(self.store.writes, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
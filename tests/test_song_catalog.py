@@ -0,0 +1,125 @@
+import os
+import random
+import unittest
+from song_catalog import SongCatalog, SongIdView, PlaylistView
+
+
+class SongCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = SongCatalog({1: 'neutral', 2: 'happy', 3: 'sad'})
+
+    def path(self, title, ext='.mp3', folder='music'):
+        return os.path.join(os.sep, folder, title + ext)
+
+    def titles(self):
+        return [self.catalog.get_title(song_id) for song_id in self.catalog.ids()]
+
+    def assert_positions(self):
+        for index, song_id in enumerate(self.catalog.ids()):
+            self.assertEqual(self.catalog.index_of(song_id), index)
+
+    def test_songs_are_in_title_order(self):
+        self.catalog.add_many([self.path(title) for title in ("b", "C", "a")])
+        self.assertEqual(self.titles(), ["a", "b", "C"])
+        self.assert_positions()
+
+    def test_added_songs_are_merged_into_the_order(self):
+        self.catalog.add_many([self.path(title) for title in ("b", "d", "f")])
+        self.catalog.ids()
+        self.catalog.add_many([self.path(title) for title in ("e", "a", "g", "c")])
+        self.assertEqual(self.titles(), ["a", "b", "c", "d", "e", "f", "g"])
+        self.assert_positions()
+
+    def test_equal_titles_keep_insertion_order(self):
+        first = self.catalog.add(self.path("song", folder="one"))
+        self.catalog.ids()
+        second = self.catalog.add(self.path("song", folder="two"))
+        third = self.catalog.add(self.path("Song", ".flac", folder="one"))
+        self.assertEqual(list(self.catalog.ids()), [first, second, third])
+
+    def test_removed_songs_leave_the_order(self):
+        ids = self.catalog.add_many([self.path(title) for title in "abcdef"])
+        self.catalog.ids()
+        self.catalog.remove(ids[1])
+        self.catalog.remove(ids[4])
+        self.assertEqual(self.titles(), ["a", "c", "d", "f"])
+        self.assertEqual(self.catalog.index_of(ids[1]), -1)
+        self.assertFalse(self.catalog.is_live(ids[1]))
+        self.assertIsNone(self.catalog.get_id(self.path("b")))
+        self.assert_positions()
+
+    def test_song_removed_before_it_is_merged(self):
+        self.catalog.add_many([self.path(title) for title in "ac"])
+        self.catalog.ids()
+        song_id = self.catalog.add(self.path("b"))
+        self.catalog.remove(song_id)
+        self.assertEqual(self.titles(), ["a", "c"])
+
+    def test_random_changes_match_a_full_sort(self):
+        rng = random.Random(4)
+        live = {}
+        for _ in range(40):
+            for _ in range(rng.randint(0, 30)):
+                title = f"{rng.choice('abcdefghij')}{rng.randint(0, 500)}"
+                path = self.path(title, folder=rng.choice(("one", "two")))
+                live[path] = self.catalog.add(path)
+            for path in rng.sample(sorted(live), min(len(live), rng.randint(0, 10))):
+                self.catalog.remove(live.pop(path))
+            expected = sorted(live.values(), key=lambda song_id: (self.catalog.get_title(song_id).lower(), song_id))
+            self.assertEqual(list(self.catalog.ids()), expected)
+            self.assert_positions()
+        self.assertEqual(len(self.catalog), len(live))
+
+    def test_same_title_with_another_extension(self):
+        mp3 = self.catalog.add(self.path("song"))
+        flac = self.catalog.add(self.path("song", ".flac"))
+        self.assertNotEqual(mp3, flac)
+        self.assertEqual(self.catalog.get_id(self.path("song", ".flac")), flac)
+        self.catalog.remove(flac)
+        self.assertIsNone(self.catalog.get_id(self.path("song", ".flac")))
+        self.assertEqual(self.catalog.get_id(self.path("song")), mp3)
+
+    def test_emotion_sets_follow_tags(self):
+        song_id = self.catalog.add(self.path("a"), [2])
+        untagged = self.catalog.add(self.path("b"))
+        self.assertEqual(self.catalog.ids_with_emotion(2), {song_id})
+        self.assertEqual(self.catalog.get_emotions(song_id), ['happy'])
+        self.catalog.remove_emotion(song_id, 2)
+        self.catalog.add_emotion(untagged, 3)
+        self.assertEqual(self.catalog.ids_with_emotion(2), set())
+        self.assertEqual(self.catalog.ids_with_emotion(3), {untagged})
+
+    def test_columns_round_trip(self):
+        ids = self.catalog.add_many([self.path(title) for title in ("b", "a", "c")], {self.path("c"): [3]})
+        self.catalog.remove(ids[0])
+        columns = self.catalog.export_columns()
+        loaded = SongCatalog()
+        loaded.load_columns(columns)
+        self.assertEqual([loaded.get_path(song_id) for song_id in loaded.ids()], [self.path("a"), self.path("c")])
+        self.assertEqual(loaded.get_emotion_numbers(loaded.get_id(self.path("c"))), [3])
+        loaded.add(self.path("b"))
+        self.assertEqual([loaded.get_title(song_id) for song_id in loaded.ids()], ["a", "b", "c"])
+
+    def test_id_view_follows_the_catalog(self):
+        ids = self.catalog.add_many([self.path(title) for title in "bd"])
+        view = SongIdView(self.catalog)
+        self.assertEqual(list(view), ids)
+        added = self.catalog.add(self.path("a"))
+        self.catalog.remove(ids[1])
+        self.assertEqual(len(view), 2)
+        self.assertEqual((view[0], view[-1]), (added, ids[0]))
+        self.assertEqual(view.index(ids[0]), 1)
+        self.assertNotIn(ids[1], view)
+        with self.assertRaises(ValueError):
+            view.index(ids[1])
+
+    def test_playlist_view(self):
+        self.catalog.add_many([self.path(title) for title in "ba"])
+        view = PlaylistView(self.catalog)
+        self.assertEqual(len(view), 2)
+        self.assertEqual([song['title'] for song in view], ["a", "b"])
+        self.assertEqual(view[-1]['path'], self.path("b"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from song_selection import SongSelection
+
+
+class SongSelectionTest(unittest.TestCase):
+    def setUp(self):
+        self.selection = SongSelection()
+
+    def test_toggle(self):
+        self.selection.toggle(3)
+        self.selection.toggle(20)
+        self.selection.toggle(3)
+        self.assertEqual(self.selection.ids(), [20])
+        self.assertEqual(len(self.selection), 1)
+        self.assertNotIn(3, self.selection)
+
+    def test_select_all_then_deselect(self):
+        self.selection.toggle(50)
+        self.selection.select_all([4, 2, 9])
+        self.selection.toggle(2)
+        self.selection.toggle(11)
+        self.assertEqual(sorted(self.selection.ids()), [4, 9, 11])
+        self.assertEqual(len(self.selection), 3)
+        self.assertNotIn(50, self.selection)
+
+    def test_select_all_keeps_the_ids_it_was_given(self):
+        view = [1, 2, 3]
+        self.selection.select_all(view)
+        view.append(4)
+        view.remove(1)
+        self.assertEqual(sorted(self.selection.ids()), [1, 2, 3])
+        self.assertEqual(len(self.selection), 3)
+        self.assertNotIn(4, self.selection)
+
+    def test_select_range(self):
+        view = [7, 3, 5, 1]
+        self.selection.select_range(view, 2, 0)
+        self.assertEqual(sorted(self.selection.ids()), [3, 5, 7])
+        self.selection.select_range(view, 1, 2, selected=False)
+        self.assertEqual(self.selection.ids(), [7])
+
+    def test_clear(self):
+        self.selection.select_all([1, 2])
+        self.selection.toggle(5)
+        self.selection.clear()
+        self.assertEqual((len(self.selection), self.selection.ids()), (0, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
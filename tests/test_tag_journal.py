@@ -0,0 +1,75 @@
+import time
+import unittest
+from tag_journal import TagJournal
+
+
+class FakeStore:
+    def __init__(self):
+        self.tags = {}
+        self.commits = []
+        self.checkpoints = 0
+        self.fail = False
+
+    def set_song_tags_many(self, items):
+        if self.fail:
+            raise Exception("disk full")
+        items = dict(items)
+        self.commits.append(items)
+        self.tags.update(items)
+
+    def checkpoint(self):
+        self.checkpoints += 1
+
+
+class TagJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.store = FakeStore()
+        self.journal = TagJournal(self.store, flush_delay=0.05, checkpoint_every=2)
+
+    def tearDown(self):
+        self.journal.close()
+
+    def wait_for_commit(self):
+        deadline = time.time() + 2
+        while not self.store.commits and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_changes_are_grouped_into_one_commit(self):
+        self.journal.record("a.mp3", [2])
+        self.journal.record("b.mp3", [3])
+        self.journal.record("a.mp3", [1, 2])
+        self.assertEqual(self.journal.pending_tags("a.mp3"), [1, 2])
+        self.wait_for_commit()
+        self.assertEqual(self.store.commits, [{"a.mp3": [1, 2], "b.mp3": [3]}])
+        self.assertIsNone(self.journal.pending_tags("a.mp3"))
+
+    def test_failed_commit_is_retried(self):
+        self.store.fail = True
+        self.journal.record_many([("a.mp3", [2])])
+        self.assertEqual(self.journal.flush(), 0)
+        self.assertEqual(self.journal.pending_tags("a.mp3"), [2])
+        self.store.fail = False
+        self.assertEqual(self.journal.flush(), 1)
+        self.assertEqual(self.store.tags, {"a.mp3": [2]})
+
+    def test_checkpoint_every_few_commits(self):
+        for path in ("a.mp3", "b.mp3"):
+            self.journal.record_many([(path, [2])])
+            self.journal.flush()
+        self.assertEqual(self.store.checkpoints, 1)
+
+    def test_close_persists_queued_changes(self):
+        self.journal.record("a.mp3", [3])
+        self.journal.close()
+        self.assertEqual(self.store.tags, {"a.mp3": [3]})
+        self.assertGreaterEqual(self.store.checkpoints, 1)
+
+    def test_record_after_close_is_written_at_once(self):
+        self.journal.close()
+        self.journal.record("late.mp3", [1])
+        self.assertEqual(self.store.tags, {"late.mp3": [1]})
+        self.assertIsNone(self.journal.pending_tags("late.mp3"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,12 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
-from PIL import Image
-import time
 import threading
-from emotion_manager import EmotionManager
-from camera_manager import CameraManager
+from virtual_list import VirtualList
+from song_catalog import SongIdView
+from keyed_rows import KeyedRows, widget_counter
+from tag_dialog import BulkTagDialog
+from startup_profiler import profiler
 
 class PlayerUI:
     def __init__(self, root, player, playlist_manager, history_manager, settings_manager, emotion_manager, language_manager):
@@ -15,7 +16,7 @@ class PlayerUI:
         self.playlist_manager = playlist_manager
         self.history_manager = history_manager
         self.settings_manager = settings_manager
-        self.emotion_manager = emotion_manager
+        self.emotion_manager = emotion_manager  # created on first use if None
         self.language_manager = language_manager
         
         # Set dark theme
@@ -28,8 +29,10 @@ class PlayerUI:
         # Load saved language
         self.language_manager.set_language(self.settings_manager.get_language())
         
-        self._setup_ui()
-        self._load_saved_settings()
+        with profiler.phase("setup ui"):
+            self._setup_ui()
+        with profiler.phase("load saved settings"):
+            self._load_saved_settings()
         
     def _setup_ui(self):
         # Create main frame
@@ -37,7 +40,7 @@ class PlayerUI:
         self.main_frame.pack(fill="both", expand=True)
         
         # Create tabs
-        self.tab_view = ctk.CTkTabview(self.main_frame)
+        self.tab_view = ctk.CTkTabview(self.main_frame, command=self._on_tab_change)
         self.tab_view.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Add tabs
@@ -45,12 +48,25 @@ class PlayerUI:
         self.tab_playlist = self.tab_view.add(self.language_manager.get_text("playlist"))
         self.tab_history = self.tab_view.add(self.language_manager.get_text("history"))
         
-        # Setup each tab
+        # Only the player tab is built now; the others on first view
+        self.playlist_list = None
+        self.history_rows = None
+        self._history_stats = None          # worker thread computing the listening stats
+        self._history_stats_stale = False   # a play came in while the stats were hidden or being computed
+        self._tab_builders = {
+            self.language_manager.get_text("playlist"): self._setup_playlist_tab,
+            self.language_manager.get_text("history"): self._setup_history_tab
+        }
         self._setup_player_tab()
-        self._setup_playlist_tab()
-        self._setup_history_tab()
         self._setup_settings_button()
 
+    def _on_tab_change(self):
+        builder = self._tab_builders.pop(self.tab_view.get(), None)
+        if builder:
+            builder()
+        elif self._history_stats_stale:
+            self._refresh_history_stats()
+
     def _setup_player_tab(self):
         # Create main player frame with dark grey background
         player_frame = ctk.CTkFrame(self.tab_player, fg_color="#2B2B2B")
@@ -170,257 +186,89 @@ class PlayerUI:
         )
         self.emotion_filter.pack(side="right", padx=5)
 
-        # Create scrollable frame for playlist
-        self.playlist_scrollable = ctk.CTkScrollableFrame(playlist_frame)
-        self.playlist_scrollable.pack(fill="both", expand=True, padx=5, pady=5)
-
-        # Initialize empty list to store song buttons
-        self.playlist_buttons = []
+        # Virtualized song list: only the visible rows have widgets
+        self.playlist_filter = "All"
+        self.playlist_list = VirtualList(
+            playlist_frame,
+            render_row=self._render_playlist_row,
+            on_activate=self._play_song_id
+        )
+        self.playlist_list.pack(fill="both", expand=True, padx=5, pady=5)
         
         # Add songs from playlist
         self._refresh_playlist()
 
     def _filter_playlist(self, emotion):
-        # Clear existing buttons
-        for button in self.playlist_buttons:
-            button.destroy()
-        self.playlist_buttons.clear()
-
-        # Add new buttons for each song that matches the filter
-        playlist = self.playlist_manager.get_playlist()
-        for song in playlist:
-            song_emotion = self.emotion_manager.get_emotion(song['path'])
-            song_emotion_number = self.emotion_manager.get_emotion_number(song['path'])
-            
-            # Skip if doesn't match filter
-            if emotion != "All":
-                if emotion == "Untagged" and song_emotion_number != 0:
-                    continue
-                elif emotion == "Happy" and song_emotion_number != 2:
-                    continue
-                elif emotion == "Sad" and song_emotion_number != 3:
-                    continue
-                elif emotion == "Neutral" and song_emotion_number != 1:
-                    continue
-            
-            # Create frame for song row
-            song_frame = ctk.CTkFrame(self.playlist_scrollable)
-            song_frame.pack(fill="x", padx=5, pady=2)
-            
-            # Create button for song
-            btn = ctk.CTkButton(
-                song_frame,
-                text=song['title'],
-                command=lambda s=song: self._play_song(s),
-                anchor="w",
-                height=30
-            )
-            btn.pack(side="left", fill="x", expand=True)
-            
-            # Create label for emotion
-            emotion_label = ctk.CTkLabel(
-                song_frame,
-                text=song_emotion if song_emotion != "Untagged" else "",
-                width=80
-            )
-            emotion_label.pack(side="right", padx=5)
-            
-            self.playlist_buttons.append(song_frame)
-
-    def _refresh_playlist(self):
-        # Clear existing buttons
-        for button in self.playlist_buttons:
-            button.destroy()
-        self.playlist_buttons.clear()
-
-        # Add new buttons for each song
-        playlist = self.playlist_manager.get_playlist()
-        for song in playlist:
-            # Create frame for song row
-            song_frame = ctk.CTkFrame(self.playlist_scrollable)
-            song_frame.pack(fill="x", padx=5, pady=2)
-            
-            # Create button for song
-            btn = ctk.CTkButton(
-                song_frame,
-                text=song['title'],
-                command=lambda s=song: self._play_song(s),
-                anchor="w",
-                height=30
-            )
-            btn.pack(side="left", fill="x", expand=True)
-            
-            # Add emotion label with number
-            emotion = self.emotion_manager.get_emotion(song['path'])
-            emotion_number = self.emotion_manager.get_emotion_number(song['path'])
-            
-            # Format display text
-            emotion_display = ""
-            if emotion != "Untagged":
-                emotion_display = f"{emotion} ({emotion_number})"
-                
-            emotion_label = ctk.CTkLabel(
-                song_frame,
-                text=emotion_display,
-                width=100
-            )
-            emotion_label.pack(side="right", padx=5)
-            
-            self.playlist_buttons.append(song_frame)
+        with widget_counter.operation("filter playlist"):
+            self.playlist_filter = emotion
+            self.playlist_list.scroll_to(0)
+            self._refresh_playlist()
+
+    def _refresh_playlist(self, changed=None):
+        """Show the (filtered) playlist; changed lists song IDs whose rows must be re-rendered"""
+        if self.playlist_list is None:
+            # Tab not opened yet, it shows the current playlist when built
+            return
+        if self.playlist_filter == "All":
+            # Unfiltered: show the catalog's own order, positions are O(1)
+            catalog = self.playlist_manager.catalog
+            self.playlist_list.set_items(SongIdView(catalog), index_of=catalog.index_of)
+        else:
+            self.playlist_list.set_items(self.playlist_manager.query_ids(emotion=self.playlist_filter))
+        if changed:
+            self.playlist_list.update_items(changed)
+
+    def _render_playlist_row(self, song_id):
+        song = self.playlist_manager.get_song_by_id(song_id)
+        emotion, emotion_number = self._get_song_emotion(song)
+        emotion_display = f"{emotion} ({emotion_number})" if emotion != "Untagged" else ""
+        return song['title'], emotion_display
+
+    def _play_song_id(self, song_id):
+        self._play_song(self.playlist_manager.get_song_by_id(song_id))
+
+    def _get_song_emotion(self, song):
+        """Get the display name and number of a song's emotion tag"""
+        if not song['emotion_numbers']:
+            return "Untagged", 0
+        return song['emotions'][0].capitalize(), song['emotion_numbers'][0]
 
     def _tag_emotion(self):
-        # Create emotion tagging dialog
-        dialog = ctk.CTkToplevel(self.root)
-        dialog.title(self.language_manager.get_text("tag_emotion"))
-        dialog.geometry("400x500")
-        dialog.transient(self.root)
-        dialog.grab_set()  # Make dialog modal
-
-        # Create title label
-        title_label = ctk.CTkLabel(
-            dialog, 
-            text=self.language_manager.get_text("tag_emotion"),
-            font=("Arial", 16, "bold")
-        )
-        title_label.pack(pady=10)
+        # Bulk tagging dialog over a virtualized, filterable song list
+        BulkTagDialog(self.root, self.playlist_manager, self.language_manager, self._apply_emotion_tags)
 
-        # Create emotion radio buttons with better styling
-        emotion_var = ctk.StringVar(value="Neutral")
-        
-        emotions_frame = ctk.CTkFrame(dialog)
-        emotions_frame.pack(fill="x", padx=20, pady=10)
-        
-        emotions_label = ctk.CTkLabel(
-            emotions_frame, 
-            text=self.language_manager.get_text("select_emotion"),
-            font=("Arial", 12)
-        )
-        emotions_label.pack(pady=5)
-        
-        # Emotion mapping with numbers
-        emotion_mapping = [
-            ("Happy", 2),
-            ("Sad", 3),
-            ("Neutral", 1)
-        ]
-        
-        for emotion, number in emotion_mapping:
-            rb_frame = ctk.CTkFrame(emotions_frame)
-            rb_frame.pack(fill="x", pady=2)
-            
-            rb = ctk.CTkRadioButton(
-                rb_frame,
-                text=f"{self.language_manager.get_text(emotion.lower())} ({number})",
-                variable=emotion_var,
-                value=emotion,
-                font=("Arial", 12)
-            )
-            rb.pack(side="left", padx=10)
-        
-        # Create a frame for the song list with a title
-        songs_label = ctk.CTkLabel(
-            dialog, 
-            text=self.language_manager.get_text("select_songs"),
-            font=("Arial", 12)
-        )
-        songs_label.pack(pady=5)
-        
-        songs_frame = ctk.CTkScrollableFrame(dialog)
-        songs_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        # Add select all checkbox
-        select_all_var = ctk.BooleanVar()
-        select_all_cb = ctk.CTkCheckBox(
-            songs_frame,
-            text=self.language_manager.get_text("select_all"),
-            variable=select_all_var,
-            font=("Arial", 12)
-        )
-        select_all_cb.pack(pady=5, anchor="w")
-        
-        # Add checkboxes for each song
-        song_vars = {}
-        song_checkboxes = []
-        for song in self.playlist_manager.get_playlist():
-            var = ctk.BooleanVar()
-            checkbox = ctk.CTkCheckBox(
-                songs_frame,
-                text=song['title'],
-                variable=var,
-                font=("Arial", 11)
-            )
-            checkbox.pack(pady=2, anchor="w")
-            song_vars[song['path']] = var
-            song_checkboxes.append(checkbox)
-            
-        # Select all functionality
-        def toggle_select_all():
-            for checkbox in song_checkboxes:
-                checkbox.select() if select_all_var.get() else checkbox.deselect()
-                
-        select_all_cb.configure(command=toggle_select_all)
-            
-        def apply_emotions():
-            emotion = emotion_var.get()
-            for song_path, var in song_vars.items():
-                if var.get():
-                    self.emotion_manager.set_emotion(song_path, emotion)
-            dialog.destroy()
-            self._refresh_playlist()
-            
-        # Create a styled confirm button
-        confirm_button = ctk.CTkButton(
-            dialog,
-            text=self.language_manager.get_text("confirm"),
-            command=apply_emotions,
-            font=("Arial", 12, "bold"),
-            height=35
-        )
-        confirm_button.pack(pady=15, padx=20, fill="x")
+    def _apply_emotion_tags(self, emotion, song_ids):
+        with widget_counter.operation("tag songs"):
+            changed = self.playlist_manager.set_song_ids_emotion(song_ids, emotion)
+            self._refresh_playlist(changed=changed)
 
     def _play_song(self, song):
-        success = self.player.play(song['path'], song['title'])
-        if success:
-            # Update UI
-            self.current_song_label.configure(text=song['title'])
-            self.play_button.configure(text="⏸")
-            # Add to history
-            self.history_manager.add_to_history(song['path'], song['title'])
-            self._refresh_history()
-            return True
-        return False
+        with widget_counter.operation("play song"):
+            success = self.player.play(song['path'], song['title'])
+            if success:
+                # Update UI
+                self.current_song_label.configure(text=song['title'])
+                self.play_button.configure(text="⏸")
+                # The player already logged the play
+                self._refresh_history()
+                return True
+            return False
 
     def _play_next(self):
-        playlist = self.playlist_manager.get_playlist()
-        current_song = self.player.current_song
-        
-        # Find current song index
-        current_index = -1
-        for i, song in enumerate(playlist):
-            if song['path'] == current_song:
-                current_index = i
-                break
-        
         # Play next song if available
-        if current_index >= 0 and current_index + 1 < len(playlist):
-            next_song = playlist[current_index + 1]
+        next_song = self.playlist_manager.get_adjacent_song(self.player.current_song, 1)
+        if next_song:
             self._play_song(next_song)
+            if self.playlist_list is not None:
+                self.playlist_list.scroll_to_item(next_song['id'])
 
     def _play_previous(self):
-        playlist = self.playlist_manager.get_playlist()
-        current_song = self.player.current_song
-        
-        # Find current song index
-        current_index = -1
-        for i, song in enumerate(playlist):
-            if song['path'] == current_song:
-                current_index = i
-                break
-        
         # Play previous song if available
-        if current_index > 0:
-            prev_song = playlist[current_index - 1]
+        prev_song = self.playlist_manager.get_adjacent_song(self.player.current_song, -1)
+        if prev_song:
             self._play_song(prev_song)
+            if self.playlist_list is not None:
+                self.playlist_list.scroll_to_item(prev_song['id'])
 
     def _play_pause(self):
         if self.player.current_song is None:
@@ -453,64 +301,114 @@ class PlayerUI:
         )
         clear_button.pack(pady=5)
 
+        # Listening stats from the play log
+        self.history_stats_label = ctk.CTkLabel(history_frame, text="")
+        self.history_stats_label.pack(pady=2)
+
         # Create scrollable frame for history
         self.history_scrollable = ctk.CTkScrollableFrame(history_frame)
         self.history_scrollable.pack(fill="both", expand=True, padx=5, pady=5)
 
-        # Initialize empty list to store history buttons
-        self.history_buttons = []
+        # History rows are patched by (song, day) instead of rebuilt
+        self.history_rows = KeyedRows(
+            self.history_scrollable,
+            self._create_history_row,
+            self._update_history_row,
+            widgets_per_row=3
+        )
         
         # Add history entries
         self._refresh_history()
 
     def _refresh_history(self):
-        # Clear existing entries
-        for widget in self.history_scrollable.winfo_children():
-            widget.destroy()
-        self.history_buttons = []
-            
-        # Add new entries for each history item
-        history_entries = self.history_manager.get_history()
-        for entry in reversed(history_entries):  # Show newest first
-            song_name = entry.get('title', os.path.basename(entry['path']))
-            date_str = entry.get('date', '')
-            time_str = entry.get('time', '')
-            play_count = entry.get('play_count', 1)
-            
-            # Create frame for history entry
-            entry_frame = ctk.CTkFrame(self.history_scrollable)
-            entry_frame.pack(fill="x", padx=5, pady=2)
-            
-            # Create play button
-            btn = ctk.CTkButton(
-                entry_frame,
-                text=song_name,
-                command=lambda s=entry: self._play_song({
-                    'path': s['path'],
-                    'title': s.get('title', os.path.basename(s['path']))
-                }),
-                anchor="w",
-                height=30
-            )
-            btn.pack(side="left", fill="x", expand=True)
-            
-            # Create info label
-            info_text = f"{date_str} {time_str}"
-            if play_count > 1:
-                info_text += f" (Played {play_count}x)"
-            
-            info_label = ctk.CTkLabel(
-                entry_frame,
-                text=info_text,
-                width=150
-            )
-            info_label.pack(side="right", padx=5)
-            
-            self.history_buttons.append(entry_frame)
+        if self.history_rows is None:
+            return
+        self._refresh_history_stats()
+        # Show newest first
+        entries = list(reversed(self.history_manager.get_history()))
+        self.history_rows.patch(entries, key=lambda entry: (entry['path'], entry.get('date', '')))
+
+    def _create_history_row(self, parent, entry):
+        # Create frame for history entry
+        entry_frame = ctk.CTkFrame(parent)
+        
+        # Create play button
+        entry_frame.button = ctk.CTkButton(
+            entry_frame,
+            text="",
+            command=lambda f=entry_frame: self._play_song({
+                'path': f.entry['path'],
+                'title': f.entry.get('title', os.path.basename(f.entry['path']))
+            }),
+            anchor="w",
+            height=30
+        )
+        entry_frame.button.pack(side="left", fill="x", expand=True)
+        
+        # Create info label
+        entry_frame.label = ctk.CTkLabel(entry_frame, text="", width=150)
+        entry_frame.label.pack(side="right", padx=5)
+        
+        self._update_history_row(entry_frame, entry)
+        return entry_frame
+
+    def _update_history_row(self, entry_frame, entry):
+        entry_frame.entry = entry
+        play_count = entry.get('play_count', 1)
+        info_text = f"{entry.get('date', '')} {entry.get('time', '')}"
+        if play_count > 1:
+            info_text += f" (Played {play_count}x)"
+        entry_frame.button.configure(text=entry.get('title', os.path.basename(entry['path'])))
+        entry_frame.label.configure(text=info_text)
+
+    def _refresh_history_stats(self):
+        """Recompute the listening stats on a worker thread while the History tab is shown"""
+        if self.tab_view.get() != self.language_manager.get_text("history") or self._history_stats is not None:
+            # Picked up when the tab is shown again or the running computation ends
+            self._history_stats_stale = True
+            return
+        self._history_stats_stale = False
+        result = {}
+
+        def compute():
+            try:
+                result['stats'] = self.history_manager.get_listening_stats(self._get_song_duration)
+            except Exception as e:
+                print(f"Error computing listening stats: {e}")
+
+        def pump():
+            if self._history_stats is not worker:
+                # The tabs were rebuilt meanwhile, the result belongs to widgets that are gone
+                return
+            if worker.is_alive():
+                self.root.after(30, pump)
+                return
+            self._history_stats = None
+            if 'stats' in result:
+                self._show_history_stats(result['stats'])
+            if self._history_stats_stale:
+                self._refresh_history_stats()
+
+        worker = threading.Thread(target=compute, daemon=True)
+        self._history_stats = worker
+        worker.start()
+        self.root.after(30, pump)
+
+    def _show_history_stats(self, stats):
+        text = f"{self.language_manager.get_text('listening_streak')}: {stats['streak']} {self.language_manager.get_text('days')}"
+        if stats['top_today']:
+            path, count = stats['top_today']
+            title = os.path.splitext(os.path.basename(path))[0]
+            text += f"  |  {self.language_manager.get_text('top_today')}: {title} ({count}x)"
+        self.history_stats_label.configure(text=text)
+
+    def _get_song_duration(self, song_path):
+        return self.playlist_manager.get_song_duration(song_path)
 
     def _clear_history(self):
-        self.history_manager.clear_history()
-        self._refresh_history()
+        with widget_counter.operation("clear history"):
+            self.history_manager.clear_history()
+            self._refresh_history()
 
     def _setup_settings_button(self):
         settings_button = ctk.CTkButton(
@@ -597,15 +495,30 @@ class PlayerUI:
             self.settings_manager.set_music_folder(folder)
             if label_widget:
                 label_widget.configure(text=folder)
-            if self.playlist_manager.load_folder(folder):
-                self._refresh_playlist()
+            self._load_music_folder(folder)
+
+    def _load_music_folder(self, folder):
+        """Scan a music folder in the background, showing songs as they arrive"""
+        self.playlist_manager.load_folder_async(
+            folder,
+            self.root,
+            on_batch=lambda songs: self._refresh_playlist()
+        )
+        self._refresh_playlist()
 
     def _load_saved_settings(self):
         # Load saved music folder
         folder = self.settings_manager.get_music_folder()
         if folder and os.path.exists(folder):
-            self.playlist_manager.load_folder(folder)
-            self._refresh_playlist()
+            if self.playlist_manager.load_snapshot(folder):
+                # Show last session's songs right away, then check them against the disk
+                self._refresh_playlist()
+                self.playlist_manager.validate_snapshot_async(
+                    self.root,
+                    on_done=lambda changed: self._refresh_playlist()
+                )
+            else:
+                self._load_music_folder(folder)
         
         # Load saved volume
         volume = self.settings_manager.get_volume()
@@ -623,12 +536,17 @@ class PlayerUI:
                     pass
                 self.camera_manager = None
             
+            # OpenCV and the camera window are only loaded once detection is used
+            from camera_manager import CameraManager
+            
             # Initialize camera manager with root window and UI instance
             self.camera_manager = CameraManager(
                 root_window=self.root,
                 parent_ui=self,
                 playlist_manager=self.playlist_manager,
-                language_manager=self.language_manager
+                language_manager=self.language_manager,
+                save_debug_frames=self.settings_manager.get_save_debug_frames(),
+                voter=self._get_emotion_manager().create_voter()
             )
             
             # Ensure the camera window is on top
@@ -645,31 +563,57 @@ class PlayerUI:
                     pass
                 self.camera_manager = None
 
-    def process_captured_image(self, image_path):
-        """Process the captured image from camera"""
+    def _get_emotion_manager(self):
+        """Create the emotion manager (and load MediaPipe) on first use"""
+        if self.emotion_manager is None:
+            from emotion_manager import EmotionManager
+            self.emotion_manager = EmotionManager()
+        return self.emotion_manager
+
+    def warm_up_emotion_detection(self):
+        """Load the camera module and the emotion model in the background so the first detection starts quickly"""
+        def load():
+            try:
+                import camera_manager
+            except Exception as e:
+                print(f"Error preloading emotion detection: {e}")
+        threading.Thread(target=load, daemon=True).start()
+        self._get_emotion_manager().warm_up()
+
+    def process_captured_frames(self, frames, vote=None):
+        """Process the frames captured by the camera (BGR arrays, oldest first)
+
+        vote is the EmotionVoter result for the frames seen during the
+        countdown; without one (or if no frame was classified in time) the
+        latest frame is classified on its own.
+        """
         try:
-            if not os.path.exists(image_path):
-                raise Exception("Captured image not found")
+            emotion_manager = self._get_emotion_manager()
+            if vote is not None and vote['frames']:
+                emotion_manager.process_vote(
+                    vote,
+                    self.root,
+                    self.playlist_manager,
+                    self.language_manager,
+                    on_play=self._play_song
+                )
+                return
                 
-            # Process the image using emotion manager
-            self.emotion_manager.process_image(
-                image_path,
+            if not frames:
+                raise Exception("No frame was captured")
+                
+            # Process the latest frame using emotion manager
+            emotion_manager.process_frame(
+                frames[-1],
                 self.root,
                 self.playlist_manager,
-                self.language_manager
+                self.language_manager,
+                on_play=self._play_song
             )
         except Exception as e:
             print(f"Error processing captured image: {e}")
             messagebox.showerror("Error", str(e))
         finally:
-            # Clean up temp image
-            try:
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-                    print(f"Deleted temp image: {image_path}")
-            except Exception as e:
-                print(f"Error cleaning up temp image: {e}")
-            
             # Clean up camera manager
             if self.camera_manager is not None:
                 try:
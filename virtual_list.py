@@ -0,0 +1,201 @@
+import customtkinter as ctk
+from keyed_rows import widget_counter
+
+
+class VirtualList(ctk.CTkFrame):
+    """Scrolling list that only creates row widgets for the visible rows.
+
+    The list shows a sequence of items (e.g. song IDs). Just enough rows to
+    fill the viewport are created, and scrolling re-labels those same rows
+    with the items now in view, so the widget count and the cost of a
+    refresh or a scroll do not depend on how many items there are.
+
+    render_row(item) returns the (title, detail) texts of a row and
+    on_activate(item) is called when a row is clicked (shift_held tells
+    whether Shift was down, for range selection).
+    """
+
+    def __init__(self, parent, render_row, on_activate=None, row_height=34, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.render_row = render_row
+        self.on_activate = on_activate
+        self.row_height = row_height
+
+        self.items = []
+        self._index_of = None
+        self._top = 0           # index of the first visible item
+        self._rows = []         # recycled row widgets
+        self.shift_held = False
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+    # Data
+
+    def set_items(self, items, index_of=None):
+        """Show a new sequence of items, keeping the scroll position where possible.
+
+        Rows that still show the same item are left alone; use update_items
+        when the items themselves changed (e.g. new tags).
+
+        index_of(item) may be given to find an item's position in O(1) for
+        scroll_to_item (-1 if absent); otherwise positions are mapped here.
+        """
+        self.items = items
+        if index_of is None:
+            positions = {item: index for index, item in enumerate(items)}
+            index_of = lambda item: positions.get(item, -1)
+        self._index_of = index_of
+        self._top = self._clamp(self._top)
+        self.refresh()
+
+    def redraw(self):
+        """Re-render every visible row"""
+        for row in self._rows:
+            row.stale = True
+        self.refresh()
+
+    def update_items(self, items):
+        """Re-render only the visible rows showing one of items"""
+        items = set(items)
+        for row in self._rows:
+            if row.item in items:
+                row.stale = True
+        self.refresh()
+
+    def refresh(self):
+        """Bring the visible rows up to date with the scroll position"""
+        items = self.items
+        for offset, row in enumerate(self._rows):
+            index = self._top + offset
+            if index < len(items):
+                item = items[index]
+                if row.item != item or row.stale:
+                    title, detail = self.render_row(item)
+                    row.button.configure(text=title)
+                    row.label.configure(text=detail)
+                    row.item = item
+                    row.stale = False
+                    widget_counter.rendered += 1
+                if not row.visible:
+                    row.place(x=0, y=offset * self.row_height, relwidth=1, height=self.row_height)
+                    row.visible = True
+            elif row.visible:
+                row.place_forget()
+                row.item = None
+                row.visible = False
+        self._update_scrollbar()
+
+    # Scrolling
+
+    def scroll_to(self, index):
+        """Scroll so the item at index is visible"""
+        visible = self._visible_count()
+        if index < self._top:
+            self._top = self._clamp(index)
+        elif index >= self._top + visible:
+            self._top = self._clamp(index - visible + 1)
+        else:
+            return
+        self.refresh()
+
+    def scroll_to_item(self, item):
+        index = self._index_of(item) if self._index_of else -1
+        if index >= 0:
+            self.scroll_to(index)
+
+    def _clamp(self, top):
+        return max(0, min(top, len(self.items) - self._visible_count()))
+
+    def _visible_count(self):
+        return max(1, self.body.winfo_height() // self.row_height)
+
+    def _scroll_by(self, rows):
+        top = self._clamp(self._top + rows)
+        if top != self._top:
+            self._top = top
+            self.refresh()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._top = self._clamp(int(float(args[0]) * len(self.items)))
+            self.refresh()
+        elif action == "scroll":
+            amount = int(args[0])
+            self._scroll_by(amount * self._visible_count() if args[1] == "pages" else amount)
+
+    def _on_wheel(self, event):
+        if getattr(event, 'num', None) == 4:
+            self._scroll_by(-3)
+        elif getattr(event, 'num', None) == 5:
+            self._scroll_by(3)
+        elif event.delta:
+            self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)
+        widget.bind("<Button-5>", self._on_wheel)
+
+    def _update_scrollbar(self):
+        total = len(self.items)
+        if total <= self._visible_count():
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self._top / total, (self._top + self._visible_count()) / total)
+
+    # Row pool
+
+    def _on_resize(self, event):
+        # One spare row so a partly visible last row is still drawn
+        needed = event.height // self.row_height + 1
+        while len(self._rows) < needed:
+            self._rows.append(self._create_row())
+        while len(self._rows) > needed:
+            self._rows.pop().destroy()
+            widget_counter.destroyed += 3
+        self._top = self._clamp(self._top)
+        self.refresh()
+
+    def _create_row(self):
+        row = ctk.CTkFrame(self.body, height=self.row_height)
+        row.item = None
+        row.stale = False
+        row.visible = False
+        row.button = ctk.CTkButton(
+            row,
+            text="",
+            command=lambda r=row: self._activate(r),
+            anchor="w",
+            height=30
+        )
+        row.button.pack(side="left", fill="x", expand=True, padx=(5, 0), pady=2)
+        row.label = ctk.CTkLabel(row, text="", width=100)
+        row.label.pack(side="right", padx=5)
+        row.button.bind("<Button-1>", self._remember_modifiers)
+        for widget in (row, row.button, row.label):
+            self._bind_wheel(widget)
+        widget_counter.created += 3
+        return row
+
+    def _remember_modifiers(self, event):
+        self.shift_held = bool(event.state & 0x0001)
+
+    def _activate(self, row):
+        if row.item is not None and self.on_activate:
+            self.on_activate(row.item)
+
+    def get_widget_count(self):
+        """Number of Tk widgets under this list (for benchmarks)"""
+        count, pending = 0, [self]
+        while pending:
+            widget = pending.pop()
+            children = widget.winfo_children()
+            count += len(children)
+            pending.extend(children)
+        return count